@@ -1,21 +1,40 @@
-from rag_chatbot.rag.retriever import Retriever
-from rag_chatbot.rag.query_embedder import QueryEmbedder
-from rag_chatbot.rag.llm import get_llm
-from rag_chatbot.prompt.prompts import get_prompt
-from rag_chatbot.rag.pipeline import RAGPipeline
+import logging
+
 from rag_chatbot.core.settings import settings
-from rag_chatbot.ui.app_gradio import launch_ui
+from rag_chatbot.prompt.prompts import get_prompt
+from rag_chatbot.rag.cache import (
+    response_cache_from_config,
+    retrieval_cache_from_config,
+)
+from rag_chatbot.rag.loader import PipelineLoader
+from rag_chatbot.ui.app import launch_ui
+from rag_chatbot.utils.timing import start_periodic_export
 
-persist_path = settings.paths.VECTOR_STORE["fiass_dir"]
+logging.basicConfig(level=logging.INFO)
 
-rag = RAGPipeline(
-    embedder=QueryEmbedder(),
-    retriever=Retriever(
-        persist_path / "faiss.index",
-        persist_path / "metadata.parquet",
-    ),
-    llm=get_llm(),
+# Models and index load concurrently in the background; the UI binds its
+# port right away and answers "warming up" until the loader is ready.
+# The retriever serves the CURRENT snapshot of the vector store and swaps
+# in newly published snapshots without a restart.
+loader = PipelineLoader(
+    store_root=settings.paths.VECTOR_STORE["fiass_dir"],
+    reload_interval_s=30,
     prompt=get_prompt(),
+    report_path=settings.paths.REPORTS["reports_dir"] / "startup_report.json",
+    # Concurrent identical UI queries share one pipeline run
+    coalesce=settings.get("api", {}).get("coalesce", True),
+    # Exact-match answers, shared with the API through the SQLite tier
+    response_cache=response_cache_from_config(
+        settings.get("response_cache", {}), root=settings.root),
+    retrieval_cache=retrieval_cache_from_config(settings.get("retrieval_cache", {})),
+    # Query-relevant sentences only: fewer prompt tokens to evaluate
+    compression=settings.get("compression", {}),
+).start()
+
+# Aggregated per-stage p50/p95/p99 latencies
+start_periodic_export(
+    settings.paths.REPORTS["reports_dir"] / "latency_metrics.json",
+    interval_s=60,
 )
 
-launch_ui(rag)
+launch_ui(loader)
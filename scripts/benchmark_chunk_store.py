@@ -0,0 +1,114 @@
+"""
+Size/load benchmark for chunk metadata.
+
+Chunks the cleaned narratives and persists them two ways:
+- text per chunk: metadata.parquet with a `document` column (current layout)
+- offsets: metadata.parquet with (narrative_row, start, end) plus the
+  deduplicated, block-compressed, memory-mapped narrative store
+
+Reports bytes on disk, metadata load time, resident size after load, the
+narrative store's size against its plain UTF-8 text, and checks that
+lazily sliced chunks equal the stored chunk texts.
+
+Usage:
+    python scripts/benchmark_chunk_store.py --limit 100000
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from rag_chatbot.chunking.columnar import chunk_table
+from rag_chatbot.core.settings import settings
+from rag_chatbot.data.handler import DataHandler
+from rag_chatbot.vectorstore.narratives import NarrativeStore, write_chunk_store
+
+COLUMNS = ["complaint_id", "product_category", "consumer_complaint_narrative"]
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.iterdir() if p.is_file())
+
+
+def _load(path: Path):
+    start = time.perf_counter()
+    metadata = pd.read_parquet(path / "metadata.parquet")
+    store = NarrativeStore.open(path) if NarrativeStore.exists(path) else None
+    elapsed = time.perf_counter() - start
+
+    # The store is memory-mapped: only touched pages become resident
+    resident = metadata.memory_usage(deep=True).sum()
+    return metadata, store, elapsed, resident
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=100_000)
+    args = parser.parse_args()
+
+    path = settings.paths.DATA["interim_dir"] / "complaints_clean.parquet"
+    if not path.exists():
+        sys.exit(f"{path} not found; run scripts/run_preprocessing.py first")
+    df = DataHandler(path).load_dataset(columns=COLUMNS).head(args.limit)
+
+    chunks = chunk_table(df)
+    texts = chunks.column("text").to_pylist()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text_dir, offset_dir = Path(tmp) / "text", Path(tmp) / "offsets"
+        text_dir.mkdir()
+
+        legacy = chunks.drop_columns(["narrative_row"]).rename_columns(
+            ["document" if c == "text" else c
+             for c in chunks.column_names if c != "narrative_row"]
+        ).to_pandas()
+        legacy.to_parquet(text_dir / "metadata.parquet")
+        write_chunk_store(df["consumer_complaint_narrative"], chunks, offset_dir)
+
+        results = {}
+        for name, directory in (("text_per_chunk", text_dir),
+                                ("offsets", offset_dir)):
+            metadata, store, load_s, resident = _load(directory)
+            results[name] = {
+                "disk_mb": round(_dir_bytes(directory) / 1024 ** 2, 2),
+                "load_ms": round(load_s * 1000, 1),
+                "resident_mb": round(resident / 1024 ** 2, 2),
+            }
+            if store is not None:
+                sliced = [
+                    store.slice(r, s, e) for r, s, e in zip(
+                        metadata["narrative_row"], metadata["start"],
+                        metadata["end"])
+                ]
+                results[name]["identical"] = sliced == texts
+                results[name]["narratives_mb"] = round(
+                    store.nbytes / 1024 ** 2, 2)
+                results[name]["narratives_raw_mb"] = round(
+                    store.text_nbytes / 1024 ** 2, 2)
+                results[name]["compression_ratio"] = round(
+                    store.text_nbytes / store.nbytes, 2)
+
+    for name, r in results.items():
+        print(f"{name:<15} disk={r['disk_mb']:>8} MB  load={r['load_ms']:>7} ms"
+              f"  resident={r['resident_mb']:>8} MB")
+        if "narratives_mb" in r:
+            print(f"{'':<15} narratives={r['narratives_mb']} MB"
+                  f" (plain {r['narratives_raw_mb']} MB,"
+                  f" {r['compression_ratio']}x)")
+
+    out_path = settings.paths.REPORTS["reports_dir"] / "chunk_store_benchmark.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"chunks": len(texts), "narratives": len(df),
+                   "results": results}, f, indent=2)
+
+    if results["offsets"].get("identical") is False:
+        raise SystemExit("Sliced chunks differ from the stored chunk texts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Throughput benchmark for narrative chunking.
+
+Compares the original iterrows/list-of-dicts chunker with the columnar
+engine (compat mode, serially and across process pools, plus fast mode),
+verifies that compat chunks are identical and reports narratives/sec and
+the size of the output.
+
+Usage:
+    python scripts/benchmark_chunking.py --limit 100000 --jobs 1 2 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from rag_chatbot.chunking.columnar import chunk_table
+from rag_chatbot.chunking.text_splitter import text_splitter
+from rag_chatbot.core.settings import settings
+from rag_chatbot.data.handler import DataHandler
+
+COLUMNS = ["complaint_id", "product_category", "consumer_complaint_narrative"]
+
+
+def legacy_chunk(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Original implementation: iterrows + one dict per chunk."""
+    documents = []
+    for _, row in df.iterrows():
+        narrative = row["consumer_complaint_narrative"]
+        if not isinstance(narrative, str) or not narrative.strip():
+            continue
+        for i, chunk in enumerate(text_splitter.split_text(narrative)):
+            documents.append({
+                "text": chunk,
+                "metadata": {
+                    "complaint_id": row["complaint_id"],
+                    "product_category": row["product_category"],
+                    "chunk_id": i,
+                },
+            })
+    return documents
+
+
+def load_frame(limit: int) -> pd.DataFrame:
+    path = settings.paths.DATA["interim_dir"] / "complaints_clean.parquet"
+    if not path.exists():
+        sys.exit(f"{path} not found; run scripts/run_preprocessing.py first")
+
+    df = DataHandler(path).load_dataset(columns=COLUMNS)
+    # Repeat small datasets up to the requested size
+    repeats = max(1, -(-limit // max(len(df), 1)))
+    return pd.concat([df] * repeats, ignore_index=True).head(limit)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=100_000)
+    parser.add_argument("--jobs", type=int, nargs="+",
+                        default=[1, 2, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    df = load_frame(args.limit)
+    n = len(df)
+
+    start = time.perf_counter()
+    reference = legacy_chunk(df)
+    legacy_rate = n / (time.perf_counter() - start)
+    expected = [(d["text"], d["metadata"]["chunk_id"]) for d in reference]
+
+    results = [{"engine": "legacy", "mode": "compat", "n_jobs": 1,
+                "narratives_per_s": round(legacy_rate),
+                "chunks": len(reference), "identical": True}]
+
+    runs = [("compat", j) for j in sorted(set(args.jobs))] + [("fast", 1)]
+    for mode, n_jobs in runs:
+        start = time.perf_counter()
+        table = chunk_table(df, mode=mode, n_jobs=n_jobs)
+        rate = n / (time.perf_counter() - start)
+
+        got = list(zip(table.column("text").to_pylist(),
+                       table.column("chunk_id").to_pylist()))
+        results.append({
+            "engine": "columnar",
+            "mode": mode,
+            "n_jobs": n_jobs,
+            "narratives_per_s": round(rate),
+            "chunks": table.num_rows,
+            "arrow_mb": round(table.nbytes / 1024 ** 2, 1),
+            # Fast mode is not expected to reproduce the recursive splitter
+            "identical": got == expected if mode == "compat" else None,
+            "speedup": round(rate / legacy_rate, 2),
+        })
+
+    for r in results:
+        print(
+            f"{r['engine']:<9} {r['mode']:<7} jobs={r['n_jobs']:<3} "
+            f"{r['narratives_per_s']:>10,}/s  chunks={r['chunks']:<9,}"
+            f" identical={r['identical']}"
+        )
+
+    out_path = settings.paths.REPORTS["reports_dir"] / "chunking_benchmark.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"narratives": n, "results": results}, f, indent=2)
+
+    if any(r["identical"] is False for r in results):
+        raise SystemExit("Compat chunks differ from the legacy implementation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Throughput benchmark for narrative cleaning.
+
+Compares the original per-pattern implementation with the precompiled
+cleaning engine, serially and across process pools, verifies the outputs are
+byte-identical and reports narratives/sec overall and per core. Inputs
+below MIN_PARALLEL_ROWS are cleaned in-process whatever n_jobs is, so each
+row records whether the pool actually ran.
+
+--calibrate times the pool (forced on) against the in-process path at
+growing sizes and reports the smallest size where the pool wins, the
+value MIN_PARALLEL_ROWS should be set to on that host.
+
+Usage:
+    python scripts/benchmark_cleaning.py --limit 200000 --jobs 1 2 4
+    python scripts/benchmark_cleaning.py --calibrate --jobs 4
+"""
+import argparse
+import json
+import os
+import random
+import re
+import time
+from typing import Callable, List
+
+from rag_chatbot.core.settings import settings
+from rag_chatbot.preprocessing.cleaning import (
+    BOILERPLATE_PATTERNS,
+    MIN_PARALLEL_ROWS,
+    SYSTEM_MARKERS,
+    clean_narratives,
+)
+
+
+def legacy_clean(text):
+    """Original implementation: patterns compiled on the fly, 15 passes."""
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    text = re.sub(r"\b[xX]{2,}([/\-\s][xX]{2,})*\b", "<masked>", text)
+    for pattern in BOILERPLATE_PATTERNS:
+        text = re.sub(pattern, "", text, count=1)
+    for marker in SYSTEM_MARKERS:
+        text = re.sub(marker, "", text)
+    text = re.sub(r"[^a-z0-9\s\.\,\-<>]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _synthetic_narratives(n: int) -> List[str]:
+    rng = random.Random(0)
+    phrases = [
+        "I am filing a complaint about my credit card.",
+        "On XX/XX/XXXX the bank charged a {$35.00} late fee!",
+        "My account XXXX XXXX was closed without notice.",
+        "I called customer service several times; nobody helped.",
+        "[[consumer consent provided]]",
+        "The transfer of $1,200 never arrived.",
+    ]
+    return [
+        " ".join(rng.choice(phrases) for _ in range(rng.randint(3, 25)))
+        for _ in range(n)
+    ]
+
+
+def load_narratives(limit: int) -> List[str]:
+    path = settings.paths.DATA["interim_dir"] / "complaints_clean.parquet"
+    if path.exists():
+        from rag_chatbot.data.handler import DataHandler
+
+        df = DataHandler(path).load_dataset(
+            columns=["consumer_complaint_narrative"])
+        texts = df["consumer_complaint_narrative"].tolist()[:limit]
+        if texts:
+            return texts
+    return _synthetic_narratives(limit)
+
+
+def _throughput(fn: Callable[[], List[str]], n: int):
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    return out, n / elapsed
+
+
+def calibrate(texts: List[str], n_jobs: int) -> dict:
+    """Pool vs in-process throughput at doubling sizes up to len(texts)."""
+    sizes, size = [], 25_000
+    while size < len(texts):
+        sizes.append(size)
+        size *= 2
+    sizes.append(len(texts))
+
+    rows, threshold = [], None
+    for size in sizes:
+        batch = texts[:size]
+        _, serial = _throughput(lambda: clean_narratives(batch), size)
+        _, pooled = _throughput(
+            lambda: clean_narratives(batch, n_jobs=n_jobs, min_parallel_rows=0),
+            size)
+        rows.append({"narratives": size, "serial_per_s": round(serial),
+                     "pool_per_s": round(pooled)})
+        print(f"{size:>9,}  serial {serial:>10,.0f}/s  "
+              f"pool(jobs={n_jobs}) {pooled:>10,.0f}/s")
+        if threshold is None and pooled > serial:
+            threshold = size
+
+    if threshold is None:
+        print(f"Pool never beat in-process up to {len(texts):,} narratives "
+              f"on {os.cpu_count()} CPU(s); keep MIN_PARALLEL_ROWS >= that")
+    else:
+        print(f"Pool wins from {threshold:,} narratives "
+              f"(MIN_PARALLEL_ROWS={MIN_PARALLEL_ROWS:,})")
+    return {"n_jobs": n_jobs, "cpus": os.cpu_count(),
+            "threshold": threshold, "sizes": rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=100_000)
+    parser.add_argument("--jobs", type=int, nargs="+",
+                        default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument("--calibrate", action="store_true",
+                        help="Measure the pool/in-process crossover")
+    args = parser.parse_args()
+
+    texts = load_narratives(args.limit)
+    reports_dir = settings.paths.REPORTS["reports_dir"]
+
+    if args.calibrate:
+        report = calibrate(texts, max(args.jobs))
+        with open(reports_dir / "cleaning_calibration.json", "w",
+                  encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        return
+
+    n = len(texts)
+
+    reference, legacy_rate = _throughput(
+        lambda: [legacy_clean(t) for t in texts], n)
+    results = [{"engine": "legacy", "n_jobs": 1,
+                "narratives_per_s": round(legacy_rate),
+                "per_core": round(legacy_rate), "identical": True}]
+
+    for n_jobs in sorted(set(args.jobs)):
+        out, rate = _throughput(
+            lambda: clean_narratives(texts, n_jobs=n_jobs), n)
+        workers = n_jobs if n_jobs > 1 and n >= MIN_PARALLEL_ROWS else 1
+        results.append({
+            "engine": "precompiled",
+            "n_jobs": n_jobs,
+            "pool": workers > 1,
+            "narratives_per_s": round(rate),
+            "per_core": round(rate / workers),
+            "identical": out == reference,
+            "speedup": round(rate / legacy_rate, 2),
+        })
+
+    for r in results:
+        print(
+            f"{r['engine']:<12} jobs={r['n_jobs']:<3} "
+            f"{r['narratives_per_s']:>10,}/s  {r['per_core']:>10,}/s/core"
+            f"  identical={r['identical']}  pool={r.get('pool', False)}"
+        )
+
+    out_path = reports_dir / "cleaning_benchmark.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"narratives": n, "results": results}, f, indent=2)
+
+    if not all(r["identical"] for r in results):
+        raise SystemExit("Cleaning output differs from the legacy implementation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark query-aware context compression against the default context.
+
+For every query the same retrieved chunks are turned into a prompt twice:
+once with the default (first two chunks, 2000 chars) context and once with
+the ContextCompressor. We report prompt tokens, prompt-eval time (time to
+the first streamed token), total generation time and faithfulness of the
+answer against the full retrieved context.
+
+Usage:
+    python scripts/benchmark_compression.py --budget 256
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from rag_chatbot.core.settings import settings
+from rag_chatbot.prompt.prompts import get_prompt
+from rag_chatbot.rag.compression import ContextCompressor, approx_token_count
+from rag_chatbot.rag.evaluation import faithfulness_score
+from rag_chatbot.rag.llm import get_llm
+from rag_chatbot.rag.pipeline import RAGPipeline
+from rag_chatbot.rag.query_embedder import QueryEmbedder
+from rag_chatbot.rag.retriever import Retriever
+
+DEFAULT_QUERIES = [
+    "What are common credit card complaints?",
+    "Why do customers complain about money transfers?",
+    "What problems do people report with savings account fees?",
+    "How do lenders handle personal loan payment disputes?",
+    "What issues come up with unauthorized credit card charges?",
+]
+
+
+def _count_tokens(llm, text: str) -> int:
+    """Use the LLM tokenizer when exposed, otherwise the heuristic."""
+    client = getattr(llm, "client", None)
+    if client is not None and hasattr(client, "tokenize"):
+        return len(client.tokenize(text))
+    return approx_token_count(text)
+
+
+def _timed_generation(llm, prompt: str) -> Dict[str, float]:
+    """Stream a completion and split time into prompt eval and decoding."""
+    start = time.perf_counter()
+    first_token = None
+    pieces: List[str] = []
+
+    for piece in llm.stream(prompt):
+        if first_token is None:
+            first_token = time.perf_counter()
+        pieces.append(piece)
+
+    end = time.perf_counter()
+    first_token = first_token or end
+
+    return {
+        "answer": "".join(pieces),
+        "prompt_eval_s": first_token - start,
+        "total_s": end - start,
+    }
+
+
+def run_benchmark(queries: List[str], budget: int) -> Dict:
+    embedder = QueryEmbedder()
+    # CURRENT snapshot of the versioned store
+    retriever = Retriever.from_store(settings.paths.VECTOR_STORE["fiass_dir"])
+    llm = get_llm()
+    prompt = get_prompt()
+
+    compressor = ContextCompressor(
+        embedder,
+        token_budget=budget,
+        count_tokens=lambda t: _count_tokens(llm, t),
+    )
+    baseline = RAGPipeline(embedder, retriever, llm, prompt)
+    compressed = RAGPipeline(embedder, retriever, llm, prompt, compressor)
+
+    rows = []
+    for query in queries:
+        query_emb = embedder.embed(query)
+        chunks = retriever.retrieve(query_emb)
+        full_context = "\n".join(c.get("document", "") for c in chunks)
+
+        for name, pipeline in (("baseline", baseline), ("compressed", compressed)):
+            context = pipeline._build_context(query_emb, chunks)
+            formatted = prompt.format(context=context, question=query)
+            timing = _timed_generation(llm, formatted)
+
+            rows.append({
+                "query": query,
+                "mode": name,
+                "prompt_tokens": _count_tokens(llm, formatted),
+                "prompt_eval_s": round(timing["prompt_eval_s"], 4),
+                "total_s": round(timing["total_s"], 4),
+                "faithfulness": faithfulness_score(
+                    timing["answer"], full_context),
+            })
+
+    summary = {}
+    for name in ("baseline", "compressed"):
+        subset = [r for r in rows if r["mode"] == name]
+        summary[name] = {
+            key: round(statistics.mean(r[key] for r in subset), 4)
+            for key in ("prompt_tokens", "prompt_eval_s", "total_s", "faithfulness")
+        }
+
+    summary["token_reduction"] = round(
+        summary["baseline"]["prompt_tokens"]
+        / max(summary["compressed"]["prompt_tokens"], 1),
+        2,
+    )
+
+    return {"budget": budget, "summary": summary, "rows": rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget", type=int, default=256,
+                        help="Token budget for the compressed context.")
+    parser.add_argument("--queries", type=str, default=None,
+                        help="Optional text file with one query per line.")
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    report = run_benchmark(queries, args.budget)
+
+    out_path = settings.paths.REPORTS["reports_dir"] / "compression_benchmark.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report["summary"], indent=2))
+    print(f"Full report written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
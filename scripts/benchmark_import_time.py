@@ -0,0 +1,153 @@
+"""
+Import-time regression benchmark.
+
+Each entry point is imported in a fresh interpreter with
+`python -X importtime`; the cumulative import time of the module is compared
+against its budget, and heavy dependencies that must stay deferred are
+checked to be absent from sys.modules.
+
+Usage:
+    python scripts/benchmark_import_time.py            # check budgets
+    python scripts/benchmark_import_time.py --json out.json
+
+Exits with status 1 when any entry point is over budget or eagerly imports a
+forbidden dependency.
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+# Cumulative import budget (ms) and dependencies that must NOT be imported
+# as a side effect of importing the entry point. Budgets leave ~2x headroom
+# over a warm-cache run on a laptop; numpy alone costs ~100 ms and pandas
+# ~500 ms.
+ENTRY_POINTS: Dict[str, Dict] = {
+    "rag_chatbot.core.settings": {
+        "budget_ms": 80,
+        "forbidden": ["pandas", "numpy", "torch", "faiss"],
+    },
+    "rag_chatbot.rag.evaluation": {
+        "budget_ms": 40,
+        "forbidden": ["nltk", "pandas", "torch"],
+    },
+    "rag_chatbot.rag.retriever": {
+        "budget_ms": 250,
+        "forbidden": ["faiss", "pandas", "torch"],
+    },
+    "rag_chatbot.rag.query_embedder": {
+        "budget_ms": 250,
+        "forbidden": ["sentence_transformers", "torch"],
+    },
+    "rag_chatbot.rag.llm": {
+        "budget_ms": 80,
+        "forbidden": ["huggingface_hub", "langchain_community", "ctransformers"],
+    },
+    "rag_chatbot.rag.pipeline": {
+        "budget_ms": 250,
+        "forbidden": ["torch", "faiss", "pandas", "nltk"],
+    },
+    "rag_chatbot.embeddings.embedder": {
+        "budget_ms": 250,
+        "forbidden": ["faiss", "sentence_transformers", "torch"],
+    },
+    "rag_chatbot.data.handler": {
+        "budget_ms": 1000,
+        "forbidden": ["matplotlib", "joblib", "torch"],
+    },
+}
+
+_IMPORTTIME_LINE = re.compile(
+    r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)"
+)
+
+# A plain import statement: importlib.import_module bypasses -X importtime
+_PROBE = (
+    "import {module}; import json, sys; "
+    "print(json.dumps({{m: m in sys.modules for m in {forbidden!r}}}))"
+)
+
+
+def measure(module: str, forbidden: List[str]) -> Dict:
+    """Import `module` in a fresh interpreter and collect timings."""
+    proc = subprocess.run(
+        [
+            sys.executable, "-X", "importtime", "-c",
+            _PROBE.format(module=module, forbidden=forbidden),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_us = 0
+    heaviest = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cum_us, indent, name = match.groups()
+        if name == module:
+            cumulative_us = int(cum_us)
+        if len(indent) <= 2:
+            heaviest.append((int(cum_us), name))
+
+    heaviest.sort(reverse=True)
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    return {
+        "cumulative_ms": cumulative_us / 1000,
+        "eager_imports": sorted(m for m, present in loaded.items() if present),
+        "top_level": [
+            {"module": name, "cumulative_ms": us / 1000}
+            for us, name in heaviest[:5]
+        ],
+    }
+
+
+def run(repeats: int = 3) -> Dict[str, Dict]:
+    results = {}
+    for module, spec in ENTRY_POINTS.items():
+        runs = [measure(module, spec["forbidden"]) for _ in range(repeats)]
+        median_ms = statistics.median(r["cumulative_ms"] for r in runs)
+
+        results[module] = {
+            "budget_ms": spec["budget_ms"],
+            "median_ms": round(median_ms, 1),
+            "eager_imports": runs[0]["eager_imports"],
+            "top_level": runs[0]["top_level"],
+            "ok": median_ms <= spec["budget_ms"] and not runs[0]["eager_imports"],
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", type=str, default=None,
+                        help="Optional path for the JSON report.")
+    args = parser.parse_args()
+
+    results = run(args.repeats)
+
+    width = max(len(m) for m in results)
+    for module, r in results.items():
+        status = "OK  " if r["ok"] else "FAIL"
+        eager = f"  eager: {', '.join(r['eager_imports'])}" if r["eager_imports"] else ""
+        print(
+            f"{status} {module:<{width}}  {r['median_ms']:>8.1f} ms"
+            f" / {r['budget_ms']} ms{eager}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    sys.exit(0 if all(r["ok"] for r in results.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
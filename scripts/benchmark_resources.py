@@ -0,0 +1,157 @@
+"""
+Throughput under contention: default thread pools vs the core budget.
+
+Runs the pipeline with N concurrent users (closed loop, no think time) for
+each user count in --users, under two configurations:
+
+    unbudgeted  every library sized to all cores (torch, FAISS OpenMP and
+                the LLM each default to the whole machine); each request
+                runs its stages on the caller's thread
+    budgeted    the resources plan of config/rag.yaml: per-stage thread
+                counts and stage thread pools (core.resources)
+
+and reports throughput and p50/p99 latency per configuration and user
+count. With --synthetic the vector store is replaced by random vectors
+(--vectors N) and the LLM by StubLLM, so only embedding and search
+compete for the cores; use --llm real to include generation.
+
+Usage:
+    python scripts/benchmark_resources.py --users 1 4 16 --duration 20
+    python scripts/benchmark_resources.py --synthetic --vectors 200000
+"""
+import argparse
+import json
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from rag_chatbot.core.resources import (
+    STAGES,
+    ResourcePlan,
+    StageExecutors,
+    apply_thread_limits,
+    available_cpus,
+)
+from rag_chatbot.core.settings import settings
+from rag_chatbot.evaluation.load import pipeline_target, run_closed_loop
+
+QUERIES = [
+    "What are common credit card complaints?",
+    "Why do customers complain about money transfers?",
+    "What problems do people report with savings account fees?",
+    "How do lenders handle personal loan payment disputes?",
+    "What issues come up with unauthorized credit card charges?",
+]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=settings.root,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _synthetic_store(n: int, dim: int) -> Path:
+    from rag_chatbot.embeddings.embedder import build_faiss_index, save_vector_store
+    from rag_chatbot.evaluation.retrieval import synthetic_vectors
+
+    root = Path(tempfile.mkdtemp(prefix="resource-bench-"))
+    vectors = synthetic_vectors(n, dim=dim)
+    docs = [
+        {"text": f"synthetic complaint {i} " * 12, "metadata": {"complaint_id": i}}
+        for i in range(n)
+    ]
+    save_vector_store(build_faiss_index(vectors), docs, path=root)
+    return root
+
+
+def _unbudgeted_plan(users: int) -> ResourcePlan:
+    n_cores = len(available_cpus())
+    return ResourcePlan.from_config({
+        "stages": {s: {"threads": n_cores, "concurrency": users} for s in STAGES},
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--llm", choices=["stub", "real"], default="stub")
+    parser.add_argument("--mode", choices=["generate", "extractive"],
+                        default="generate")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="Use random vectors instead of the vector store.")
+    parser.add_argument("--vectors", type=int, default=100_000)
+    args = parser.parse_args()
+
+    from rag_chatbot.prompt.prompts import get_prompt
+    from rag_chatbot.rag.llm import StubLLM, get_llm
+    from rag_chatbot.rag.pipeline import RAGPipeline
+    from rag_chatbot.rag.query_embedder import QueryEmbedder
+    from rag_chatbot.rag.retriever import Retriever
+
+    embedder = QueryEmbedder()
+    if args.synthetic:
+        dim = embedder.model.get_sentence_embedding_dimension()
+        store = _synthetic_store(args.vectors, dim)
+    else:
+        store = settings.paths.VECTOR_STORE["fiass_dir"]
+    retriever = Retriever.from_store(store)
+    llm = StubLLM() if args.llm == "stub" else get_llm()
+
+    budgeted = ResourcePlan.from_config(settings.get("resources", {}))
+    rows = []
+    for name in ("unbudgeted", "budgeted"):
+        for users in args.users:
+            plan = budgeted if name == "budgeted" else _unbudgeted_plan(users)
+            apply_thread_limits(plan)
+            executors = StageExecutors(plan) if name == "budgeted" else None
+            pipeline = RAGPipeline(embedder, retriever, llm, get_prompt(),
+                                   executors=executors)
+            target = pipeline_target(pipeline, mode=args.mode)
+            target(QUERIES[0])  # warmup
+
+            summary = run_closed_loop(target, QUERIES, users, args.duration)
+            if executors is not None:
+                executors.shutdown()
+
+            row = {
+                "config": name,
+                "users": users,
+                "plan": plan.as_dict(),
+                "throughput_rps": summary["throughput_rps"],
+                "errors": summary["errors"],
+                **{f"latency_{k}": v
+                   for k, v in summary.get("latency", {}).items()},
+            }
+            rows.append(row)
+            print(f"{name:<11} users={users:<3} "
+                  f"{row['throughput_rps']:>8.2f} rps  "
+                  f"p50 {row.get('latency_p50_ms', 0):>9.1f} ms  "
+                  f"p99 {row.get('latency_p99_ms', 0):>9.1f} ms")
+
+    run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    commit = _git_commit()
+    report = {
+        "run": run,
+        "commit": commit,
+        "cores": len(available_cpus()),
+        "llm": args.llm,
+        "source": f"synthetic:{args.vectors}" if args.synthetic else "snapshot",
+        "results": rows,
+    }
+
+    out = (settings.paths.REPORTS["reports_dir"] / "resource_benchmark"
+           / f"{run}-{commit}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Build a vector store from a stratified sample of the cleaned complaints.
+
+Draws `--samples` complaints proportionally to product_category in a single
+pass over the partitioned dataset (the full dataset is never loaded), then
+runs the same checkpointed, resumable build as build_vectorstore.py and
+publishes the result as a new snapshot.
+
+Usage:
+    python scripts/build_sample_embeddings.py --samples 12000
+"""
+import argparse
+import logging
+import sys
+
+from rag_chatbot.chunking.sample import stratified_sample, stratified_sample_stream
+from rag_chatbot.core.settings import settings
+from rag_chatbot.data.handler import DataHandler
+from rag_chatbot.data.incremental import next_run_index, read_latest
+from rag_chatbot.vectorstore.build import DEFAULT_MODEL, build_vector_store
+from rag_chatbot.vectorstore.faiss import prune_snapshots, read_manifest
+
+COLUMNS = ["complaint_id", "product_category", "consumer_complaint_narrative"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=12_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--mode", choices=["compat", "fast", "tokens"],
+                        default="compat", help="Chunking mode.")
+    parser.add_argument("--batch-size", type=int, default=1024,
+                        help="Chunks embedded per checkpointed batch.")
+    parser.add_argument("--keep", type=int, default=3,
+                        help="Published snapshots to keep.")
+    args = parser.parse_args()
+
+    path = settings.paths.DATA["interim_dir"] / "complaints_clean.parquet"
+    if not path.exists():
+        sys.exit(f"{path} not found; run scripts/run_preprocessing.py first")
+
+    if next_run_index(path) > 1:
+        # Incremental runs may hold superseded versions of a complaint
+        df = stratified_sample(read_latest(path, columns=COLUMNS),
+                               "product_category", args.samples,
+                               random_state=args.seed)
+    else:
+        df = stratified_sample_stream(
+            DataHandler(path).iter_batches(columns=COLUMNS),
+            "product_category",
+            args.samples,
+            random_state=args.seed,
+            id_col="complaint_id",
+        )
+
+    snapshot = build_vector_store(
+        df,
+        settings.paths.VECTOR_STORE["fiass_dir"],
+        model_name=args.model,
+        chunk_mode=args.mode,
+        batch_size=args.batch_size,
+        source=(f"{path.relative_to(settings.root)} "
+                f"(stratified sample n={args.samples}, seed={args.seed})"),
+    )
+    prune_snapshots(settings.paths.VECTOR_STORE["fiass_dir"], keep=args.keep)
+
+    manifest = read_manifest(snapshot)
+    print(f"Published {manifest['version']}: {manifest['counts']}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,70 @@
+"""
+Build the FAISS vector store from the cleaned complaints.
+
+Chunks every narrative, embeds the chunks batch by batch and publishes a new
+versioned snapshot (faiss.index, chunk metadata, narrative store and a
+manifest with model, chunker parameters, counts and sha256 hashes) under
+vector_store/fiass/versions/, then points vector_store/fiass/CURRENT at it.
+
+Progress is checkpointed after every embedding batch: if the build is
+interrupted, running the same command again resumes from the last completed
+batch.
+
+Usage:
+    python scripts/build_vectorstore.py --batch-size 4096 --jobs -1
+    python scripts/build_vectorstore.py --mode tokens --keep 2
+"""
+import argparse
+import logging
+import sys
+
+from rag_chatbot.core.settings import settings
+from rag_chatbot.data.incremental import read_latest
+from rag_chatbot.vectorstore.build import DEFAULT_MODEL, build_vector_store
+from rag_chatbot.vectorstore.faiss import prune_snapshots, read_manifest
+
+COLUMNS = ["complaint_id", "product_category", "consumer_complaint_narrative"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--mode", choices=["compat", "fast", "tokens"],
+                        default="compat", help="Chunking mode.")
+    parser.add_argument("--batch-size", type=int, default=4096,
+                        help="Chunks embedded per checkpointed batch.")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Chunking worker processes (-1 = all cores).")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Only index the first N complaints.")
+    parser.add_argument("--keep", type=int, default=3,
+                        help="Published snapshots to keep.")
+    args = parser.parse_args()
+
+    path = settings.paths.DATA["interim_dir"] / "complaints_clean.parquet"
+    if not path.exists():
+        sys.exit(f"{path} not found; run scripts/run_preprocessing.py first")
+
+    # Newest version of every complaint (the dataset may be incremental)
+    df = read_latest(path, columns=COLUMNS)
+    if args.limit:
+        df = df.head(args.limit)
+
+    snapshot = build_vector_store(
+        df,
+        settings.paths.VECTOR_STORE["fiass_dir"],
+        model_name=args.model,
+        chunk_mode=args.mode,
+        batch_size=args.batch_size,
+        n_jobs=args.jobs,
+        source=str(path.relative_to(settings.root)),
+    )
+    prune_snapshots(settings.paths.VECTOR_STORE["fiass_dir"], keep=args.keep)
+
+    manifest = read_manifest(snapshot)
+    print(f"Published {manifest['version']}: {manifest['counts']}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,139 @@
+"""
+Offline retrieval benchmark.
+
+Holds out a query set from the vectors of the published vector store (or
+synthetic vectors), computes the exact top-k with a flat index and scores
+every configured index variant (config/vectorstore.yaml,
+retrieval_benchmark.variants) on recall@k, nDCG@k, QPS, single-query
+p50/p95/p99 latency, build time and index size.
+
+Each run is written to reports/retrieval_benchmark/<run>.json and appended
+to reports/retrieval_benchmark.csv with the git commit, so runs can be
+compared across commits.
+
+Usage:
+    python scripts/evaluate_rag.py --queries 1000 --k 10
+    python scripts/evaluate_rag.py --synthetic 100000 --variants flat hnsw32
+"""
+import argparse
+import csv
+import json
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from rag_chatbot.core.settings import settings
+from rag_chatbot.evaluation.retrieval import (
+    DEFAULT_VARIANTS,
+    load_index_vectors,
+    run_benchmark,
+    synthetic_vectors,
+)
+from rag_chatbot.vectorstore.faiss import INDEX_FILE, current_snapshot, current_version
+
+CSV_COLUMNS = [
+    "run", "commit", "source", "name", "factory", "params", "n_base",
+    "n_queries", "k", "recall", "ndcg", "qps", "p50_ms", "p95_ms", "p99_ms",
+    "mean_ms", "build_s", "index_bytes",
+]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=settings.root,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    cfg = settings.get("retrieval_benchmark", {}) or {}
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=cfg.get("queries", 1000))
+    parser.add_argument("--k", type=int, default=cfg.get("k", 10))
+    parser.add_argument("--variants", nargs="*",
+                        help="Only run these variant names.")
+    parser.add_argument("--synthetic", type=int, default=None,
+                        help="Benchmark N synthetic vectors instead of the "
+                             "published vector store.")
+    parser.add_argument("--latency-queries", type=int, default=None,
+                        help="Single-query searches timed per variant "
+                             "(default: all queries).")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    variants = cfg.get("variants") or DEFAULT_VARIANTS
+    if args.variants:
+        variants = [v for v in variants if v["name"] in args.variants]
+        if not variants:
+            sys.exit(f"No configured variant named {args.variants}")
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, random_state=args.seed)
+        source = f"synthetic:{args.synthetic}"
+    else:
+        root = settings.paths.VECTOR_STORE["fiass_dir"]
+        index_path = current_snapshot(root) / INDEX_FILE
+        if not index_path.exists():
+            sys.exit(f"{index_path} not found; run scripts/build_vectorstore.py "
+                     "or pass --synthetic N")
+        vectors = load_index_vectors(index_path)
+        source = f"snapshot:{current_version(root) or root.name}"
+
+    rows = run_benchmark(
+        vectors, variants, n_queries=args.queries, k=args.k,
+        random_state=args.seed, latency_queries=args.latency_queries,
+    )
+
+    run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    commit = _git_commit()
+    report = {
+        "run": run,
+        "commit": commit,
+        "source": source,
+        "n_base": len(vectors) - args.queries,
+        "n_queries": args.queries,
+        "k": args.k,
+        "dim": int(vectors.shape[1]),
+        "results": rows,
+    }
+
+    print(f"{'variant':<10} {'recall':>7} {'ndcg':>7} {'qps':>10} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'build s':>8} {'MB':>8}")
+    for r in rows:
+        print(f"{r['name']:<10} {r[f'recall@{args.k}']:>7.4f} "
+              f"{r[f'ndcg@{args.k}']:>7.4f} {r['qps']:>10,.0f} "
+              f"{r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['build_s']:>8.2f} "
+              f"{r['index_bytes'] / 2**20:>8.1f}")
+
+    reports_dir = settings.paths.REPORTS["reports_dir"]
+    json_path = reports_dir / "retrieval_benchmark" / f"{run}-{commit}.json"
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    # One row per variant and run, appended across runs
+    csv_path = reports_dir / "retrieval_benchmark.csv"
+    new_file = not csv_path.exists()
+    with open(csv_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        if new_file:
+            writer.writeheader()
+        for r in rows:
+            writer.writerow({
+                **{c: report[c] for c in
+                   ("run", "commit", "source", "n_base", "n_queries", "k")},
+                **{c: r[c] for c in CSV_COLUMNS if c in r},
+                "params": json.dumps(r["params"], sort_keys=True),
+                "recall": r[f"recall@{args.k}"],
+                "ndcg": r[f"ndcg@{args.k}"],
+            })
+
+    print(f"Wrote {json_path} and {csv_path}")
+
+
+if __name__ == "__main__":
+    main()
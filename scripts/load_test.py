@@ -0,0 +1,229 @@
+"""
+Concurrent load test of the RAG pipeline or its HTTP endpoint.
+
+Runs the configured load model (config/rag.yaml, load_test) at every step
+(arrival rate or user count), records latency, queue time, service time,
+throughput and error rate per step, and marks the capacity: the highest
+step before latency breaks the p99 SLO, errors appear or throughput stops
+keeping up with the offered rate.
+
+Targets:
+    pipeline  RAGPipeline.run in-process, as called by the UI handler,
+              with the real LLM or StubLLM (--llm stub --stub-latency S)
+    http      JSON POST {"query", "mode"} to --url
+
+Writes reports/load_test/<run>-<commit>.json, a per-step CSV and, with
+--plot, the saturation curve as PNG.
+
+Usage:
+    python scripts/load_test.py --llm stub --stub-latency 0.5 --steps 1 2 4
+    python scripts/load_test.py --model closed --steps 1 4 16 --workers 4
+    python scripts/load_test.py --target http --url http://localhost:8000/query
+"""
+import argparse
+import csv
+import json
+import logging
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+from rag_chatbot.core.settings import settings
+from rag_chatbot.evaluation.load import (
+    LOAD_MODELS,
+    http_target,
+    pipeline_target,
+    saturation_curve,
+)
+
+DEFAULT_QUERIES = [
+    "What are common credit card complaints?",
+    "Why do customers complain about money transfers?",
+    "What problems do people report with savings account fees?",
+    "How do lenders handle personal loan payment disputes?",
+    "What issues come up with unauthorized credit card charges?",
+]
+
+CSV_COLUMNS = [
+    "run", "commit", "target", "model", "step", "workers", "requests",
+    "errors", "error_rate", "throughput_rps", "latency_p50_ms",
+    "latency_p95_ms", "latency_p99_ms", "queue_p50_ms", "queue_p99_ms",
+    "service_p50_ms", "service_p99_ms", "saturated",
+]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=settings.root,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _build_pipeline(llm: str, stub_latency_s: float, k: int):
+    from rag_chatbot.prompt.prompts import get_prompt
+    from rag_chatbot.rag.llm import StubLLM, get_llm
+    from rag_chatbot.rag.pipeline import RAGPipeline
+    from rag_chatbot.rag.query_embedder import QueryEmbedder
+    from rag_chatbot.rag.retriever import Retriever
+
+    return RAGPipeline(
+        embedder=QueryEmbedder(),
+        retriever=Retriever.from_store(
+            settings.paths.VECTOR_STORE["fiass_dir"], k=k),
+        llm=StubLLM(latency_s=stub_latency_s) if llm == "stub" else get_llm(),
+        prompt=get_prompt(),
+    )
+
+
+def _plot(report, path: Path) -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    steps = [r for r in report["steps"] if "latency" in r]
+    x = [r["offered_rps"] if "offered_rps" in r else r["users"] for r in steps]
+
+    fig, (ax_tp, ax_lat) = plt.subplots(1, 2, figsize=(12, 4.5))
+    ax_tp.plot(x, [r["throughput_rps"] for r in steps], marker="o")
+    if report["model"] == "open":
+        ax_tp.plot(x, x, linestyle="--", color="grey", label="offered")
+        ax_tp.legend()
+    ax_tp.set_ylabel("throughput (rps)")
+
+    for q in ("p50", "p95", "p99"):
+        ax_lat.plot(x, [r["latency"][f"{q}_ms"] for r in steps],
+                    marker="o", label=f"latency {q}")
+    ax_lat.plot(x, [r["queue"]["p99_ms"] for r in steps],
+                linestyle=":", marker="x", label="queue p99")
+    ax_lat.set_yscale("log")
+    ax_lat.set_ylabel("ms")
+    ax_lat.legend()
+
+    xlabel = "offered rate (rps)" if report["model"] == "open" else "users"
+    for ax in (ax_tp, ax_lat):
+        ax.set_xlabel(xlabel)
+        ax.grid(True, alpha=0.3)
+
+    fig.suptitle(f"Saturation curve ({report['target']}, "
+                 f"{report['workers']} workers)")
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    plt.close(fig)
+
+
+def main() -> None:
+    cfg = settings.get("load_test", {}) or {}
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target", choices=["pipeline", "http"],
+                        default="pipeline")
+    parser.add_argument("--url", default="http://localhost:8000/query")
+    parser.add_argument("--llm", choices=["stub", "real"], default="stub")
+    parser.add_argument("--stub-latency", type=float, default=0.0,
+                        help="Seconds the stub LLM sleeps per answer.")
+    parser.add_argument("--mode", choices=["generate", "extractive"],
+                        default="generate")
+    parser.add_argument("--model", choices=LOAD_MODELS,
+                        default=cfg.get("model", "open"))
+    parser.add_argument("--steps", type=float, nargs="+",
+                        default=cfg.get("steps", [0.5, 1, 2, 4, 8]),
+                        help="Arrival rates (open) or user counts (closed).")
+    parser.add_argument("--duration", type=float,
+                        default=cfg.get("duration_s", 30))
+    parser.add_argument("--workers", type=int, default=cfg.get("workers", 1),
+                        help="Requests served concurrently (pipeline target).")
+    parser.add_argument("--think-time", type=float,
+                        default=cfg.get("think_time_s", 0))
+    parser.add_argument("--slo-p99-ms", type=float,
+                        default=cfg.get("slo_p99_ms"))
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--questions", type=Path,
+                        help="Text file with one question per line.")
+    parser.add_argument("--plot", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    queries = DEFAULT_QUERIES
+    if args.questions:
+        with open(args.questions, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    if args.target == "http":
+        target = http_target(args.url, mode=args.mode)
+        # Client-side concurrency only; the server queues on its own
+        workers = max(int(s) for s in args.steps) if args.model == "closed" else 256
+        target_name = args.url
+    else:
+        pipeline = _build_pipeline(args.llm, args.stub_latency, args.k)
+        target = pipeline_target(pipeline, mode=args.mode)
+        # Warm up the models and index before measuring
+        target(queries[0])
+        workers = args.workers
+        target_name = f"pipeline:{args.llm}"
+
+    curve = saturation_curve(
+        target, queries, args.steps,
+        model=args.model,
+        duration_s=args.duration,
+        workers=workers,
+        think_time_s=args.think_time,
+        slo_p99_ms=args.slo_p99_ms,
+    )
+
+    run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    commit = _git_commit()
+    report = {
+        "run": run,
+        "commit": commit,
+        "target": target_name,
+        "mode": args.mode,
+        "workers": workers,
+        "duration_s": args.duration,
+        "slo_p99_ms": args.slo_p99_ms,
+        **curve,
+    }
+
+    print(f"{'step':>6} {'rps':>8} {'err%':>6} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'queue p99':>10}")
+    for step, r in zip(args.steps, curve["steps"]):
+        lat, queue = r.get("latency", {}), r.get("queue", {})
+        print(f"{step:>6g} {r['throughput_rps']:>8.2f} "
+              f"{r['error_rate'] * 100:>6.1f} {lat.get('p50_ms', 0):>9.1f} "
+              f"{lat.get('p99_ms', 0):>9.1f} {queue.get('p99_ms', 0):>10.1f}"
+              f"{'  saturated' if r['saturated'] else ''}")
+    print(f"Capacity: {curve['capacity']}")
+
+    out_dir = settings.paths.REPORTS["reports_dir"] / "load_test"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = out_dir / f"{run}-{commit}"
+
+    with open(stem.with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    with open(stem.with_suffix(".csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for step, r in zip(args.steps, curve["steps"]):
+            row = {
+                "run": run, "commit": commit, "target": target_name,
+                "model": args.model, "step": step,
+                **{c: r.get(c) for c in CSV_COLUMNS if c in r},
+            }
+            for part in ("latency", "queue", "service"):
+                for q, value in r.get(part, {}).items():
+                    if f"{part}_{q}" in CSV_COLUMNS:
+                        row[f"{part}_{q}"] = value
+            writer.writerow(row)
+
+    if args.plot:
+        _plot(report, stem.with_suffix(".png"))
+
+    print(f"Wrote {stem}.json/.csv")
+
+
+if __name__ == "__main__":
+    main()
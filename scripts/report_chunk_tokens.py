@@ -0,0 +1,81 @@
+"""
+Tokens-per-chunk report for the embedding model.
+
+Chunks the cleaned narratives with the character splitter (compat mode) and
+with token-aware packing, measures every chunk with the embedding model's
+fast tokenizer and compares the distributions: how many chunks would be
+truncated at embed time, how many forward passes are needed and what share
+of the forward-pass capacity carries useful tokens.
+
+Usage:
+    python scripts/report_chunk_tokens.py --limit 50000 --overlap 32
+"""
+import argparse
+import json
+import sys
+
+from rag_chatbot.chunking.columnar import chunk_table
+from rag_chatbot.chunking.tokens import (
+    DEFAULT_TOKEN_OVERLAP,
+    DEFAULT_TOKENIZER,
+    MAX_SEQ_LENGTH,
+    count_tokens,
+    load_tokenizer,
+    token_budget,
+    token_length_report,
+)
+from rag_chatbot.core.settings import settings
+from rag_chatbot.data.handler import DataHandler
+
+COLUMNS = ["complaint_id", "product_category", "consumer_complaint_narrative"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=50_000)
+    parser.add_argument("--model", default=DEFAULT_TOKENIZER)
+    parser.add_argument("--max-seq-length", type=int, default=MAX_SEQ_LENGTH)
+    parser.add_argument("--overlap", type=int, default=DEFAULT_TOKEN_OVERLAP)
+    parser.add_argument("--jobs", type=int, default=1)
+    args = parser.parse_args()
+
+    path = settings.paths.DATA["interim_dir"] / "complaints_clean.parquet"
+    if not path.exists():
+        sys.exit(f"{path} not found; run scripts/run_preprocessing.py first")
+    df = DataHandler(path).load_dataset(columns=COLUMNS).head(args.limit)
+
+    tokenizer = load_tokenizer(args.model)
+    budget = token_budget(tokenizer, args.max_seq_length)
+
+    chars = chunk_table(df, mode="compat", n_jobs=args.jobs)
+    tokens = chunk_table(df, mode="tokens", n_jobs=args.jobs,
+                         tokenizer=tokenizer, max_tokens=budget,
+                         token_overlap=args.overlap)
+
+    report = {
+        "model": args.model,
+        "narratives": len(df),
+        "token_budget": budget,
+        "character_chunks": token_length_report(
+            count_tokens(chars.column("text").to_pylist(), tokenizer), budget),
+        "token_chunks": token_length_report(
+            tokens.column("n_tokens").to_numpy(), budget),
+    }
+
+    for name in ("character_chunks", "token_chunks"):
+        r = report[name]
+        print(
+            f"{name:<17} chunks={r['chunks']:<8,} mean={r['mean']:<6} "
+            f"p50={r['p50']:<4} p99={r['p99']:<4} "
+            f"truncated={r['truncated_share']:.2%}  "
+            f"useful={r['useful_token_ratio']:.2%}"
+        )
+
+    out_path = settings.paths.REPORTS["reports_dir"] / "chunk_tokens.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Large-scale RAG evaluation.
+
+Runs a question set through the pipeline in batches (batched embedding,
+one index search per batch) and scores every answer with
+rag.evaluation.build_evaluation_table. With --llm stub (the default) answers
+come from the deterministic StubLLM, so retrieval metrics can be computed
+for thousands of questions without generation cost.
+
+Questions come from a text file (one per line) or, with --from-dataset N,
+from the first sentence of N sampled complaint narratives.
+
+Writes reports/evaluation/<run>.csv (one row per question) and
+reports/evaluation/<run>.json (mean metrics and stage timings).
+
+Usage:
+    python scripts/run_evaluation.py --from-dataset 5000 --jobs -1
+    python scripts/run_evaluation.py --questions questions.txt --llm real
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+from rag_chatbot.core.settings import settings
+from rag_chatbot.evaluation.harness import EvaluationHarness
+from rag_chatbot.prompt.prompts import get_prompt
+from rag_chatbot.rag.llm import StubLLM, get_llm
+from rag_chatbot.rag.pipeline import ANSWER_MODES, RAGPipeline
+from rag_chatbot.rag.query_embedder import QueryEmbedder
+from rag_chatbot.rag.retriever import Retriever
+
+METRICS = ["precision@k", "faithfulness", "relevancy", "best_score", "num_chunks"]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _questions_from_file(path: Path) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _questions_from_dataset(n: int, seed: int) -> List[str]:
+    from rag_chatbot.data.incremental import read_latest
+
+    path = settings.paths.DATA["interim_dir"] / "complaints_clean.parquet"
+    if not path.exists():
+        sys.exit(f"{path} not found; run scripts/run_preprocessing.py first")
+
+    narratives = read_latest(
+        path, columns=["complaint_id", "consumer_complaint_narrative"]
+    )["consumer_complaint_narrative"].dropna()
+    narratives = narratives.sample(min(n, len(narratives)), random_state=seed)
+
+    return [
+        _SENTENCE_END.split(text.strip(), maxsplit=1)[0][:300]
+        for text in narratives
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--questions", type=Path,
+                        help="Text file with one question per line.")
+    source.add_argument("--from-dataset", type=int, metavar="N",
+                        help="Use the first sentence of N sampled narratives.")
+    parser.add_argument("--llm", choices=["stub", "real"], default="stub")
+    parser.add_argument("--mode", choices=ANSWER_MODES, default="generate")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Metric worker processes (-1 = all cores).")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Answers generated concurrently.")
+    parser.add_argument("--threshold", type=float, default=0.7,
+                        help="Similarity threshold for precision@k.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.questions:
+        questions = _questions_from_file(args.questions)
+    else:
+        questions = _questions_from_dataset(args.from_dataset, args.seed)
+
+    retriever = Retriever.from_store(
+        settings.paths.VECTOR_STORE["fiass_dir"], k=args.k)
+    pipeline = RAGPipeline(
+        embedder=QueryEmbedder(),
+        retriever=retriever,
+        llm=StubLLM() if args.llm == "stub" else get_llm(),
+        prompt=get_prompt(),
+    )
+    harness = EvaluationHarness(
+        pipeline,
+        batch_size=args.batch_size,
+        n_jobs=args.jobs,
+        mode=args.mode,
+        generation_concurrency=args.concurrency,
+    )
+
+    table = harness.evaluate(questions, similarity_threshold=args.threshold)
+
+    run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    summary = {
+        "run": run,
+        "snapshot": retriever.version,
+        "llm": args.llm,
+        "mode": args.mode,
+        "k": args.k,
+        "questions": len(questions),
+        "metrics": {m: round(float(table[m].mean()), 4) for m in METRICS},
+        "timings_s": {k: round(v, 3) for k, v in harness.timings.items()},
+    }
+
+    out_dir = settings.paths.REPORTS["reports_dir"] / "evaluation"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    table.to_csv(out_dir / f"{run}.csv", index=False)
+    with open(out_dir / f"{run}.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(json.dumps(summary, indent=2))
+    print(f"Wrote {out_dir / run}.csv/.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,81 @@
+import argparse
+import itertools
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
 import rag_chatbot.data.filter as fl
 import rag_chatbot.preprocessing.cleaning as cl
 from rag_chatbot.core.settings import settings
 from rag_chatbot.data.handler import DataHandler
+from rag_chatbot.data.incremental import (
+    Watermark,
+    next_run_index,
+    part_template,
+    row_hashes,
+)
 from rag_chatbot.data.validation import validate_rag_ready
+from rag_chatbot.utils.memory import log_memory_report, record_frame_memory
 
+logger = logging.getLogger(__name__)
 
-def run_preprocessing_pipeline() -> None:
-    """
-    End-to-end preprocessing pipeline for RAG:
-    - Load raw CFPB complaints
-    - Normalize schema
-    - Filter products
-    - Drop empty narratives
-    - Clean text for embeddings
-    - Validate RAG readiness
-    - Persist cleaned dataset
-    """
+# complaints_clean.parquet is a hive-partitioned dataset so that downstream
+# jobs can read only the categories/years they need
+PARTITION_COLS = ["product_category", "year"]
 
-    # ------------------------------------------------------------------
-    # Load configuration
-    # ------------------------------------------------------------------
+
+def _load_config() -> Dict[str, Any]:
     cols_cfg = settings.get("columns")
     filters_cfg = settings.get("filters")
 
-    column_mapping = cols_cfg["mapping"]
-    required_columns = set(cols_cfg["required"])
-    allowed_products = filters_cfg["allowed_product_categories"]
+    return {
+        "column_mapping": cols_cfg["mapping"],
+        "required_columns": set(cols_cfg["required"]),
+        "allowed_products": filters_cfg["allowed_product_categories"],
+        "category_mapping": filters_cfg["product_category_mapping"],
+        "column_types": settings.get("types"),
+    }
 
-    # ------------------------------------------------------------------
-    # Load raw data
-    # ------------------------------------------------------------------
-    df_raw = DataHandler.from_registry(
-        section="DATA",
-        path_key="raw_dir",
-        filename="complaints.csv",
-    ).load()
+
+def process_batch(
+    df: pd.DataFrame,
+    cfg: Dict[str, Any],
+    n_jobs: int = 1,
+    memory_report: Optional[Dict[str, float]] = None,
+) -> pd.DataFrame:
+    """
+    Clean, filter and text-normalize one frame of raw complaints.
+
+    If `memory_report` is given, the deep memory footprint (MB) of the frame
+    after each stage is added to it.
+    """
+    record_frame_memory(memory_report, "raw", df)
 
     # ------------------------------------------------------------------
     # Step 1: Schema normalization
     # ------------------------------------------------------------------
     df = cl.clean_and_select_columns(
-        df_raw,
-        column_mapping=column_mapping,
-        required_columns=required_columns,
+        df,
+        column_mapping=cfg["column_mapping"],
+        required_columns=cfg["required_columns"],
+        column_types=cfg.get("column_types"),
     )
+    record_frame_memory(memory_report, "select_columns", df)
 
     # ------------------------------------------------------------------
     # Step 2: Product filtering
     # ------------------------------------------------------------------
-    df = fl.filter_by_products(
+    df = fl.normalize_and_filter_products(
         df,
-        allowed_products=allowed_products,
         product_column="product_category",
+        category_mapping=cfg["category_mapping"],
+        allowed_products=cfg["allowed_products"],
     )
+    record_frame_memory(memory_report, "filter_products", df)
 
     # ------------------------------------------------------------------
     # Step 3: Drop empty narratives
@@ -61,11 +84,250 @@ def run_preprocessing_pipeline() -> None:
         df,
         narrative_column="consumer_complaint_narrative",
     )
+    record_frame_memory(memory_report, "non_empty", df)
 
     # ------------------------------------------------------------------
     # Step 4: Text cleaning (embedding-safe)
     # ------------------------------------------------------------------
-    df = cl.apply_text_cleaning(df)
+    df = cl.apply_text_cleaning(df, n_jobs=n_jobs)
+    record_frame_memory(memory_report, "clean_text", df)
+
+    return df
+
+
+def with_partition_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the derived `year` partition key (from date_received)."""
+    return df.assign(year=df["date_received"].dt.year.astype("Int64"))
+
+
+def _read_raw_batches(
+    raw: DataHandler,
+    cfg: Dict[str, Any],
+    batch_size: int,
+) -> Iterator[pd.DataFrame]:
+    """Read only the mapped columns of the raw file, batch by batch."""
+    return raw.iter_batches(
+        columns=list(cfg["column_mapping"]),
+        batch_size=batch_size,
+        column_types={"Complaint ID": "int64"},
+    )
+
+
+def _stream_batches(
+    raw_batches: Iterable[pd.DataFrame],
+    cfg: Dict[str, Any],
+    n_jobs: int = 1,
+    memory_report: Optional[Dict[str, float]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Process raw batches one at a time.
+
+    validate_rag_ready() runs per batch; a batch whose narratives are all
+    too short is only an error if no batch in the whole stream passes.
+    """
+    yielded = valid_batches = 0
+
+    for i, batch in enumerate(raw_batches):
+        df = process_batch(batch, cfg, n_jobs=n_jobs,
+                           memory_report=memory_report)
+        logger.info("Batch %d: %d raw rows -> %d clean rows",
+                    i, len(batch), len(df))
+
+        if df.empty:
+            continue
+
+        try:
+            validate_rag_ready(df)
+            valid_batches += 1
+        except ValueError:
+            logger.warning("Batch %d: all narratives too short", i)
+
+        yielded += 1
+        yield df
+
+    if yielded and not valid_batches:
+        raise ValueError("All narratives are too short for meaningful retrieval")
+
+
+def _delta_batches(
+    raw_batches: Iterable[pd.DataFrame],
+    watermark: Watermark,
+    processed: List[pd.DataFrame],
+) -> Iterator[pd.DataFrame]:
+    """
+    Keep only raw rows that are new or changed since `watermark`.
+
+    The ids/hashes of the kept rows are appended to `processed` so the
+    watermark can be advanced once the output has been written.
+    """
+    for batch in raw_batches:
+        hashes = row_hashes(batch)
+        mask = watermark.delta_mask(batch["Complaint ID"], hashes)
+        if not mask.any():
+            continue
+
+        delta = batch[mask]
+        processed.append(pd.DataFrame({
+            "complaint_id": delta["Complaint ID"].to_numpy(),
+            "row_hash": hashes[mask],
+            "date_received": delta["Date received"].to_numpy(),
+        }))
+        yield delta
+
+
+def _run_incremental(
+    raw: DataHandler,
+    output: DataHandler,
+    cfg: Dict[str, Any],
+    batch_size: int,
+    n_jobs: int,
+    memory_report: Dict[str, float],
+) -> int:
+    """
+    Process only new/updated complaints and append them to the output
+    dataset as files of a new run, then advance the watermark.
+
+    Returns:
+        Number of clean rows appended
+    """
+    state_path = _watermark_path(output)
+    watermark = Watermark.load(state_path)
+
+    if not len(watermark):
+        # Without state every row counts as new: start the dataset over
+        _remove_output(output)
+    else:
+        logger.info("Watermark: %d complaints, latest date_received %s",
+                    len(watermark), watermark.max_date_received)
+
+    processed: List[pd.DataFrame] = []
+    batches = _stream_batches(
+        _delta_batches(_read_raw_batches(raw, cfg, batch_size),
+                       watermark, processed),
+        cfg,
+        n_jobs,
+        memory_report,
+    )
+
+    first = next(batches, None)
+    rows = 0
+    if first is not None:
+        rows = output.save_dataset(
+            map(with_partition_keys, itertools.chain([first], batches)),
+            partition_cols=PARTITION_COLS,
+            basename_template=part_template(next_run_index(output.filepath)),
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    # Advance the watermark only once the new files are safely written;
+    # rows filtered out of the delta count as processed too
+    if processed:
+        delta = pd.concat(processed, ignore_index=True)
+        watermark.update(
+            delta["complaint_id"],
+            delta["row_hash"].to_numpy(),
+            delta["date_received"],
+        )
+        watermark.save(state_path)
+
+    logger.info("Incremental preprocessing: %d changed raw rows -> %d clean rows",
+                sum(len(p) for p in processed), rows)
+    return rows
+
+
+def _watermark_path(output: DataHandler) -> Path:
+    return output.filepath.with_name(output.filepath.stem + ".watermark.parquet")
+
+
+def _remove_output(output: DataHandler) -> None:
+    """Drop a previous output (single file or part directory) and its state."""
+    if output.filepath.is_dir():
+        shutil.rmtree(output.filepath)
+    elif output.filepath.exists():
+        output.filepath.unlink()
+
+    _watermark_path(output).unlink(missing_ok=True)
+
+
+def run_preprocessing_pipeline(
+    filename: str = "complaints.csv",
+    streaming: bool = False,
+    batch_size: int = 100_000,
+    n_jobs: int = 1,
+    incremental: bool = False,
+) -> Dict[str, float]:
+    """
+    End-to-end preprocessing pipeline for RAG:
+    - Load raw CFPB complaints
+    - Normalize schema
+    - Filter products
+    - Drop empty narratives
+    - Clean text for embeddings
+    - Validate RAG readiness
+    - Persist cleaned dataset
+
+    With `streaming=True` the raw file is read `batch_size` rows at a time
+    (mapped columns only) and each processed batch is written out as it is
+    produced, so peak memory no longer grows with the file size.
+    `n_jobs` fans narrative cleaning out over a process pool (-1 = all cores).
+
+    With `incremental=True` (implies streaming) only complaints that are new
+    or changed since the last incremental run are processed, and they are
+    appended to the complaints_clean.parquet dataset as a new run. The
+    watermark (latest date_received + processed complaint_id/row hashes) is
+    kept next to the output. Read the dataset with
+    `rag_chatbot.data.incremental.read_latest` to get only the newest
+    version of updated complaints.
+
+    The output is a parquet dataset partitioned by product_category and
+    year of date_received (see DataHandler.load_dataset).
+
+    Returns the per-stage memory footprint (MB, summed over batches when
+    streaming), which is also logged and written to
+    reports/preprocessing_memory.json.
+    """
+
+    # ------------------------------------------------------------------
+    # Load configuration
+    # ------------------------------------------------------------------
+    cfg = _load_config()
+
+    raw = DataHandler.from_registry(
+        section="DATA",
+        path_key="raw_dir",
+        filename=filename,
+    )
+    output = DataHandler.from_registry(
+        section="DATA",
+        path_key="interim_dir",
+        filename="complaints_clean.parquet",
+    )
+
+    memory_report: Dict[str, float] = {}
+
+    if incremental:
+        _run_incremental(raw, output, cfg, batch_size, n_jobs, memory_report)
+        return _write_memory_report(memory_report)
+
+    # A full run replaces any incremental dataset and its watermark
+    _remove_output(output)
+
+    if streaming:
+        rows = output.save_dataset(
+            map(with_partition_keys,
+                _stream_batches(_read_raw_batches(raw, cfg, batch_size),
+                                cfg, n_jobs, memory_report)),
+            partition_cols=PARTITION_COLS,
+        )
+        logger.info("Streaming preprocessing wrote %d rows", rows)
+        return _write_memory_report(memory_report)
+
+    # ------------------------------------------------------------------
+    # Load raw data (mapped columns only)
+    # ------------------------------------------------------------------
+    raw.kwargs.setdefault("usecols", list(cfg["column_mapping"]))
+    df = process_batch(raw.load(), cfg, n_jobs=n_jobs,
+                       memory_report=memory_report)
 
     # ------------------------------------------------------------------
     # Step 5: Validation
@@ -75,12 +337,43 @@ def run_preprocessing_pipeline() -> None:
     # ------------------------------------------------------------------
     # Step 6: Persist cleaned data
     # ------------------------------------------------------------------
-    DataHandler.from_registry(
-        section="DATA",
-        path_key="interim_dir",
-        filename="complaints_clean.parquet",
-    ).save(df)
+    output.save_dataset(with_partition_keys(df), partition_cols=PARTITION_COLS)
+
+    return _write_memory_report(memory_report)
+
+
+def _write_memory_report(memory_report: Dict[str, float]) -> Dict[str, float]:
+    log_memory_report(memory_report)
+
+    out_path = settings.paths.REPORTS["reports_dir"] / "preprocessing_memory.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"stages_mb": memory_report}, f, indent=2)
+
+    return memory_report
 
 
 if __name__ == "__main__":
-    run_preprocessing_pipeline()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Clean raw CFPB complaints for RAG.")
+    parser.add_argument("filename", nargs="?", default="complaints.csv",
+                        help="Raw CSV file name inside data/raw.")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Process the raw file in bounded-memory batches.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process complaints that are new or changed "
+                             "since the last incremental run.")
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Cleaning worker processes (-1 = all cores).")
+    args = parser.parse_args()
+
+    run_preprocessing_pipeline(
+        filename=args.filename,
+        streaming=args.streaming,
+        batch_size=args.batch_size,
+        n_jobs=args.jobs,
+        incremental=args.incremental,
+    )
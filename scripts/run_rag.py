@@ -6,14 +6,10 @@ from rag_chatbot.rag.pipeline import RAGPipeline
 from rag_chatbot.core.settings import settings
 from rag_chatbot.ui.app_gradio import launch_ui
 
-persist_path = settings.paths.VECTOR_STORE["fiass_dir"]
-
 rag = RAGPipeline(
     embedder=QueryEmbedder(),
-    retriever=Retriever(
-        persist_path / "faiss.index",
-        persist_path / "metadata.parquet",
-    ),
+    # CURRENT snapshot of the versioned vector store
+    retriever=Retriever.from_store(settings.paths.VECTOR_STORE["fiass_dir"]),
     llm=get_llm(),
     prompt=get_prompt(),
 )
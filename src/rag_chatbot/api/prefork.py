@@ -0,0 +1,378 @@
+"""
+Pre-fork serving of the HTTP API.
+
+The master process loads the read-only assets once (FAISS index, chunk
+metadata, narrative store, embedding model, GGUF model), binds the
+listening socket and forks N workers that serve the API from it:
+
+- the FAISS index and narrative store are memory-mapped, so every worker
+  reads the same page-cache pages;
+- the embedding model weights and metadata frame are inherited
+  copy-on-write; gc.freeze() before forking keeps the collector from
+  dirtying the pages of the objects loaded by the master;
+- the GGUF model is mmap'd by llama.cpp.
+
+Components are loaded without warmup so that no OpenMP/torch thread pool
+exists at fork time (GNU OpenMP does not survive fork); each worker sets
+its CPU affinity and thread counts, then warms up on its own.
+
+Every `memory_interval_s` the master writes per-process RSS, PSS and USS
+(unique set size: pages only that process maps) from
+/proc/<pid>/smaps_rollup to reports/worker_memory.json. A worker's USS is
+what it costs on top of the shared pages.
+
+Usage:
+    python -m rag_chatbot.api.prefork --workers 4 --cpu-affinity spread
+    python -m rag_chatbot.api.prefork --workers 2 --cpu-affinity "0-3;4-7"
+"""
+import gc
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence
+
+from rag_chatbot.utils.memory import process_memory_mb
+
+if TYPE_CHECKING:
+    from rag_chatbot.core.resources import ResourcePlan
+
+logger = logging.getLogger(__name__)
+
+AFFINITY_MODES = ("none", "spread")
+
+
+# ------------------------------------------------------------------
+# CPU affinity
+# ------------------------------------------------------------------
+
+def _parse_cpus(spec: str) -> List[int]:
+    """'0-3,8' -> [0, 1, 2, 3, 8]"""
+    cpus: List[int] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-")
+            cpus.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+
+def plan_cpu_sets(
+    workers: int,
+    affinity: str = "none",
+    available: Optional[Sequence[int]] = None,
+) -> List[Optional[List[int]]]:
+    """
+    CPUs per worker.
+
+    Args:
+        workers: Number of workers
+        affinity: "none" (no pinning), "spread" (split the available CPUs
+            into equal disjoint slices) or explicit per-worker sets
+            separated by ";", e.g. "0-3;4-7" (reused round-robin)
+        available: CPUs to split (default: this process's affinity mask)
+    """
+    if affinity == "none":
+        return [None] * workers
+
+    if affinity == "spread":
+        if available is None:
+            from rag_chatbot.core.resources import available_cpus
+            available = available_cpus()
+        available = list(available)
+        per_worker = len(available) // workers
+        if per_worker < 1:
+            raise ValueError(
+                f"Cannot spread {len(available)} CPUs over {workers} workers")
+        return [
+            available[i * per_worker:(i + 1) * per_worker]
+            for i in range(workers)
+        ]
+
+    sets = [_parse_cpus(s) for s in affinity.split(";") if s.strip()]
+    if not sets:
+        raise ValueError(f"Invalid CPU affinity '{affinity}'")
+    return [sets[i % len(sets)] for i in range(workers)]
+
+
+def configure_worker_threads(cpus: Optional[Sequence[int]]) -> "ResourcePlan":
+    """
+    Pin this process to `cpus` and budget the stage thread pools within
+    them (core.resources); returns the worker's plan.
+    """
+    from rag_chatbot.core.resources import ResourcePlan, apply_thread_limits
+    from rag_chatbot.core.settings import settings
+
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+
+    # Budgets the CPUs of the (new) affinity mask
+    plan = ResourcePlan.from_config(settings.get("resources", {}))
+    apply_thread_limits(plan)
+    return plan
+
+
+# ------------------------------------------------------------------
+# Server
+# ------------------------------------------------------------------
+
+class PreforkServer:
+    """
+    Fork `workers` processes that serve `app` (an ASGI app built in the
+    master) from one shared listening socket; crashed workers are
+    replaced until the master receives SIGTERM or SIGINT.
+
+    Args:
+        app: ASGI app, built after the shared assets are loaded
+        host, port: Address to bind
+        workers: Number of worker processes
+        cpu_sets: Per-worker CPU lists (see plan_cpu_sets)
+        on_worker_start: Called in each worker after pinning, before
+            serving (warmup, starting watcher threads)
+        keep_alive_s: HTTP keep-alive timeout
+        memory_report_path: Where the master writes per-process memory
+        memory_interval_s: Seconds between memory reports
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int = 2,
+        cpu_sets: Optional[List[Optional[List[int]]]] = None,
+        on_worker_start: Optional[Callable[[int], None]] = None,
+        keep_alive_s: int = 30,
+        memory_report_path: Optional[Path] = None,
+        memory_interval_s: float = 30.0,
+    ):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.cpu_sets = cpu_sets or [None] * workers
+        self.on_worker_start = on_worker_start
+        self.keep_alive_s = keep_alive_s
+        self.memory_report_path = memory_report_path
+        self.memory_interval_s = memory_interval_s
+
+        self._children: Dict[int, int] = {}  # pid -> worker index
+        self._stopping = False
+        self._socket: Optional[socket.socket] = None
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _serve_worker(self, index: int) -> None:
+        """Body of a forked worker; never returns."""
+        import uvicorn
+
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            configure_worker_threads(self.cpu_sets[index])
+            if self.on_worker_start is not None:
+                self.on_worker_start(index)
+
+            config = uvicorn.Config(
+                self.app,
+                timeout_keep_alive=self.keep_alive_s,
+                log_level="info",
+            )
+            uvicorn.Server(config).run(sockets=[self._socket])
+        except Exception:
+            logger.exception("Worker %d failed", index)
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._serve_worker(index)
+        self._children[pid] = index
+        logger.info("Started worker %d (pid %d, cpus %s)",
+                    index, pid, self.cpu_sets[index] or "all")
+
+    def _stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def memory_report(self) -> Dict[str, Any]:
+        """RSS/PSS/USS of the master and every worker (MB)."""
+        workers = {}
+        for pid, index in sorted(self._children.items(), key=lambda x: x[1]):
+            memory = process_memory_mb(pid)
+            if memory is not None:
+                workers[str(index)] = {
+                    "pid": pid, "cpus": self.cpu_sets[index], **memory}
+
+        report: Dict[str, Any] = {
+            "generated_at": time.time(),
+            "master": process_memory_mb(os.getpid()),
+            "workers": workers,
+        }
+        if workers:
+            report["sum_rss_mb"] = round(
+                sum(w["rss_mb"] for w in workers.values()), 3)
+            report["sum_pss_mb"] = round(
+                sum(w["pss_mb"] for w in workers.values()), 3)
+            report["sum_uss_mb"] = round(
+                sum(w["uss_mb"] for w in workers.values()), 3)
+        return report
+
+    def _write_memory_report(self) -> None:
+        report = self.memory_report()
+        logger.info("Worker memory (MB): %s", {
+            i: {k: w[k] for k in ("rss_mb", "pss_mb", "uss_mb")}
+            for i, w in report["workers"].items()
+        })
+        if self.memory_report_path is None:
+            return
+
+        path = Path(self.memory_report_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, path)
+
+    def run(self) -> None:
+        """Bind, fork the workers and supervise them until stopped."""
+        self._socket = self._bind()
+
+        # Objects loaded so far are never collected: the collector would
+        # otherwise write to their pages and break copy-on-write sharing
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        for index in range(self.workers):
+            self._spawn(index)
+
+        next_report = time.monotonic() + self.memory_interval_s
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+
+            if pid:
+                index = self._children.pop(pid)
+                if not self._stopping:
+                    logger.warning("Worker %d (pid %d) exited with %d; restarting",
+                                   index, pid, os.waitstatus_to_exitcode(status))
+                    self._spawn(index)
+                continue
+
+            if not self._stopping and time.monotonic() >= next_report:
+                self._write_memory_report()
+                next_report = time.monotonic() + self.memory_interval_s
+
+            time.sleep(0.2)
+
+        self._socket.close()
+
+
+# ------------------------------------------------------------------
+# Entry point
+# ------------------------------------------------------------------
+
+def main() -> None:
+    import argparse
+
+    from rag_chatbot.api.server import create_app
+    from rag_chatbot.core.resources import ResourcePlan, StageExecutors
+    from rag_chatbot.core.settings import settings
+    from rag_chatbot.prompt.prompts import get_prompt
+    from rag_chatbot.rag.cache import (
+        response_cache_from_config,
+        retrieval_cache_from_config,
+    )
+    from rag_chatbot.rag.loader import PipelineLoader
+
+    api_cfg = settings.get("api", {}) or {}
+    cfg = settings.get("prefork", {}) or {}
+
+    parser = argparse.ArgumentParser(description="Pre-fork RAG HTTP API")
+    parser.add_argument("--host", default=api_cfg.get("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=api_cfg.get("port", 8000))
+    parser.add_argument("--workers", type=int, default=cfg.get("workers", 2))
+    parser.add_argument("--cpu-affinity", default=cfg.get("cpu_affinity", "none"),
+                        help='"none", "spread" or per-worker sets like "0-3;4-7".')
+    parser.add_argument("--concurrency", type=int,
+                        default=api_cfg.get("concurrency", 1),
+                        help="Requests using the pipeline at once, per worker.")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(process)d %(name)s: %(message)s")
+
+    reports_dir = settings.paths.REPORTS["reports_dir"]
+    reload_interval_s = api_cfg.get("reload_interval_s", 30)
+
+    # Load once in the master, without warmup and without watcher threads
+    loader = PipelineLoader(
+        store_root=settings.paths.VECTOR_STORE["fiass_dir"],
+        prompt=get_prompt(),
+        mmap_index=True,
+        warmup=False,
+        coalesce=api_cfg.get("coalesce", True),
+        # The SQLite tier is opened per worker and shared between them
+        response_cache=response_cache_from_config(
+            settings.get("response_cache", {}), root=settings.root),
+        # Per worker: each fills its own copy after the fork
+        retrieval_cache=retrieval_cache_from_config(
+            settings.get("retrieval_cache", {})),
+        compression=settings.get("compression", {}),
+    ).start()
+    pipeline = loader.wait()
+    if pipeline is None:
+        sys.exit("Pipeline did not load")
+    logger.info("Assets loaded in master: %s", loader.startup_report())
+
+    def on_worker_start(index: int) -> None:
+        # Stage pools sized to this worker's CPUs (created after the fork)
+        pipeline.executors = StageExecutors(
+            ResourcePlan.from_config(settings.get("resources", {})))
+        loader.warm_up()
+        if reload_interval_s:
+            # Each worker maps newly published snapshots itself; the pages
+            # are still shared through the page cache
+            pipeline.retriever.start_watching(reload_interval_s)
+
+    server = PreforkServer(
+        create_app(pipeline, concurrency=args.concurrency,
+                   max_batch=api_cfg.get("max_batch", 64)),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        cpu_sets=plan_cpu_sets(args.workers, args.cpu_affinity),
+        on_worker_start=on_worker_start,
+        keep_alive_s=api_cfg.get("keep_alive_s", 30),
+        memory_report_path=reports_dir / "worker_memory.json",
+        memory_interval_s=cfg.get("memory_interval_s", 30),
+    )
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
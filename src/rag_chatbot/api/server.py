@@ -0,0 +1,316 @@
+"""
+Async HTTP API (JSON in/out) over RAGPipeline.
+
+Endpoints:
+    POST /query         {"query", "mode", "filters"} -> answer, confidence,
+                        sources
+    POST /query/batch   {"queries", "mode", "filters"} -> {"results": [...]};
+                        one embedding call and one index search for the batch
+    POST /query/stream  {"query", "mode", "filters"} -> text/event-stream of
+                        "token" events, then "done" with the full result
+    GET  /health        liveness (the process is serving)
+    GET  /ready         readiness (models and index loaded); 503 until then
+    GET  /metrics       per-stage p50/p95/p99 latencies, single-flight
+                        and cache counters
+
+`filters` maps metadata columns to a value or a list of accepted values,
+e.g. {"product_category": ["Credit card", "Savings account"]}. Concurrent
+/query requests with the same normalized query, mode and filters share
+one pipeline run when coalescing is enabled (api.coalesce).
+
+Requests are awaited on the server's event loop; pipeline work
+(embedding, search, generation) runs on the pipeline's stage thread
+pools (core.resources.StageExecutors), so the loop only parses requests
+and writes responses. A pipeline built without executors gets the
+configured ones for the lifetime of the app. At most
+`concurrency` requests use the pipeline at a time, the rest wait on the
+loop without holding a thread. The Gradio UI can be mounted on the same
+app (--ui) as a thin client of the same pipeline.
+
+Usage:
+    python -m rag_chatbot.api.server --port 8000 --ui
+"""
+import asyncio
+import json
+import logging
+import math
+from contextlib import asynccontextmanager
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Union,
+)
+
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from rag_chatbot.core.resources import StageExecutors, get_resource_plan
+from rag_chatbot.rag.loader import PipelineLoader
+from rag_chatbot.rag.pipeline import RAGPipeline
+from rag_chatbot.rag.singleflight import flight_key
+from rag_chatbot.utils.timing import registry
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_CHARS = 2000
+
+AnswerMode = Literal["generate", "extractive"]
+Query = Annotated[str, Field(min_length=1, max_length=MAX_QUERY_CHARS)]
+FilterValue = Union[str, int, List[Union[str, int]]]
+
+
+# ------------------------------------------------------------------
+# Schemas (flat, constraint-only: validated in pydantic-core)
+# ------------------------------------------------------------------
+
+class QueryRequest(BaseModel):
+    query: Query
+    mode: AnswerMode = "generate"
+    filters: Optional[Dict[str, FilterValue]] = None
+
+
+class BatchQueryRequest(BaseModel):
+    queries: List[Query] = Field(min_length=1)
+    mode: AnswerMode = "generate"
+    filters: Optional[Dict[str, FilterValue]] = None
+
+
+def _to_builtin(obj: Any) -> Any:
+    """numpy scalars -> Python, NaN -> None, recursively (JSON-safe)."""
+    if isinstance(obj, dict):
+        return {k: _to_builtin(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_builtin(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(_to_builtin(data))}\n\n"
+
+
+# ------------------------------------------------------------------
+# App
+# ------------------------------------------------------------------
+
+def create_app(
+    rag: Union[RAGPipeline, PipelineLoader],
+    concurrency: int = 1,
+    max_batch: int = 64,
+) -> FastAPI:
+    """
+    Build the API around a ready RAGPipeline or a PipelineLoader (started
+    on app startup if needed; requests get 503 until it is ready).
+
+    Args:
+        rag: Pipeline or loader
+        concurrency: Requests using the pipeline at the same time
+        max_batch: Largest accepted /query/batch
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if isinstance(rag, PipelineLoader):
+            rag.start()
+            yield
+            return
+
+        # Stages must run off the loop (the loader's pipelines have executors)
+        owned = None
+        if rag.executors is None:
+            owned = rag.executors = StageExecutors(get_resource_plan())
+        try:
+            yield
+        finally:
+            if owned is not None:
+                rag.executors = None
+                owned.shutdown()
+
+    app = FastAPI(title="CrediTrust Complaint RAG API", lifespan=lifespan)
+    slots = asyncio.Semaphore(concurrency)
+
+    def _pipeline() -> RAGPipeline:
+        if not isinstance(rag, PipelineLoader):
+            return rag
+        try:
+            pipeline = rag.wait(timeout=0)
+        except RuntimeError as exc:
+            raise HTTPException(status_code=503, detail=str(exc))
+        if pipeline is None:
+            raise HTTPException(status_code=503, detail="warming up")
+        return pipeline
+
+    @app.post("/query")
+    async def query(request: QueryRequest) -> JSONResponse:
+        pipeline = _pipeline()
+
+        async def _answer() -> Dict[str, Any]:
+            async with slots:
+                return await pipeline.arun(
+                    request.query, request.mode, request.filters, coalesce=False)
+
+        try:
+            if pipeline.singleflight is None:
+                result = await _answer()
+            else:
+                # Coalesce on the loop, before the semaphore: followers
+                # wait for the leader without queueing for a slot
+                key = flight_key(request.query, request.mode, request.filters)
+                result = {**await pipeline.singleflight.do(key, _answer),
+                          "query": request.query}
+        except ValueError as exc:
+            # Unknown filter column
+            raise HTTPException(status_code=422, detail=str(exc))
+        return JSONResponse(_to_builtin(result))
+
+    @app.post("/query/batch")
+    async def query_batch(request: BatchQueryRequest) -> JSONResponse:
+        if len(request.queries) > max_batch:
+            raise HTTPException(
+                status_code=422,
+                detail=f"At most {max_batch} queries per batch")
+
+        pipeline = _pipeline()
+
+        async with slots:
+            try:
+                results = await pipeline.arun_batch(
+                    request.queries, request.mode, request.filters)
+            except ValueError as exc:
+                raise HTTPException(status_code=422, detail=str(exc))
+        return JSONResponse({"results": _to_builtin(results)})
+
+    @app.post("/query/stream")
+    async def query_stream(request: QueryRequest) -> StreamingResponse:
+        pipeline = _pipeline()
+
+        async def _events() -> AsyncIterator[str]:
+            async with slots:
+                async for event in pipeline.astream(
+                        request.query, request.mode, request.filters):
+                    yield _sse(event["event"], event["data"])
+
+        return StreamingResponse(
+            _events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.get("/health")
+    async def health() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/ready")
+    async def ready() -> JSONResponse:
+        if not isinstance(rag, PipelineLoader):
+            return JSONResponse({"state": "ready"})
+        status = rag.status()
+        return JSONResponse(
+            status, status_code=200 if status["state"] == "ready" else 503)
+
+    @app.get("/metrics")
+    async def metrics() -> Dict[str, Any]:
+        body: Dict[str, Any] = {"stages": registry.summary()}
+        if isinstance(rag, PipelineLoader):
+            if not rag.ready:
+                return body
+            pipeline = rag.wait(timeout=0)
+        else:
+            pipeline = rag
+
+        counters = {
+            "singleflight": pipeline.singleflight,
+            "response_cache": pipeline.response_cache,
+            "retrieval_cache": getattr(pipeline.retriever, "cache", None),
+        }
+        for name, source in counters.items():
+            if source is not None:
+                body[name] = source.stats()
+        return body
+
+    return app
+
+
+# ------------------------------------------------------------------
+# Entry point
+# ------------------------------------------------------------------
+
+def main() -> None:
+    import argparse
+
+    import uvicorn
+
+    from rag_chatbot.core.settings import settings
+    from rag_chatbot.prompt.prompts import get_prompt
+    from rag_chatbot.rag.cache import (
+        response_cache_from_config,
+        retrieval_cache_from_config,
+    )
+    from rag_chatbot.utils.timing import start_periodic_export
+
+    cfg = settings.get("api", {}) or {}
+
+    parser = argparse.ArgumentParser(description="RAG HTTP API")
+    parser.add_argument("--host", default=cfg.get("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=cfg.get("port", 8000))
+    parser.add_argument("--concurrency", type=int,
+                        default=cfg.get("concurrency", 1))
+    parser.add_argument("--ui", action="store_true",
+                        help="Mount the Gradio UI at /ui.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    loader = PipelineLoader(
+        store_root=settings.paths.VECTOR_STORE["fiass_dir"],
+        reload_interval_s=cfg.get("reload_interval_s", 30),
+        prompt=get_prompt(),
+        report_path=settings.paths.REPORTS["reports_dir"] / "startup_report.json",
+        coalesce=cfg.get("coalesce", True),
+        response_cache=response_cache_from_config(
+            settings.get("response_cache", {}), root=settings.root),
+        retrieval_cache=retrieval_cache_from_config(
+            settings.get("retrieval_cache", {})),
+        compression=settings.get("compression", {}),
+    ).start()
+
+    start_periodic_export(
+        settings.paths.REPORTS["reports_dir"] / "latency_metrics.json",
+        interval_s=60,
+    )
+
+    app = create_app(
+        loader,
+        concurrency=args.concurrency,
+        max_batch=cfg.get("max_batch", 64),
+    )
+
+    if args.ui:
+        import gradio as gr
+
+        from rag_chatbot.ui.app import build_ui
+
+        app = gr.mount_gradio_app(app, build_ui(loader), path="/ui")
+
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        # Keep client connections open between requests
+        timeout_keep_alive=cfg.get("keep_alive_s", 30),
+        log_level="info",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from rag_chatbot.chunking.tokens import (
+    DEFAULT_TOKEN_OVERLAP,
+    load_tokenizer,
+    token_budget,
+    token_split_batch,
+)
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    from langchain_text_splitters import TextSplitter
+    from transformers import PreTrainedTokenizerFast
+
+ChunkMode = Literal["compat", "fast", "tokens"]
+
+# Columns of the chunk table, in order ("tokens" mode adds n_tokens)
+CHUNK_COLUMNS = (
+    "text", "complaint_id", "product_category", "chunk_id", "start", "end",
+    "narrative_row",
+)
+
+# Fast mode: boundaries tried from the end of the window, best first
+_FAST_BOUNDARIES = ("\n\n", "\n", ".", " ")
+
+
+# ------------------------------------------------------------------------------
+# Splitting with offsets
+# ------------------------------------------------------------------------------
+
+def split_with_offsets(
+    splitter: "TextSplitter",
+    text: str,
+) -> List[Tuple[str, int, int]]:
+    """
+    Split `text` with a LangChain splitter and locate each chunk in it.
+
+    Chunks are identical to `splitter.split_text(text)`; offsets are found
+    the same way LangChain computes `start_index` (search from the previous
+    chunk's start, minus the overlap).
+
+    Returns:
+        (chunk, start, end) triples with text[start:end] == chunk
+    """
+    spans = []
+    index = previous_len = 0
+
+    for chunk in splitter.split_text(text):
+        offset = index + previous_len - splitter._chunk_overlap
+        found = text.find(chunk, max(0, offset))
+        if found == -1:
+            found = text.find(chunk)
+        index, previous_len = max(found, 0), len(chunk)
+        spans.append((chunk, index, index + len(chunk)))
+
+    return spans
+
+
+def fast_split(
+    text: str,
+    chunk_size: int = 500,
+    chunk_overlap: int = 100,
+) -> List[Tuple[str, int, int]]:
+    """
+    Single-pass sliding-window splitter.
+
+    Each window of at most `chunk_size` characters is cut at the last
+    paragraph, line, sentence or word boundary in its second half, and the
+    next window starts `chunk_overlap` characters before the cut (moved
+    forward to a word start). Chunks are whitespace-stripped slices of
+    `text`, so offsets come for free. Not identical to the recursive
+    splitter; use compat mode when that matters.
+    """
+    spans = []
+    n = len(text)
+    start = 0
+
+    while start < n:
+        end = min(start + chunk_size, n)
+
+        if end < n:
+            floor = start + chunk_size // 2
+            for boundary in _FAST_BOUNDARIES:
+                cut = text.rfind(boundary, floor, end)
+                if cut != -1:
+                    end = cut + (1 if boundary == "." else 0)
+                    break
+
+        # Strip whitespace without losing the offsets
+        lo, hi = start, end
+        while lo < hi and text[lo].isspace():
+            lo += 1
+        while hi > lo and text[hi - 1].isspace():
+            hi -= 1
+        if hi > lo:
+            spans.append((text[lo:hi], lo, hi))
+
+        if end >= n:
+            break
+
+        next_start = max(end - chunk_overlap, start + 1)
+        # Do not start the overlap in the middle of a word
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 and next_start > start + 1 else next_start
+
+    return spans
+
+
+# ------------------------------------------------------------------------------
+# Columnar chunking
+# ------------------------------------------------------------------------------
+
+def _chunk_partition(
+    args: Tuple[Sequence[Any], int, ChunkMode, Dict[str, Any]]
+) -> Dict[str, List]:
+    texts, offset, mode, options = args
+
+    # Skip empty narratives defensively
+    rows = [
+        i for i, text in enumerate(texts)
+        if isinstance(text, str) and text.strip()
+    ]
+
+    if mode == "tokens":
+        # One batched tokenizer call per partition
+        all_spans = token_split_batch(
+            [texts[i] for i in rows],
+            options["tokenizer"],
+            options["max_tokens"],
+            options["token_overlap"],
+        )
+    elif mode == "compat":
+        all_spans = [split_with_offsets(options["splitter"], texts[i])
+                     for i in rows]
+    else:
+        all_spans = [
+            fast_split(texts[i], options["chunk_size"], options["chunk_overlap"])
+            for i in rows
+        ]
+
+    out: Dict[str, List] = {
+        "row": [], "text": [], "chunk_id": [], "start": [], "end": [],
+        "n_tokens": [],
+    }
+    for i, spans in zip(rows, all_spans):
+        for chunk_id, (chunk, start, end, *n_tokens) in enumerate(spans):
+            out["row"].append(offset + i)
+            out["text"].append(chunk)
+            out["chunk_id"].append(chunk_id)
+            out["start"].append(start)
+            out["end"].append(end)
+            out["n_tokens"].extend(n_tokens)
+
+    return out
+
+
+def chunk_table(
+    df: pd.DataFrame,
+    mode: ChunkMode = "compat",
+    n_jobs: int = 1,
+    partition_size: int = 10_000,
+    splitter: Optional["TextSplitter"] = None,
+    text_column: str = "consumer_complaint_narrative",
+    tokenizer: Optional["PreTrainedTokenizerFast"] = None,
+    max_tokens: Optional[int] = None,
+    token_overlap: int = DEFAULT_TOKEN_OVERLAP,
+) -> "pa.Table":
+    """
+    Chunk every narrative of `df` into an Arrow table.
+
+    Works on the column arrays (no per-row Series) and can fan partitions
+    out across a process pool. In "compat" mode the chunks are exactly those
+    of `splitter` (the project's text_splitter by default); "fast" mode
+    uses fast_split with the splitter's size/overlap. "tokens" mode measures
+    length with the embedding model's fast tokenizer and packs chunks up to
+    `max_tokens` tokens (default: the model's sequence budget) with
+    `token_overlap` tokens of overlap, so nothing is truncated at embed
+    time; the table then has an extra `n_tokens` column.
+
+    Args:
+        df: Frame with text_column, complaint_id and product_category
+        mode: "compat", "fast" or "tokens"
+        n_jobs: Worker processes; -1 uses every core, 1 runs in-process
+        partition_size: Narratives per task sent to a worker
+        splitter: LangChain splitter used in compat mode
+        text_column: Column holding the narratives
+        tokenizer: Fast tokenizer for "tokens" mode (loaded from
+            DEFAULT_TOKENIZER if None)
+        max_tokens: Token budget per chunk in "tokens" mode
+        token_overlap: Tokens shared by consecutive chunks in "tokens" mode
+
+    Returns:
+        pyarrow.Table with columns CHUNK_COLUMNS; chunk_id restarts at 0
+        for every complaint and text == narrative[start:end], where
+        narrative is row `narrative_row` of `df`
+
+    Raises:
+        ValueError: If required columns are missing or mode is unknown
+    """
+    import pyarrow as pa
+
+    missing = {text_column, "complaint_id", "product_category"} - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns for chunking: {missing}")
+
+    if mode not in ("compat", "fast", "tokens"):
+        raise ValueError(f"Unknown chunking mode '{mode}'")
+
+    if splitter is None:
+        from rag_chatbot.chunking.text_splitter import text_splitter as splitter
+
+    options: Dict[str, Any] = {
+        "splitter": splitter,
+        "chunk_size": splitter._chunk_size,
+        "chunk_overlap": splitter._chunk_overlap,
+    }
+    if mode == "tokens":
+        tokenizer = tokenizer or load_tokenizer()
+        options.update(
+            tokenizer=tokenizer,
+            max_tokens=max_tokens or token_budget(tokenizer),
+            token_overlap=token_overlap,
+        )
+
+    texts = df[text_column].tolist()
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+
+    tasks = [
+        (texts[i:i + partition_size], i, mode, options)
+        for i in range(0, len(texts), partition_size)
+    ]
+
+    if n_jobs <= 1 or len(tasks) <= 1:
+        parts = [_chunk_partition(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            parts = list(executor.map(_chunk_partition, tasks))
+
+    rows = pa.array([r for p in parts for r in p["row"]], pa.int64())
+
+    columns = {
+        "text": pa.array([t for p in parts for t in p["text"]], pa.string()),
+        # Per-complaint columns are gathered once from the input arrays
+        "complaint_id": pa.array(df["complaint_id"], from_pandas=True).take(rows),
+        "product_category": pa.array(
+            df["product_category"], from_pandas=True).take(rows),
+        "chunk_id": pa.array(
+            [c for p in parts for c in p["chunk_id"]], pa.int32()),
+        "start": pa.array([s for p in parts for s in p["start"]], pa.int64()),
+        "end": pa.array([e for p in parts for e in p["end"]], pa.int64()),
+        # Position of the source narrative in `df`
+        "narrative_row": rows,
+    }
+    if mode == "tokens":
+        columns["n_tokens"] = pa.array(
+            [n for p in parts for n in p["n_tokens"]], pa.int32())
+
+    return pa.table(columns)
+
+
+def table_to_documents(table: "pa.Table") -> List[Dict[str, Any]]:
+    """Convert a chunk table to chunk_documents' list-of-dicts format."""
+    columns = table.select(
+        ["text", "complaint_id", "product_category", "chunk_id"]
+    ).to_pydict()
+
+    return [
+        {
+            "text": text,
+            "metadata": {
+                "complaint_id": complaint_id,
+                "product_category": product_category,
+                "chunk_id": chunk_id,
+            },
+        }
+        for text, complaint_id, product_category, chunk_id in zip(
+            columns["text"],
+            columns["complaint_id"],
+            columns["product_category"],
+            columns["chunk_id"],
+        )
+    ]
@@ -1,5 +1,21 @@
+import numpy as np
 import pandas as pd
-from typing import Hashable
+from typing import Hashable, Iterable, Optional
+
+
+def _allocate(counts: pd.Series, total_samples: int) -> pd.Series:
+    """
+    Proportional allocation per stratum: at least one row per stratum,
+    never more than the stratum holds.
+    """
+    ratios = counts / counts.sum()
+    alloc = (total_samples * ratios).round().astype(int).clip(lower=1)
+    return np.minimum(alloc, counts)
+
+
+def _validate(total_samples: int) -> None:
+    if total_samples <= 0:
+        raise ValueError("total_samples must be a positive integer.")
 
 
 def stratified_sample(
@@ -12,6 +28,9 @@ def stratified_sample(
     Perform stratified sampling while approximately preserving
     category proportions.
 
+    Vectorized: one groupby().sample(frac=...) draws round(total * ratio)
+    rows from every stratum, instead of a boolean scan per category.
+
     Args:
         df: Input DataFrame.
         group_col: Column name used for stratification.
@@ -30,43 +49,180 @@ def stratified_sample(
     if group_col not in df.columns:
         raise ValueError(f"Column '{group_col}' not found in DataFrame.")
 
-    if total_samples <= 0:
-        raise ValueError("total_samples must be a positive integer.")
+    _validate(total_samples)
 
     total_samples = min(total_samples, len(df))
 
-    # Proportions per group
-    proportions = df[group_col].value_counts(normalize=True)
+    counts = df[group_col].value_counts()
+    counts = counts[counts > 0]
+    if counts.empty:
+        raise ValueError(f"Column '{group_col}' has no values to stratify on.")
+
+    # groupby().sample rounds frac * len(stratum) per stratum, which is the
+    # proportional allocation
+    frac = min(1.0, total_samples / counts.sum())
+    selected = df.groupby(group_col, observed=True).sample(
+        frac=frac, random_state=random_state)
+
+    # Strata rounded down to nothing still get one row
+    missed = counts.index.difference(selected[group_col].unique())
+    if len(missed):
+        selected = pd.concat([
+            selected,
+            df[df[group_col].isin(missed)]
+            .groupby(group_col, observed=True)
+            .sample(n=1, random_state=random_state),
+        ])
 
-    samples = []
-    allocated = 0
+    # Adjust size if rounding caused over/under sampling
+    if len(selected) > total_samples:
+        selected = selected.sample(n=total_samples, random_state=random_state)
+    elif len(selected) < total_samples:
+        remaining = df.drop(index=selected.index)
+        selected = pd.concat([
+            selected,
+            remaining.sample(n=total_samples - len(selected),
+                             random_state=random_state),
+        ])
+
+    return selected.sample(
+        frac=1, random_state=random_state
+    ).reset_index(drop=True)
 
-    for category, ratio in proportions.items():
-        n = max(1, int(round(total_samples * ratio)))
-        subset = df[df[group_col] == category]
 
-        n = min(n, len(subset))
-        allocated += n
+# ------------------------------------------------------------------
+# Streaming (single pass)
+# ------------------------------------------------------------------
 
-        samples.append(
-            subset.sample(n=n, random_state=random_state)
-        )
+class StratifiedReservoir:
+    """
+    Single-pass stratified sampler over a stream of DataFrames.
 
-    result = pd.concat(samples, ignore_index=True)
+    Every row gets a uniform random key; per stratum only the
+    `total_samples` rows with the smallest keys are retained (bottom-k
+    reservoir), while stratum sizes are counted. Once the stream ends the
+    proportional allocation is known and the smallest keys per stratum are
+    a uniform sample without replacement.
 
-    # Adjust size if rounding caused over/under sampling
-    if len(result) > total_samples:
-        result = result.sample(
-            n=total_samples, random_state=random_state
-        )
-    elif len(result) < total_samples:
-        remaining = df.drop(result.index)
-        extra = remaining.sample(
-            n=total_samples - len(result),
-            random_state=random_state,
+    Keys are derived from `id_col` hashed with the seed when given, so the
+    sample is independent of batch size and partition order; otherwise
+    keys are drawn from a seeded generator in stream order.
+
+    Memory is bounded by strata x total_samples rows, not by the input.
+
+        sampler = StratifiedReservoir("product_category", 12_000)
+        for batch in handler.iter_batches(batch_size=100_000):
+            sampler.add(batch)
+        sample = sampler.result()
+    """
+
+    _KEY = "__reservoir_key"
+
+    def __init__(
+        self,
+        group_col: Hashable,
+        total_samples: int,
+        random_state: int = 42,
+        id_col: Optional[Hashable] = None,
+    ):
+        _validate(total_samples)
+
+        self.group_col = group_col
+        self.total_samples = total_samples
+        self.random_state = random_state
+        self.id_col = id_col
+
+        self._rng = np.random.default_rng(random_state)
+        self._counts = pd.Series(dtype="int64")
+        self._reservoir: Optional[pd.DataFrame] = None
+        self._thresholds = pd.Series(dtype="float64")
+
+    def _keys(self, batch: pd.DataFrame) -> np.ndarray:
+        if self.id_col is None:
+            return self._rng.random(len(batch))
+
+        hashed = pd.util.hash_pandas_object(
+            batch[self.id_col], index=False,
+            hash_key=f"{self.random_state:016d}"[-16:],
+        ).to_numpy()
+        # Top 53 bits -> uniform float in [0, 1)
+        return (hashed >> np.uint64(11)) / float(1 << 53)
+
+    def add(self, batch: pd.DataFrame) -> None:
+        """Feed one batch of rows."""
+        if batch.empty:
+            return
+
+        if self.group_col not in batch.columns:
+            raise ValueError(f"Column '{self.group_col}' not found in DataFrame.")
+
+        batch = batch[batch[self.group_col].notna()]
+        groups = batch[self.group_col].astype(object)
+        self._counts = self._counts.add(groups.value_counts(), fill_value=0)
+
+        keys = self._keys(batch)
+        # Rows above the largest key of a full stratum can never be kept
+        threshold = self._thresholds.reindex(groups).to_numpy(
+            dtype=float, na_value=np.inf)
+        keyed = batch[keys < threshold].assign(
+            **{self._KEY: keys[keys < threshold]})
+        if self._reservoir is not None:
+            keyed = pd.concat([self._reservoir, keyed], ignore_index=True)
+
+        self._reservoir = (
+            keyed.sort_values(self._KEY, kind="stable")
+            .groupby(keyed[self.group_col].astype(object), sort=False)
+            .head(self.total_samples)
+            .reset_index(drop=True)
         )
-        result = pd.concat([result, extra], ignore_index=True)
 
-    return result.sample(
-        frac=1, random_state=random_state
-    ).reset_index(drop=True)
+        by_group = self._reservoir.groupby(
+            self._reservoir[self.group_col].astype(object))[self._KEY]
+        full = by_group.size() >= self.total_samples
+        self._thresholds = by_group.max()[full]
+
+    @property
+    def rows_seen(self) -> int:
+        return int(self._counts.sum())
+
+    def result(self) -> pd.DataFrame:
+        """The stratified sample of everything added so far."""
+        if self._reservoir is None or not self.rows_seen:
+            raise ValueError("Input DataFrame is empty.")
+
+        counts = self._counts.astype(int).sort_values(ascending=False)
+        total = min(self.total_samples, int(counts.sum()))
+        alloc = _allocate(counts, total)
+
+        pool = self._reservoir  # sorted by key
+        groups = pool[self.group_col].astype(object)
+        rank = pool.groupby(groups, sort=False).cumcount().to_numpy()
+        chosen = rank < alloc.reindex(groups).to_numpy()
+
+        # Fix rounding with the next smallest keys / drop the largest ones
+        if chosen.sum() < total:
+            extra = np.flatnonzero(~chosen)[: total - chosen.sum()]
+            chosen[extra] = True
+        selected = pool[chosen].head(total)
+
+        # Keys are random, so key order is already a shuffle
+        return selected.drop(columns=self._KEY).reset_index(drop=True)
+
+
+def stratified_sample_stream(
+    batches: Iterable[pd.DataFrame],
+    group_col: Hashable,
+    total_samples: int,
+    random_state: int = 42,
+    id_col: Optional[Hashable] = None,
+) -> pd.DataFrame:
+    """
+    stratified_sample over a stream of DataFrames in one pass, e.g.
+    DataHandler.iter_batches() over the partitioned cleaned dataset.
+    See StratifiedReservoir.
+    """
+    sampler = StratifiedReservoir(
+        group_col, total_samples, random_state=random_state, id_col=id_col)
+    for batch in batches:
+        sampler.add(batch)
+    return sampler.result()
@@ -2,15 +2,21 @@ from typing import List, Dict, Any
 import pandas as pd
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from rag_chatbot.chunking.columnar import chunk_table, table_to_documents
+
 
 # ------------------------------------------------------------------
 # Text splitter configuration
 # ------------------------------------------------------------------
 
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 100
+SEPARATORS = ["\n\n", "\n", ".", " ", ""]
+
 text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=500,
-    chunk_overlap=100,
-    separators=["\n\n", "\n", ".", " ", ""],
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP,
+    separators=SEPARATORS,
 )
 
 
@@ -51,31 +57,10 @@ def chunk_documents(df: pd.DataFrame) -> List[Dict[str, Any]]:
     if missing:
         raise ValueError(f"Missing required columns for chunking: {missing}")
 
-    documents: List[Dict[str, Any]] = []
-
     try:
-        for _, row in df.iterrows():
-            narrative = row["consumer_complaint_narrative"]
-
-            # Skip empty narratives defensively
-            if not isinstance(narrative, str) or not narrative.strip():
-                continue
-
-            chunks = text_splitter.split_text(narrative)
-
-            for i, chunk in enumerate(chunks):
-                documents.append(
-                    {
-                        "text": chunk,
-                        "metadata": {
-                            "complaint_id": row["complaint_id"],
-                            "product_category": row["product_category"],
-                            "chunk_id": i,
-                        },
-                    }
-                )
-
-        return documents
+        # Column-wise chunking; see chunking.columnar.chunk_table for the
+        # Arrow output and multi-process variants
+        return table_to_documents(chunk_table(df, splitter=text_splitter))
 
     except Exception as e:
         raise RuntimeError(f"Failed during document chunking: {e}") from e
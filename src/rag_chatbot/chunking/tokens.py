@@ -0,0 +1,194 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# transformers is only imported when a tokenizer is loaded
+if TYPE_CHECKING:
+    from transformers import PreTrainedTokenizerFast
+
+DEFAULT_TOKENIZER = "sentence-transformers/all-MiniLM-L6-v2"
+
+# all-MiniLM-L6-v2 truncates inputs at 256 word-pieces ([CLS]/[SEP] included)
+MAX_SEQ_LENGTH = 256
+
+DEFAULT_TOKEN_OVERLAP = 32
+
+
+@lru_cache(maxsize=4)
+def load_tokenizer(model_name: str = DEFAULT_TOKENIZER) -> "PreTrainedTokenizerFast":
+    """
+    Load (once per process) the fast tokenizer of the embedding model.
+
+    Raises:
+        ValueError: If only a slow tokenizer is available (no offset mapping)
+    """
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    if not tokenizer.is_fast:
+        raise ValueError(f"No fast tokenizer available for '{model_name}'")
+    return tokenizer
+
+
+def token_budget(
+    tokenizer: "PreTrainedTokenizerFast",
+    max_seq_length: int = MAX_SEQ_LENGTH,
+) -> int:
+    """Content tokens that fit in one forward pass (special tokens excluded)."""
+    return max_seq_length - tokenizer.num_special_tokens_to_add()
+
+
+def count_tokens(
+    texts: Sequence[str],
+    tokenizer: "PreTrainedTokenizerFast",
+) -> np.ndarray:
+    """Untruncated content-token length of each text (batched)."""
+    if not len(texts):
+        return np.zeros(0, dtype=np.int64)
+
+    encoded = tokenizer(
+        list(texts),
+        add_special_tokens=False,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+    )
+    return np.fromiter((len(ids) for ids in encoded["input_ids"]),
+                       dtype=np.int64, count=len(texts))
+
+
+# ------------------------------------------------------------------
+# Splitting
+# ------------------------------------------------------------------
+
+def _mid_word(word_ids: Sequence[Optional[int]], k: int) -> bool:
+    """Whether token k continues the word of token k - 1."""
+    return (0 < k < len(word_ids) and word_ids[k] is not None
+            and word_ids[k] == word_ids[k - 1])
+
+
+def _word_start(word_ids: Sequence[Optional[int]], k: int, floor: int) -> int:
+    """Move token index k back to the first token of its word, not below floor."""
+    while k > floor and _mid_word(word_ids, k):
+        k -= 1
+    return k
+
+
+def _token_windows(
+    text: str,
+    offsets: Sequence[Tuple[int, int]],
+    word_ids: Sequence[Optional[int]],
+    max_tokens: int,
+    overlap: int,
+) -> List[Tuple[str, int, int, int]]:
+    windows = []
+    n = len(offsets)
+    start = 0
+
+    while start < n:
+        end = min(start + max_tokens, n)
+
+        if end < n:
+            # Prefer ending on a sentence in the second half of the window
+            for k in range(end, start + max_tokens // 2, -1):
+                if text[offsets[k - 1][1] - 1] == ".":
+                    end = k
+                    break
+            # Never cut inside a word: its pieces would re-tokenize
+            # differently (and often longer) on their own. A single word
+            # longer than the window is the only exception.
+            word_end = _word_start(word_ids, end, start)
+            if word_end > start:
+                end = word_end
+
+        lo, hi = offsets[start][0], offsets[end - 1][1]
+        windows.append((text[lo:hi], lo, hi, end - start))
+
+        if end >= n:
+            break
+        # Overlap starts on a word too: back to its first token, or past it
+        # when that would not move the window forward
+        start = _word_start(word_ids, max(end - overlap, start + 1), start + 1)
+        while start < end and _mid_word(word_ids, start):
+            start += 1
+
+    return windows
+
+
+def token_split_batch(
+    texts: Sequence[str],
+    tokenizer: "PreTrainedTokenizerFast",
+    max_tokens: int,
+    overlap: int = DEFAULT_TOKEN_OVERLAP,
+) -> List[List[Tuple[str, int, int, int]]]:
+    """
+    Pack each text into chunks of at most `max_tokens` tokens, with
+    `overlap` tokens shared between consecutive chunks.
+
+    The texts are tokenized in one batched call. Chunk boundaries fall on
+    word boundaries (word ids of the fast tokenizer), so a chunk
+    re-tokenizes to the same `n_tokens`, and where possible at the end of
+    a sentence.
+
+    Returns:
+        Per text, a list of (chunk, start, end, n_tokens) with
+        text[start:end] == chunk
+    """
+    if overlap >= max_tokens:
+        raise ValueError("overlap must be smaller than max_tokens")
+
+    if not len(texts):
+        return []
+
+    encoded = tokenizer(
+        list(texts),
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+    )
+    return [
+        _token_windows(text, offsets, encoded.word_ids(i), max_tokens, overlap)
+        for i, (text, offsets) in enumerate(zip(texts, encoded["offset_mapping"]))
+    ]
+
+
+# ------------------------------------------------------------------
+# Reporting
+# ------------------------------------------------------------------
+
+def token_length_report(
+    n_tokens: Sequence[int],
+    max_tokens: int,
+) -> Dict[str, Any]:
+    """
+    Distribution of tokens per chunk against the model budget.
+
+    `useful_token_ratio` is the share of the padded/truncated forward-pass
+    capacity (chunks x max_tokens) that carries text the model actually
+    sees; it rises when chunks are packed close to the budget.
+    """
+    counts = np.asarray(n_tokens, dtype=np.int64)
+    if not counts.size:
+        return {"chunks": 0}
+
+    seen = np.minimum(counts, max_tokens)
+    lower = [e for e in (0, 32, 64, 128, 192) if e < max_tokens]
+    edges = [*lower, max_tokens, max_tokens + 1, np.inf]
+    hist, _ = np.histogram(counts, bins=edges)
+    labels = [f"{lo}-{hi - 1}" for lo, hi in zip(lower, edges[1:])]
+    labels += [f"={max_tokens}", f">{max_tokens}"]
+
+    return {
+        "chunks": int(counts.size),
+        "max_tokens": max_tokens,
+        "mean": round(float(counts.mean()), 1),
+        "p50": int(np.percentile(counts, 50)),
+        "p90": int(np.percentile(counts, 90)),
+        "p99": int(np.percentile(counts, 99)),
+        "max": int(counts.max()),
+        "truncated_share": round(float((counts > max_tokens).mean()), 4),
+        "truncated_tokens": int((counts - seen).sum()),
+        "useful_token_ratio": round(float(seen.sum() / (counts.size * max_tokens)), 4),
+        "histogram": dict(zip(labels, hist.tolist())),
+    }
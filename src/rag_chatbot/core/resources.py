@@ -0,0 +1,202 @@
+"""
+CPU budget for the pipeline stages.
+
+Embedding (torch), search (FAISS / OpenMP) and generation (llama.cpp) each
+bring their own thread pool, and left alone each sizes it to every core:
+concurrent requests then oversubscribe the machine and tail latency
+spikes. A ResourcePlan gives every stage a thread count, a concurrency
+(requests running the stage at once) and optionally a core set, from
+config/rag.yaml:
+
+    resources:
+      cores: auto          # CPUs to budget (auto: this process's mask)
+      pin: false           # pin stages to disjoint core sets
+      stages:
+        embedding:  {threads: auto, concurrency: 1}
+        search:     {threads: auto, concurrency: 2}
+        generation: {threads: auto, concurrency: 1}
+
+"auto" thread counts split the cores 1/4 embedding, 1/4 search, 1/2
+generation.
+
+- apply_thread_limits() sets the torch and FAISS thread counts of the
+  process (the LLM reads its count from the plan when it is created).
+- StageExecutors runs each stage on its own thread pool; its threads are
+  pinned to the stage's cores (thread pools they start inherit the mask)
+  and carry the stage's OpenMP thread count.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("embedding", "search", "generation")
+
+# Share of the budget per stage when its thread count is "auto"
+_AUTO_SHARE = {"embedding": 0.25, "search": 0.25, "generation": 0.5}
+
+_DEFAULT_CONCURRENCY = {"embedding": 1, "search": 2, "generation": 1}
+
+
+def available_cpus() -> List[int]:
+    """
+    CPUs this process may run on: its affinity mask on Linux, every CPU
+    where affinity is not supported (macOS, Windows).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class ResourcePlan:
+    """Threads, concurrency and (optional) core set per stage."""
+
+    def __init__(
+        self,
+        threads: Dict[str, int],
+        concurrency: Dict[str, int],
+        cores: Dict[str, Optional[List[int]]],
+    ):
+        self.threads = threads
+        self.concurrency = concurrency
+        self.cores = cores
+
+    @classmethod
+    def from_config(
+        cls,
+        cfg: Optional[Dict[str, Any]] = None,
+        available: Optional[Sequence[int]] = None,
+    ) -> "ResourcePlan":
+        """
+        Build the plan from a `resources` config section.
+
+        Args:
+            cfg: The section (defaults apply to missing keys)
+            available: CPUs to budget (default: cfg["cores"] if it is a
+                number, else this process's affinity mask)
+
+        If pinned stages need more cores than available, the stages share
+        the cores unpinned (with a warning) rather than failing: the LLM
+        builds its plan while loading.
+        """
+        cfg = cfg or {}
+        if available is None:
+            available = available_cpus()
+            if isinstance(cfg.get("cores"), int):
+                available = available[:cfg["cores"]]
+        available = list(available)
+        n_cores = max(1, len(available))
+
+        stages = cfg.get("stages") or {}
+        threads, concurrency = {}, {}
+        for stage in STAGES:
+            stage_cfg = stages.get(stage) or {}
+            n = stage_cfg.get("threads", "auto")
+            if n in (None, "auto", 0):
+                n = max(1, int(n_cores * _AUTO_SHARE[stage]))
+            threads[stage] = int(n)
+            concurrency[stage] = int(
+                stage_cfg.get("concurrency", _DEFAULT_CONCURRENCY[stage]))
+
+        cores: Dict[str, Optional[List[int]]] = {s: None for s in STAGES}
+        needed = sum(threads.values())
+        if cfg.get("pin") and needed > len(available):
+            logger.warning(
+                "Pinned stages need %d cores, only %d available; "
+                "stages share the cores unpinned", needed, len(available))
+        elif cfg.get("pin"):
+            start = 0
+            for stage in STAGES:
+                cores[stage] = available[start:start + threads[stage]]
+                start += threads[stage]
+
+        return cls(threads, concurrency, cores)
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            stage: {
+                "threads": self.threads[stage],
+                "concurrency": self.concurrency[stage],
+                "cores": self.cores[stage],
+            }
+            for stage in STAGES
+        }
+
+
+@lru_cache(maxsize=1)
+def get_resource_plan() -> ResourcePlan:
+    """The plan configured in config/rag.yaml (resources), built once."""
+    from rag_chatbot.core.settings import settings
+
+    plan = ResourcePlan.from_config(settings.get("resources", {}))
+    logger.info("Resource plan: %s", plan.as_dict())
+    return plan
+
+
+def apply_thread_limits(plan: ResourcePlan) -> None:
+    """
+    Size the process-wide pools of the libraries loaded so far: torch
+    intra-op threads to the embedding budget, FAISS OpenMP threads to the
+    search budget. Safe to call again after more libraries are imported.
+    """
+    # Libraries loaded later read their defaults from the environment
+    os.environ.setdefault("OMP_NUM_THREADS", str(plan.threads["search"]))
+    os.environ.setdefault("MKL_NUM_THREADS", str(plan.threads["embedding"]))
+
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(plan.threads["embedding"])
+    if "faiss" in sys.modules:
+        sys.modules["faiss"].omp_set_num_threads(plan.threads["search"])
+
+
+def _init_stage_thread(
+    stage: str, cores: Optional[List[int]], threads: int
+) -> None:
+    # On Linux, pid 0 is the calling thread only; elsewhere no pinning
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    # OpenMP thread counts are per calling thread
+    if stage == "search" and "faiss" in sys.modules:
+        sys.modules["faiss"].omp_set_num_threads(threads)
+
+
+class StageExecutors:
+    """
+    One thread pool per stage, `plan.concurrency[stage]` threads each.
+
+        executors = StageExecutors(get_resource_plan())
+        emb = await executors.run("embedding", embedder.embed, query)
+    """
+
+    def __init__(self, plan: ResourcePlan):
+        self.plan = plan
+        self._executors = {
+            stage: ThreadPoolExecutor(
+                max_workers=plan.concurrency[stage],
+                thread_name_prefix=f"rag-{stage}",
+                initializer=_init_stage_thread,
+                initargs=(stage, plan.cores[stage], plan.threads[stage]),
+            )
+            for stage in STAGES
+        }
+
+    def executor(self, stage: str) -> ThreadPoolExecutor:
+        return self._executors[stage]
+
+    async def run(self, stage: str, fn: Callable, *args: Any) -> Any:
+        """Run fn(*args) on the stage's pool, keeping contextvars (timings)."""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executors[stage], functools.partial(ctx.run, fn, *args))
+
+    def shutdown(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
@@ -1,6 +1,7 @@
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 import logging
+import threading
 import yaml
 
 from rag_chatbot.core.project_root import get_project_root
@@ -112,5 +113,42 @@ class Settings:
         return self.config.get(section, default)
 
 
-# Singleton instance
-settings = Settings()
+# -------------------------
+# Lazy singleton
+# -------------------------
+
+_SETTINGS: Optional[Settings] = None
+_SETTINGS_LOCK = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """
+    Return the process-wide Settings, building it on first use.
+
+    Reading YAML and creating the configured directories is deferred until
+    something actually needs configuration, so importing the package stays
+    free of filesystem side effects.
+    """
+    global _SETTINGS
+
+    if _SETTINGS is None:
+        with _SETTINGS_LOCK:
+            if _SETTINGS is None:
+                _SETTINGS = Settings()
+
+    return _SETTINGS
+
+
+class _LazySettings:
+    """Module-level proxy that forwards attribute access to get_settings()."""
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if _SETTINGS is not None else "not loaded"
+        return f"<lazy Settings ({state})>"
+
+
+# Singleton instance (resolved on first attribute access)
+settings = _LazySettings()
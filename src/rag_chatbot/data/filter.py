@@ -1,6 +1,5 @@
 from typing import Dict, List
 import pandas as pd
-from typing import List
 
 
 def normalize_and_filter_products(
@@ -38,24 +37,41 @@ def normalize_and_filter_products(
             "category_mapping must be a dict or list of single-key dicts"
         )
 
-    df = df.copy()
+    products = df[product_column]
 
-    # --- Normalize product labels before mapping ---
-    raw_products = (
-        df[product_column]
-        .astype(str)
-        .str.strip()
-        .str.replace('"', '', regex=False)
-    )
-
-    df["product_category"] = raw_products.map(category_mapping)
+    if isinstance(products.dtype, pd.CategoricalDtype):
+        # Normalize and map the (few) categories instead of every row
+        labels = _normalize_product_labels(
+            pd.Series(products.cat.categories))
+        canonical = products.map(
+            dict(zip(products.cat.categories, labels.map(category_mapping)))
+        ).astype("category")
+    else:
+        canonical = _normalize_product_labels(products).map(category_mapping)
 
     # --- Filter to allowed canonical products ---
-    df = df[df["product_category"].isin(allowed_products)]
+    # assign/boolean indexing return new frames; no defensive copy needed
+    df = df.assign(product_category=canonical)
+    df = df[df["product_category"].isin(allowed_products).to_numpy(bool)]
+
+    if isinstance(df["product_category"].dtype, pd.CategoricalDtype):
+        df = df.assign(
+            product_category=df["product_category"].cat.remove_unused_categories()
+        )
 
     return df
 
 
+def _normalize_product_labels(labels: pd.Series) -> pd.Series:
+    """Normalize product labels before mapping."""
+    return (
+        labels
+        .astype(str)
+        .str.strip()
+        .str.replace('"', '', regex=False)
+    )
+
+
 
 
 
@@ -69,9 +85,7 @@ def filter_non_empty_narratives(
     if narrative_column not in df.columns:
         raise ValueError(f"Column '{narrative_column}' not found")
 
-    mask = (
-        df[narrative_column].notna()
-        & df[narrative_column].str.strip().ne("")
-    )
+    narratives = df[narrative_column]
+    mask = narratives.notna() & narratives.str.strip().ne("")
 
-    return df[mask].copy()
+    return df[mask.fillna(False).to_numpy(bool)]
@@ -1,12 +1,17 @@
+import itertools
 import pandas as pd
-import matplotlib.pyplot as plt
 from pathlib import Path
-from typing import Union, Literal, Optional, Any
+from typing import (
+    TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Literal, Optional, Union
+)
 import logging
-import joblib
 
 from rag_chatbot.core.settings import settings
 
+# matplotlib and joblib are only imported by the code paths that need them
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,6 +21,8 @@ class DataHandler:
 
     Supported:
     - Tabular data (csv, parquet, excel, json)
+    - Streaming batch reads (csv, parquet) and batched parquet writes
+    - Hive-partitioned parquet datasets with column/filter pushdown
     - Serialized objects (pkl, joblib) via joblib
     - Plot saving
 
@@ -65,6 +72,7 @@ class DataHandler:
                 return pd.read_json(self.filepath, **self.kwargs)
 
             if self.file_type in {"pkl", "joblib"}:
+                import joblib
                 return joblib.load(self.filepath)
 
             raise ValueError(f"Unsupported load type: {self.file_type}")
@@ -73,6 +81,101 @@ class DataHandler:
             logger.error(f"Failed to load file at {self.filepath}: {e}")
             raise
 
+    # ------------------------------------------------------------------
+    # Streaming load
+    # ------------------------------------------------------------------
+
+    def iter_batches(
+        self,
+        columns: Optional[List[str]] = None,
+        batch_size: int = 100_000,
+        column_types: Optional[Dict[str, str]] = None,
+        filters: Optional[Any] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream a csv/parquet file, or a partitioned parquet dataset, as
+        DataFrames of at most `batch_size` rows, reading only `columns`.
+        Peak memory is bounded by the batch size rather than the file size.
+
+        Args:
+            columns: Columns to read (all columns if None)
+            batch_size: Rows per yielded DataFrame
+            column_types: Optional pyarrow type aliases per column for csv,
+                e.g. {"Complaint ID": "int64"}. Other csv columns are read as
+                strings so that type inference cannot drift between blocks.
+            filters: Parquet only; pushed down as in load_dataset
+
+        Yields:
+            pandas DataFrames
+        """
+        import pyarrow as pa
+
+        try:
+            if self.file_type == "csv":
+                batches = self._iter_csv_batches(columns, column_types or {})
+            elif self.file_type == "parquet" and (
+                    self.filepath.is_dir() or filters is not None):
+                batches = _open_parquet_dataset(self.filepath).to_batches(
+                    columns=columns,
+                    filter=_filter_expression(filters),
+                    batch_size=batch_size,
+                )
+            elif self.file_type == "parquet":
+                import pyarrow.parquet as pq
+
+                batches = pq.ParquetFile(self.filepath).iter_batches(
+                    batch_size=batch_size, columns=columns
+                )
+            else:
+                raise ValueError(
+                    f"Unsupported streaming load type: {self.file_type}")
+
+            # Re-chunk reader blocks into batches of `batch_size` rows
+            pending, rows = [], 0
+            for batch in batches:
+                pending.append(batch)
+                rows += batch.num_rows
+                while rows >= batch_size:
+                    table = pa.Table.from_batches(pending)
+                    yield table.slice(0, batch_size).to_pandas()
+                    rest = table.slice(batch_size)
+                    pending, rows = rest.to_batches(), rest.num_rows
+
+            if rows:
+                yield pa.Table.from_batches(pending).to_pandas()
+
+        except Exception as e:
+            logger.error(f"Failed to stream file at {self.filepath}: {e}")
+            raise
+
+    def _iter_csv_batches(self, columns, column_types: Dict[str, str]):
+        import pyarrow as pa
+        from pyarrow import csv as pacsv
+
+        if columns is None:
+            # Read the header once to learn the column names
+            with pacsv.open_csv(self.filepath) as reader:
+                columns = reader.schema.names
+
+        types = {c: pa.string() for c in columns}
+        types.update(
+            {c: pa.type_for_alias(t) for c, t in column_types.items()}
+        )
+
+        reader = pacsv.open_csv(
+            self.filepath,
+            read_options=pacsv.ReadOptions(block_size=4 << 20),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=columns,
+                column_types=types,
+                # Match pandas: empty fields are missing values
+                strings_can_be_null=True,
+            ),
+        )
+        with reader:
+            yield from reader
+
     # ------------------------------------------------------------------
     # Save
     # ------------------------------------------------------------------
@@ -102,6 +205,7 @@ class DataHandler:
                 obj.to_json(self.filepath, **self.kwargs)
 
             elif self.file_type in {"pkl", "joblib"}:
+                import joblib
                 joblib.dump(obj, self.filepath)
 
             else:
@@ -113,6 +217,118 @@ class DataHandler:
             logger.error(f"Failed to save file at {self.filepath}: {e}")
             raise
 
+    # ------------------------------------------------------------------
+    # Partitioned datasets
+    # ------------------------------------------------------------------
+
+    def save_dataset(
+        self,
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        partition_cols: List[str],
+        basename_template: Optional[str] = None,
+        existing_data_behavior: str = "delete_matching",
+    ) -> int:
+        """
+        Write a DataFrame (or a stream of DataFrames) as a hive-partitioned
+        parquet dataset, e.g. product_category=Credit card/year=2023/...
+
+        The schema is fixed by the first non-empty frame; later frames are
+        cast to it. Empty frames are skipped.
+
+        Args:
+            data: DataFrame or iterable of DataFrames
+            partition_cols: Columns used as partition directories
+            basename_template: File name template containing "{i}"; make it
+                unique per write to append to an existing dataset
+            existing_data_behavior: "delete_matching" replaces the
+                partitions being written, "overwrite_or_ignore" appends
+
+        Returns:
+            Number of rows written
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        frames = [data] if isinstance(data, pd.DataFrame) else data
+        state = {"rows": 0, "schema": None}
+
+        def _batches():
+            for df in frames:
+                if df.empty:
+                    continue
+                table = pa.Table.from_pandas(
+                    df, schema=state["schema"], preserve_index=False)
+                state["rows"] += len(df)
+                yield from table.to_batches()
+
+        try:
+            batches = _batches()
+            first = next(batches, None)
+            if first is None:
+                raise ValueError("No rows to write: every batch was empty")
+
+            # All-null columns in the first batch would pin a null type
+            schema = pa.schema(
+                [
+                    f.with_type(pa.string()) if pa.types.is_null(f.type) else f
+                    for f in first.schema
+                ],
+                metadata=first.schema.metadata,
+            )
+            state["schema"] = schema
+            first = pa.RecordBatch.from_arrays(
+                [c.cast(f.type) for c, f in zip(first.columns, schema)],
+                schema=schema,
+            )
+
+            self.filepath.mkdir(parents=True, exist_ok=True)
+            ds.write_dataset(
+                itertools.chain([first], batches),
+                self.filepath,
+                schema=schema,
+                format="parquet",
+                partitioning=partition_cols,
+                partitioning_flavor="hive",
+                basename_template=basename_template or "part-{i}.parquet",
+                existing_data_behavior=existing_data_behavior,
+            )
+            logger.info(
+                f"{state['rows']} rows saved to dataset {self.filepath} "
+                f"(partitioned by {', '.join(partition_cols)})"
+            )
+            return state["rows"]
+
+        except Exception as e:
+            logger.error(f"Failed to save dataset at {self.filepath}: {e}")
+            raise
+
+    def load_dataset(
+        self,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Any] = None,
+    ) -> pd.DataFrame:
+        """
+        Load a parquet file or hive-partitioned dataset, reading only
+        `columns` and the row groups/partitions that can match `filters`.
+
+        Files are memory-mapped; partition columns come back as categoricals.
+
+        Args:
+            columns: Columns to read (all columns if None)
+            filters: pyarrow filters, either DNF tuples
+                ([("product_category", "=", "Credit card"), ("year", ">=", 2022)])
+                or a pyarrow.compute expression
+
+        Returns:
+            DataFrame
+        """
+        try:
+            return read_parquet_dataset(self.filepath, columns, filters)
+
+        except Exception as e:
+            logger.error(f"Failed to load dataset at {self.filepath}: {e}")
+            raise
+
     # ------------------------------------------------------------------
     # Registry Factory
     # ------------------------------------------------------------------
@@ -155,7 +371,7 @@ class DataHandler:
     @staticmethod
     def save_plot(
         filename: str,
-        fig: Optional[plt.Figure] = None,
+        fig: Optional["plt.Figure"] = None,
         **kwargs
     ):
         """
@@ -165,6 +381,8 @@ class DataHandler:
             filename: Output filename
             fig: Optional matplotlib Figure
         """
+        import matplotlib.pyplot as plt
+
         plot_dir = settings.paths.REPORTS["plots_dir"]
         plot_dir.mkdir(parents=True, exist_ok=True)
 
@@ -181,4 +399,53 @@ class DataHandler:
 
         except Exception as e:
             logger.error(f"Failed to save plot {filename}: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+def _open_parquet_dataset(
+    source: Union[Path, List[str]],
+    partition_base_dir: Optional[Path] = None,
+):
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    return ds.dataset(
+        source if isinstance(source, list) else str(source),
+        format="parquet",
+        partitioning="hive",
+        partition_base_dir=str(partition_base_dir) if partition_base_dir else None,
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def _filter_expression(filters: Optional[Any]):
+    """DNF tuples -> pyarrow expression (expressions pass through)."""
+    if isinstance(filters, list):
+        import pyarrow.parquet as pq
+
+        return pq.filters_to_expression(filters)
+    return filters
+
+
+def read_parquet_dataset(
+    source: Union[Path, List[str]],
+    columns: Optional[List[str]] = None,
+    filters: Optional[Any] = None,
+    partition_base_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    Read a parquet file, directory or explicit file list (rows keep the list
+    order) through pyarrow.dataset with memory-mapped local files, column
+    projection and filter pushdown. See DataHandler.load_dataset.
+    """
+    dataset = _open_parquet_dataset(source, partition_base_dir)
+    df = dataset.to_table(
+        columns=columns, filter=_filter_expression(filters)).to_pandas()
+
+    # Partition values are few distinct labels
+    partitioning = getattr(dataset, "partitioning", None)
+    for name in partitioning.schema.names if partitioning else []:
+        if name in df.columns and pd.api.types.is_string_dtype(df[name]):
+            df[name] = df[name].astype("category")
+
+    return df
@@ -0,0 +1,235 @@
+import itertools
+import json
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from rag_chatbot.data.handler import read_parquet_dataset
+
+PART_TEMPLATE = "part-{:05d}.parquet"
+
+_META_KEY = b"rag_chatbot.watermark"
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Stable 64-bit hash of every row (values only, index ignored).
+
+    Computed on the raw mapped columns so that an edit to any field of a
+    complaint marks it as updated.
+    """
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(np.uint64)
+
+
+class Watermark:
+    """
+    Incremental preprocessing state.
+
+    Holds the latest date_received seen and, per processed complaint_id, the
+    hash of its raw row. A raw row is part of the delta when its id is new or
+    its hash changed.
+
+    Persisted as a small parquet file (complaint_id, row_hash); the date
+    watermark lives in the file's schema metadata.
+    """
+
+    def __init__(
+        self,
+        max_date_received: Optional[pd.Timestamp] = None,
+        complaint_ids: Optional[np.ndarray] = None,
+        hashes: Optional[np.ndarray] = None,
+    ):
+        self.max_date_received = max_date_received
+        self._ids = pd.Index(
+            np.asarray([] if complaint_ids is None else complaint_ids,
+                       dtype=np.int64)
+        )
+        self._hashes = np.asarray(
+            [] if hashes is None else hashes, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    # ------------------------------------------------------------------
+    # Delta detection
+    # ------------------------------------------------------------------
+
+    def delta_mask(self, complaint_ids, hashes: np.ndarray) -> np.ndarray:
+        """
+        Boolean mask of the rows that are new or changed since the last run.
+        """
+        if not len(self):
+            return np.ones(len(hashes), dtype=bool)
+
+        pos = self._ids.get_indexer(np.asarray(complaint_ids, dtype=np.int64))
+        new = pos == -1
+        changed = ~new & (self._hashes[np.where(new, 0, pos)] != hashes)
+        return new | changed
+
+    def update(
+        self,
+        complaint_ids,
+        hashes: np.ndarray,
+        dates_received: Optional[pd.Series] = None,
+    ) -> None:
+        """Record processed rows; later occurrences of an id win."""
+        state = pd.DataFrame({
+            "complaint_id": np.concatenate(
+                [self._ids.to_numpy(), np.asarray(complaint_ids, np.int64)]),
+            "row_hash": np.concatenate(
+                [self._hashes, np.asarray(hashes, np.uint64)]),
+        }).drop_duplicates("complaint_id", keep="last")
+
+        self._ids = pd.Index(state["complaint_id"].to_numpy())
+        self._hashes = state["row_hash"].to_numpy()
+
+        if dates_received is not None:
+            latest = pd.to_datetime(dates_received, errors="coerce").max()
+            if pd.notna(latest) and (
+                self.max_date_received is None
+                or latest > self.max_date_received
+            ):
+                self.max_date_received = latest
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Watermark":
+        """Load the state at `path`; an empty watermark if it does not exist."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b"{}"))
+        max_date = meta.get("max_date_received")
+
+        return cls(
+            max_date_received=pd.Timestamp(max_date) if max_date else None,
+            complaint_ids=table.column("complaint_id").to_numpy(),
+            hashes=table.column("row_hash").to_numpy(),
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the state atomically."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        meta = {
+            "max_date_received": (
+                self.max_date_received.isoformat()
+                if self.max_date_received is not None else None
+            ),
+            "rows": len(self),
+        }
+        table = pa.table({
+            "complaint_id": pa.array(self._ids.to_numpy(), pa.int64()),
+            "row_hash": pa.array(self._hashes, pa.uint64()),
+        }).replace_schema_metadata({_META_KEY: json.dumps(meta)})
+
+        tmp = path.with_name(path.name + ".tmp")
+        pq.write_table(table, tmp)
+        tmp.replace(path)
+
+
+# ------------------------------------------------------------------
+# Partitioned output
+# ------------------------------------------------------------------
+
+def part_template(run: int) -> str:
+    """basename_template for the files written by incremental run `run`."""
+    return PART_TEMPLATE.format(run).replace(".parquet", "-{i}.parquet")
+
+
+def _run_of(part: Path) -> int:
+    # part-{run:05d}-{i}.parquet; a full run writes part-{i}.parquet (run 0)
+    fields = part.stem.split("-")
+    return int(fields[1]) if len(fields) > 2 else 0
+
+
+def list_parts(dataset_dir: Union[str, Path]) -> List[Path]:
+    """Part files of a (possibly hive-partitioned) dataset, oldest run first."""
+    return sorted(
+        Path(dataset_dir).rglob("part-*.parquet"),
+        key=lambda p: (_run_of(p), str(p)),
+    )
+
+
+def next_run_index(dataset_dir: Union[str, Path]) -> int:
+    """Index of the next incremental run writing into `dataset_dir`."""
+    if not Path(dataset_dir).is_dir():
+        return 0
+    parts = list_parts(dataset_dir)
+    return _run_of(parts[-1]) + 1 if parts else 0
+
+
+def read_latest(
+    path: Union[str, Path],
+    columns: Optional[List[str]] = None,
+    filters: Optional[Any] = None,
+    key: str = "complaint_id",
+) -> pd.DataFrame:
+    """
+    Read an incrementally built dataset, keeping only the newest version of
+    each `key` (updated complaints are appended by later runs, possibly
+    into a different partition).
+
+    Columns and filters are pushed down as in DataHandler.load_dataset. A
+    row matching `filters` is dropped if a later run holds a newer version
+    of it, even when that newer version does not match.
+    """
+    path = Path(path)
+    if path.is_file():
+        return read_parquet_dataset(path, columns, filters)
+
+    read_columns = columns
+    if columns is not None and key not in columns:
+        read_columns = [*columns, key]
+
+    runs = [
+        [str(p) for p in parts]
+        for _, parts in itertools.groupby(list_parts(path), key=_run_of)
+    ]
+
+    if filters is None:
+        # Read the run-ordered file list so that rows of later runs come last
+        df = read_parquet_dataset(
+            [f for files in runs for f in files],
+            read_columns,
+            partition_base_dir=path,
+        )
+        df = df.drop_duplicates(key, keep="last")
+    else:
+        # Newest run per key (key column only), then a filtered read per run
+        newest = pd.concat([
+            read_parquet_dataset(files, [key], partition_base_dir=path)
+            .assign(_run=run)
+            for run, files in enumerate(runs)
+        ]).drop_duplicates(key, keep="last").set_index(key)["_run"]
+
+        frames = []
+        for run, files in enumerate(runs):
+            part = read_parquet_dataset(
+                files, read_columns, filters, partition_base_dir=path)
+            frames.append(part[newest.reindex(part[key]).to_numpy() == run])
+
+        df = pd.concat(frames).drop_duplicates(key, keep="last")
+        categorical = [
+            c for c in df.columns
+            if any(isinstance(f[c].dtype, pd.CategoricalDtype) for f in frames)
+        ]
+        df = df.astype({c: "category" for c in categorical})
+
+    df = df.reset_index(drop=True)
+    if read_columns is not columns:
+        df = df.drop(columns=key)
+    return df
@@ -1,20 +1,26 @@
+from __future__ import annotations
+
 import os
-import pickle
+import shutil
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 
-import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 from rag_chatbot.core.project_root import get_project_root
 
+# faiss and sentence_transformers (torch) are imported where they are used
+# so that importing this module stays cheap.
+if TYPE_CHECKING:
+    import faiss
+    import pyarrow as pa
+
 
 # -------------------------------------------------------------------
 # Paths
 # -------------------------------------------------------------------
 ROOT = get_project_root()
-VECTOR_STORE_PATH = ROOT / "vector_store"
+VECTOR_STORE_PATH = ROOT / "vector_store" / "fiass"
 
 
 # -------------------------------------------------------------------
@@ -45,6 +51,8 @@ def build_embeddings(
     if not texts:
         raise ValueError("Documents contain no valid text fields.")
 
+    from sentence_transformers import SentenceTransformer
+
     try:
         model = SentenceTransformer(model_name)
         embeddings = model.encode(
@@ -76,6 +84,8 @@ def build_faiss_index(embeddings: np.ndarray) -> faiss.Index:
     if embeddings is None or embeddings.ndim != 2:
         raise ValueError("Embeddings must be a 2D NumPy array.")
 
+    import faiss
+
     dim = embeddings.shape[1]
     index = faiss.IndexFlatIP(dim)
     index.add(embeddings)
@@ -86,29 +96,88 @@ def build_faiss_index(embeddings: np.ndarray) -> faiss.Index:
 # -------------------------------------------------------------------
 # Persistence
 # -------------------------------------------------------------------
+def docs_to_table(docs: List[Dict[str, Any]]) -> pa.Table:
+    """
+    Chunk dicts -> Arrow table with the chunk text as `document` and one
+    column per metadata key (the Retriever's metadata layout).
+    """
+    import pyarrow as pa
+
+    keys: Dict[str, None] = {}
+    for d in docs:
+        keys.update(dict.fromkeys(d.get("metadata", {})))
+
+    columns = {"document": [d.get("text") for d in docs]}
+    for key in keys:
+        columns[key] = [d.get("metadata", {}).get(key) for d in docs]
+
+    return pa.table(columns)
+
+
 def save_vector_store(
     index: faiss.Index,
     docs: List[Dict[str, Any]],
     path: Path = VECTOR_STORE_PATH,
-) -> None:
+    model_name: Optional[str] = None,
+) -> Path:
     """
-    Persist FAISS index and document metadata to disk.
+    Persist FAISS index and document metadata as a new versioned snapshot.
+
+    The index (faiss.index) and the metadata (metadata.parquet) are written
+    to a staging directory with a manifest, then published atomically as
+    path/versions/<version> and made CURRENT (see vectorstore.faiss), so a
+    serving Retriever can pick it up without a restart.
 
     Args:
         index: FAISS index instance.
         docs: Original document chunks with metadata.
-        path: Directory where vector store will be saved.
+        path: Vector store root directory.
+        model_name: Embedding model recorded in the manifest.
+
+    Returns:
+        Path of the published snapshot.
 
     Raises:
         RuntimeError: If saving fails.
     """
-    try:
-        path.mkdir(parents=True, exist_ok=True)
+    import faiss
+    import pyarrow.parquet as pq
 
-        faiss.write_index(index, str(path / "index.faiss"))
+    from rag_chatbot.vectorstore.faiss import (
+        INDEX_FILE,
+        METADATA_FILE,
+        file_sha256,
+        new_version,
+        publish_snapshot,
+        write_manifest,
+    )
 
-        with open(path / "metadata.pkl", "wb") as f:
-            pickle.dump(docs, f)
+    path = Path(path)
+    staging = path / f".staging-{os.getpid()}"
+
+    try:
+        if index.ntotal != len(docs):
+            raise ValueError(
+                f"Index has {index.ntotal} vectors but {len(docs)} documents")
+
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        faiss.write_index(index, str(staging / INDEX_FILE))
+        pq.write_table(docs_to_table(docs), staging / METADATA_FILE)
+
+        version = new_version(file_sha256(staging / INDEX_FILE))
+        write_manifest(
+            staging,
+            version=version,
+            model=model_name,
+            embedding_dim=int(index.d),
+            counts={"chunks": len(docs), "vectors": int(index.ntotal)},
+        )
+        return publish_snapshot(staging, path, version)
 
     except Exception as exc:
         raise RuntimeError("Failed to save vector store.") from exc
+
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,120 @@
+"""
+Batched evaluation harness for large question sets.
+
+Questions are embedded and searched a batch at a time (one embed_batch and
+one index search per batch) instead of one RAGPipeline.run per question.
+Answers come from the pipeline's own guard/context/generation path, so the
+LLM is pluggable: the real model, or rag.llm.StubLLM to score retrieval
+without generation cost. Metrics are computed over all results at once by
+build_evaluation_table, which yields the same DataFrame schema as scoring
+serial pipeline runs.
+"""
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List
+
+from rag_chatbot.rag.evaluation import build_evaluation_table
+from rag_chatbot.rag.pipeline import ANSWER_MODES
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class EvaluationHarness:
+    """
+    Runs many questions through a RAGPipeline in batches.
+
+    Args:
+        pipeline: RAGPipeline whose embedder exposes embed_batch and whose
+            retriever exposes retrieve_batch
+        batch_size: Questions embedded and searched together
+        n_jobs: Worker processes for metric computation (-1: every core)
+        mode: Answer mode ("generate" or "extractive")
+        generation_concurrency: Answers generated concurrently per batch
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        batch_size: int = 256,
+        n_jobs: int = 1,
+        mode: str = "generate",
+        generation_concurrency: int = 1,
+    ):
+        if mode not in ANSWER_MODES:
+            raise ValueError(
+                f"Unknown answer mode '{mode}'. Expected one of {ANSWER_MODES}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        self.pipeline = pipeline
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.mode = mode
+        self.generation_concurrency = max(1, generation_concurrency)
+        # Wall time per stage of the last run() (seconds)
+        self.timings: Dict[str, float] = {}
+
+    async def _respond_all(self, questions, embeddings, chunks) -> List[Dict]:
+        semaphore = asyncio.Semaphore(self.generation_concurrency)
+
+        async def _one(query, emb, retrieved):
+            async with semaphore:
+                return await self.pipeline.respond(
+                    query, emb, retrieved, self.mode)
+
+        return await asyncio.gather(*(
+            _one(q, e, c) for q, e, c in zip(questions, embeddings, chunks)
+        ))
+
+    def run(self, questions: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Answer every question; results have the same keys as
+        RAGPipeline.run (query, answer, confidence, sources).
+        """
+        questions = list(questions)
+        timings = {"embed": 0.0, "retrieve": 0.0, "respond": 0.0}
+        results: List[Dict[str, Any]] = []
+
+        for start in range(0, len(questions), self.batch_size):
+            batch = questions[start:start + self.batch_size]
+
+            t0 = time.perf_counter()
+            embeddings = self.pipeline.embedder.embed_batch(batch)
+            t1 = time.perf_counter()
+            chunks = self.pipeline.retriever.retrieve_batch(embeddings)
+            t2 = time.perf_counter()
+            results.extend(asyncio.run(
+                self._respond_all(batch, embeddings, chunks)))
+            t3 = time.perf_counter()
+
+            timings["embed"] += t1 - t0
+            timings["retrieve"] += t2 - t1
+            timings["respond"] += t3 - t2
+            logger.info("Answered %d/%d questions",
+                        len(results), len(questions))
+
+        self.timings = timings
+        return results
+
+    def evaluate(
+        self,
+        questions: Iterable[str],
+        similarity_threshold: float = 0.7,
+        is_distance: bool = False,
+    ) -> "pd.DataFrame":
+        """Run the questions and score them with build_evaluation_table."""
+        results = self.run(questions)
+
+        t0 = time.perf_counter()
+        table = build_evaluation_table(
+            results,
+            similarity_threshold=similarity_threshold,
+            is_distance=is_distance,
+            n_jobs=self.n_jobs,
+        )
+        self.timings["metrics"] = time.perf_counter() - t0
+        return table
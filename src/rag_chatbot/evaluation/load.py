@@ -0,0 +1,279 @@
+"""
+Load generation for the RAG pipeline and its HTTP endpoint.
+
+A target is a blocking callable `target(query) -> result`. Requests are
+executed by a pool of `workers` threads, which models the serving side's
+concurrency (the UI runs each request's RAGPipeline.run in a worker thread;
+Gradio's default event concurrency limit is 1). A request that arrives
+while every worker is busy waits in the pool's queue, so each request
+records:
+
+- queue time: arrival -> a worker picks it up
+- service time: worker start -> result
+- latency: arrival -> result (what the user sees)
+
+Two load models:
+
+- open loop (`run_open_loop`): Poisson arrivals at a fixed rate,
+  independent of completions. Latency is measured from the *scheduled*
+  arrival, so a stalled generator does not hide queueing.
+- closed loop (`run_closed_loop`): N users, each sending a request,
+  waiting for the answer and thinking before the next one.
+
+`saturation_curve` repeats a run at increasing rates (or user counts) and
+marks the highest step that still meets a p99 latency SLO.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from rag_chatbot.evaluation.retrieval import latency_summary
+
+logger = logging.getLogger(__name__)
+
+Target = Callable[[str], Any]
+
+LOAD_MODELS = ("open", "closed")
+
+
+# ------------------------------------------------------------------
+# Targets
+# ------------------------------------------------------------------
+
+def pipeline_target(pipeline, mode: str = "generate") -> Target:
+    """RAGPipeline.run, the call the UI handler makes per request."""
+
+    def _call(query: str) -> Dict[str, Any]:
+        return pipeline.run(query, mode=mode)
+
+    return _call
+
+
+def http_target(url: str, mode: str = "generate", timeout_s: float = 120.0) -> Target:
+    """POST {"query", "mode"} as JSON to `url` and decode the JSON reply."""
+    from urllib.request import Request, urlopen
+
+    def _call(query: str) -> Dict[str, Any]:
+        body = json.dumps({"query": query, "mode": mode}).encode("utf-8")
+        request = Request(
+            url, data=body, headers={"Content-Type": "application/json"})
+        with urlopen(request, timeout=timeout_s) as response:
+            return json.loads(response.read())
+
+    return _call
+
+
+# ------------------------------------------------------------------
+# Recording
+# ------------------------------------------------------------------
+
+class _Recorder:
+    """Per-request (arrival, start, end, error) records of one run."""
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def call(self, target: Target, query: str, arrival: float) -> None:
+        start = time.perf_counter()
+        error = None
+        try:
+            target(query)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        end = time.perf_counter()
+
+        with self._lock:
+            self.records.append(
+                {"arrival": arrival, "start": start, "end": end, "error": error})
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate request records into throughput, error rate and latency,
+    queue and service time percentiles (ms). Counts and throughput are
+    always present (0 when nothing was recorded).
+    """
+    if not records:
+        return {"requests": 0, "errors": 0, "error_rate": 0.0,
+                "elapsed_s": 0.0, "throughput_rps": 0.0}
+
+    arrival = np.array([r["arrival"] for r in records])
+    start = np.array([r["start"] for r in records])
+    end = np.array([r["end"] for r in records])
+    ok = np.array([r["error"] is None for r in records])
+
+    elapsed = max(float(end.max() - arrival.min()), 1e-9)
+    summary: Dict[str, Any] = {
+        "requests": len(records),
+        "errors": int((~ok).sum()),
+        "error_rate": round(float((~ok).mean()), 4),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(float(ok.sum()) / elapsed, 3),
+    }
+    if ok.any():
+        summary["latency"] = latency_summary(end[ok] - arrival[ok])
+        summary["queue"] = latency_summary(start[ok] - arrival[ok])
+        summary["service"] = latency_summary(end[ok] - start[ok])
+
+    errors = sorted({r["error"] for r in records if r["error"]})
+    if errors:
+        summary["sample_errors"] = errors[:5]
+    return summary
+
+
+# ------------------------------------------------------------------
+# Load models
+# ------------------------------------------------------------------
+
+def run_open_loop(
+    target: Target,
+    queries: Sequence[str],
+    rate_rps: float,
+    duration_s: float,
+    workers: int = 1,
+    random_state: int = 42,
+) -> Dict[str, Any]:
+    """
+    Poisson arrivals at `rate_rps` for `duration_s` seconds; waits for
+    every request to finish before summarizing.
+    """
+    if rate_rps <= 0:
+        raise ValueError("rate_rps must be > 0")
+
+    rng = random.Random(random_state)
+    recorder = _Recorder()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        t0 = time.perf_counter()
+        arrival = t0
+        i = 0
+        while True:
+            arrival += rng.expovariate(rate_rps)
+            if arrival - t0 > duration_s:
+                break
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(
+                recorder.call, target, queries[i % len(queries)], arrival)
+            i += 1
+
+    summary = summarize(recorder.records)
+    summary.update(model="open", offered_rps=rate_rps, workers=workers)
+    return summary
+
+
+def run_closed_loop(
+    target: Target,
+    queries: Sequence[str],
+    users: int,
+    duration_s: float,
+    workers: Optional[int] = None,
+    think_time_s: float = 0.0,
+    random_state: int = 42,
+) -> Dict[str, Any]:
+    """
+    `users` concurrent users for `duration_s` seconds, each sending its
+    next request `think_time_s` (exponentially distributed) after the
+    previous answer. `workers` defaults to one per user.
+    """
+    if users < 1:
+        raise ValueError("users must be >= 1")
+
+    workers = workers or users
+    recorder = _Recorder()
+    deadline = time.perf_counter() + duration_s
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def _user(u: int) -> None:
+            rng = random.Random(random_state + u)
+            i = u
+            while time.perf_counter() < deadline:
+                arrival = time.perf_counter()
+                executor.submit(
+                    recorder.call, target, queries[i % len(queries)], arrival
+                ).result()
+                i += users
+                if think_time_s:
+                    time.sleep(rng.expovariate(1.0 / think_time_s))
+
+        clients = [
+            threading.Thread(target=_user, args=(u,), name=f"load-user-{u}")
+            for u in range(users)
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+
+    summary = summarize(recorder.records)
+    summary.update(model="closed", users=users, workers=workers,
+                   think_time_s=think_time_s)
+    return summary
+
+
+# ------------------------------------------------------------------
+# Saturation
+# ------------------------------------------------------------------
+
+def saturation_curve(
+    target: Target,
+    queries: Sequence[str],
+    steps: Sequence[float],
+    model: str = "open",
+    duration_s: float = 30.0,
+    workers: int = 1,
+    think_time_s: float = 0.0,
+    slo_p99_ms: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    One run per step: arrival rates (rps) for the open model, user counts
+    for the closed one.
+
+    A step is saturated when it has errors, its p99 latency exceeds
+    `slo_p99_ms`, or (open model) it completes less than 90% of the
+    offered rate. The highest step before the first saturated one is
+    reported as the capacity.
+
+    Returns:
+        {"model", "steps": [summary per step], "capacity"}
+    """
+    if model not in LOAD_MODELS:
+        raise ValueError(
+            f"Unknown load model '{model}'. Expected one of {LOAD_MODELS}")
+
+    rows: List[Dict[str, Any]] = []
+    capacity = None
+    for step in steps:
+        if model == "open":
+            row = run_open_loop(target, queries, step, duration_s, workers)
+        else:
+            row = run_closed_loop(target, queries, int(step), duration_s,
+                                  workers, think_time_s)
+
+        p99 = row.get("latency", {}).get("p99_ms", float("inf"))
+        # A step that completed nothing measured no capacity
+        row["saturated"] = bool(
+            not row["requests"]
+            or row["errors"]
+            or (slo_p99_ms is not None and p99 > slo_p99_ms)
+            or (model == "open" and row["throughput_rps"] < 0.9 * step)
+        )
+        if not row["saturated"] and not any(r["saturated"] for r in rows):
+            capacity = step
+
+        logger.info("step %s: %.2f rps, p99 %.1f ms, queue p99 %.1f ms%s",
+                    step, row["throughput_rps"], p99,
+                    row.get("queue", {}).get("p99_ms", 0.0),
+                    " (saturated)" if row["saturated"] else "")
+        rows.append(row)
+
+    return {"model": model, "steps": rows, "capacity": capacity}
@@ -0,0 +1,220 @@
+"""
+Offline retrieval benchmark: index variants against exact search.
+
+Ground truth is the exact top-k of a flat inner-product index over the base
+vectors; every variant (a FAISS index_factory string plus search
+parameters) is scored against it on the same held-out queries.
+"""
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import faiss
+
+# Used when no variants are configured
+DEFAULT_VARIANTS: List[Dict[str, Any]] = [
+    {"name": "flat", "factory": "Flat"},
+    {"name": "hnsw32", "factory": "HNSW32", "params": {"efSearch": 64}},
+    {"name": "ivf_flat", "factory": "IVF{nlist},Flat", "params": {"nprobe": 8}},
+    {"name": "ivf_sq8", "factory": "IVF{nlist},SQ8", "params": {"nprobe": 8}},
+]
+
+
+# ------------------------------------------------------------------
+# Data
+# ------------------------------------------------------------------
+
+def load_index_vectors(index_path) -> np.ndarray:
+    """All vectors stored in a flat FAISS index, as float32."""
+    import faiss
+
+    index = faiss.read_index(str(index_path))
+    return index.reconstruct_n(0, index.ntotal).astype("float32")
+
+
+def holdout_split(
+    vectors: np.ndarray,
+    n_queries: int,
+    random_state: int = 42,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split vectors into (base, queries); the queries are removed from the
+    base so that no query finds itself.
+    """
+    if not 0 < n_queries < len(vectors):
+        raise ValueError(
+            f"n_queries must be between 1 and {len(vectors) - 1}")
+
+    order = np.random.default_rng(random_state).permutation(len(vectors))
+    return vectors[order[n_queries:]], vectors[order[:n_queries]]
+
+
+def synthetic_vectors(
+    n: int,
+    dim: int = 384,
+    n_clusters: int = 64,
+    random_state: int = 42,
+) -> np.ndarray:
+    """Clustered unit vectors, for runs without a built vector store."""
+    rng = np.random.default_rng(random_state)
+    centers = rng.standard_normal((n_clusters, dim))
+    vectors = centers[rng.integers(n_clusters, size=n)]
+    vectors = vectors + 0.5 * rng.standard_normal((n, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype("float32")
+
+
+# ------------------------------------------------------------------
+# Metrics
+# ------------------------------------------------------------------
+
+def exact_ground_truth(base: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Exact top-k ids per query (flat inner-product search)."""
+    import faiss
+
+    index = faiss.IndexFlatIP(base.shape[1])
+    index.add(base)
+    return index.search(queries, k)[1]
+
+
+def recall_at_k(retrieved: np.ndarray, truth: np.ndarray, k: int) -> float:
+    """Mean share of the exact top-k found in the retrieved top-k."""
+    hits = [
+        len(set(r[:k]) & set(t[:k])) / k
+        for r, t in zip(retrieved, truth)
+    ]
+    return float(np.mean(hits))
+
+
+def ndcg_at_k(retrieved: np.ndarray, truth: np.ndarray, k: int) -> float:
+    """
+    Mean nDCG@k with graded relevance: the exact rank-r neighbor has
+    relevance k - r, anything outside the exact top-k has 0.
+    """
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    ideal = float(np.sum(np.arange(k, 0, -1) * discounts))
+
+    scores = []
+    for r, t in zip(retrieved, truth):
+        relevance = {int(doc): k - rank for rank, doc in enumerate(t[:k])}
+        gains = np.array([relevance.get(int(doc), 0) for doc in r[:k]])
+        scores.append(float(np.sum(gains * discounts[:len(gains)])) / ideal)
+    return float(np.mean(scores))
+
+
+def latency_summary(latencies_s: np.ndarray) -> Dict[str, float]:
+    ms = np.asarray(latencies_s) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+    }
+
+
+# ------------------------------------------------------------------
+# Variants
+# ------------------------------------------------------------------
+
+def build_variant(
+    variant: Dict[str, Any],
+    base: np.ndarray,
+) -> "faiss.Index":
+    """
+    Build (train + add) the index described by `variant`:
+    {"name", "factory", "params"}. "{nlist}" in the factory string is
+    replaced by ~sqrt(n).
+    """
+    import faiss
+
+    nlist = max(1, int(np.sqrt(len(base))))
+    factory = variant["factory"].format(nlist=nlist)
+
+    index = faiss.index_factory(base.shape[1], factory, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        index.train(base)
+    index.add(base)
+
+    params = variant.get("params") or {}
+    if params:
+        space = faiss.ParameterSpace()
+        for name, value in params.items():
+            space.set_index_parameter(index, name, value)
+
+    return index
+
+
+def index_bytes(index: "faiss.Index") -> int:
+    import faiss
+
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def benchmark_variant(
+    variant: Dict[str, Any],
+    base: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int = 10,
+    latency_queries: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Build one variant and measure it against the exact ground truth.
+
+    Latency percentiles come from single-query searches (the serving
+    pattern); QPS from one batched search over all queries.
+
+    Returns:
+        Row with name, factory, params, recall@k, ndcg@k, qps, latency
+        percentiles, build_s and index_bytes
+    """
+    start = time.perf_counter()
+    index = build_variant(variant, base)
+    build_s = time.perf_counter() - start
+
+    # Warm up before timing
+    index.search(queries[:1], k)
+
+    start = time.perf_counter()
+    retrieved = index.search(queries, k)[1]
+    batch_s = time.perf_counter() - start
+
+    single = queries[:latency_queries] if latency_queries else queries
+    latencies = np.empty(len(single))
+    for i in range(len(single)):
+        t0 = time.perf_counter()
+        index.search(single[i:i + 1], k)
+        latencies[i] = time.perf_counter() - t0
+
+    return {
+        "name": variant["name"],
+        "factory": variant["factory"],
+        "params": variant.get("params") or {},
+        f"recall@{k}": round(recall_at_k(retrieved, truth, k), 4),
+        f"ndcg@{k}": round(ndcg_at_k(retrieved, truth, k), 4),
+        "qps": round(len(queries) / batch_s, 1),
+        **latency_summary(latencies),
+        "build_s": round(build_s, 3),
+        "index_bytes": index_bytes(index),
+    }
+
+
+def run_benchmark(
+    vectors: np.ndarray,
+    variants: Optional[List[Dict[str, Any]]] = None,
+    n_queries: int = 1000,
+    k: int = 10,
+    random_state: int = 42,
+    latency_queries: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Hold out queries, compute exact ground truth, score every variant."""
+    base, queries = holdout_split(
+        np.ascontiguousarray(vectors, dtype="float32"), n_queries, random_state)
+    truth = exact_ground_truth(base, queries, k)
+
+    return [
+        benchmark_variant(v, base, queries, truth, k, latency_queries)
+        for v in (variants or DEFAULT_VARIANTS)
+    ]
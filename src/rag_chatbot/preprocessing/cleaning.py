@@ -1,6 +1,55 @@
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set
+
 import pandas as pd
-from typing import Dict, Set
+
+# ------------------------------------------------------------------------------
+# Schema dtypes
+# ------------------------------------------------------------------------------
+
+# schema.yaml type names -> memory-compact pandas dtypes
+SCHEMA_DTYPES = {
+    "int": "Int64",
+    "float": "Float64",
+    "bool": "boolean",
+    "category": "category",
+    "str": "string[pyarrow]",
+    "string": "string[pyarrow]",
+    "datetime": "datetime64[ns]",
+}
+
+
+def apply_schema_dtypes(
+    df: pd.DataFrame,
+    column_types: Dict[str, str],
+) -> pd.DataFrame:
+    """
+    Cast columns to the compact dtypes declared in schema.yaml `types`
+    (category / Int64 / string[pyarrow] / datetime64). Columns not present
+    in the frame are ignored; unparseable dates become NaT.
+    """
+    casts = {}
+    for column, type_name in column_types.items():
+        if column not in df.columns:
+            continue
+
+        dtype = SCHEMA_DTYPES.get(str(type_name).lower())
+        if dtype is None:
+            raise ValueError(
+                f"Unknown schema type '{type_name}' for column '{column}'")
+
+        if dtype.startswith("datetime"):
+            casts[column] = pd.to_datetime(df[column], errors="coerce")
+        elif dtype == "Int64":
+            casts[column] = pd.to_numeric(
+                df[column], errors="coerce").astype(dtype)
+        elif str(df[column].dtype) != dtype:
+            casts[column] = df[column].astype(dtype)
+
+    return df.assign(**casts) if casts else df
+
 
 # ------------------------------------------------------------------------------
 # Column normalization
@@ -11,14 +60,16 @@ def clean_and_select_columns(
     df: pd.DataFrame,
     column_mapping: Dict[str, str],
     required_columns: Set[str],
+    column_types: Optional[Dict[str, str]] = None,
 ) -> pd.DataFrame:
     """
     Rename columns, validate schema, and select required fields.
+
+    When `column_types` (schema.yaml `types`) is given, columns are cast to
+    compact dtypes; otherwise only date_received is parsed.
     """
     try:
-        df = df.copy()
-
-        # Rename columns
+        # Rename columns (returns a new frame; no defensive copy needed)
         df = df.rename(columns=column_mapping)
 
         # Validate required columns
@@ -30,10 +81,14 @@ def clean_and_select_columns(
         ordered_cols = list(column_mapping.values())
         df = df[ordered_cols]
 
+        if column_types:
+            return apply_schema_dtypes(df, column_types)
+
         # Parse dates safely (only if present)
         if "date_received" in df.columns:
-            df["date_received"] = pd.to_datetime(
-                df["date_received"], errors="coerce"
+            df = df.assign(
+                date_received=pd.to_datetime(
+                    df["date_received"], errors="coerce")
             )
 
         return df
@@ -69,6 +124,19 @@ SYSTEM_MARKERS = [
 ]
 
 
+# ------------------------------------------------------------------
+# Precompiled patterns
+# ------------------------------------------------------------------
+_MASK_RE = re.compile(r"\b[xX]{2,}(?:[/\-\s][xX]{2,})*\b")
+_BOILERPLATE_RES = [re.compile(p) for p in BOILERPLATE_PATTERNS]
+# One scan tells whether any boilerplate phrase is present at all
+_ANY_BOILERPLATE_RE = re.compile("|".join(BOILERPLATE_PATTERNS))
+_SYSTEM_MARKER_RES = [re.compile(m) for m in SYSTEM_MARKERS]
+# Symbol removal + whitespace normalization in a single pass: every run of
+# characters outside [a-z0-9.,-<>] (whitespace included) becomes one space
+_NON_INFORMATIVE_RE = re.compile(r"[^a-z0-9\.\,\-<>]+")
+
+
 def clean_narrative_text(text: str) -> str:
     """
     RAG-safe narrative cleaning:
@@ -85,53 +153,101 @@ def clean_narrative_text(text: str) -> str:
     # --------------------------------------------------------------
     # Normalize masked content (xxxx, xx/xx, xxxx xxxx, etc.)
     # --------------------------------------------------------------
-    text = re.sub(
-        r"\b[xX]{2,}([/\-\s][xX]{2,})*\b",
-        "<masked>",
-        text,
-    )
+    text = _MASK_RE.sub("<masked>", text)
 
     # --------------------------------------------------------------
     # Remove CFPB boilerplate phrases (once, safely)
     # --------------------------------------------------------------
-    for pattern in BOILERPLATE_PATTERNS:
-        text = re.sub(pattern, "", text, count=1)
+    # Most narratives contain none; the per-phrase passes (applied in
+    # order, first occurrence only) only run when the combined scan hits.
+    if _ANY_BOILERPLATE_RE.search(text):
+        for pattern in _BOILERPLATE_RES:
+            text = pattern.sub("", text, count=1)
 
-    # Remove system artifacts
-    for marker in SYSTEM_MARKERS:
-        text = re.sub(marker, "", text)
+    # Remove system artifacts (all markers start with "[[")
+    if "[[" in text:
+        for marker in _SYSTEM_MARKER_RES:
+            text = marker.sub("", text)
 
     # --------------------------------------------------------------
-    # Remove non-informative symbols (keep structure for embeddings)
+    # Remove non-informative symbols and normalize whitespace
     # --------------------------------------------------------------
-    text = re.sub(r"[^a-z0-9\s\.\,\-<>]", " ", text)
+    return _NON_INFORMATIVE_RE.sub(" ", text).strip()
 
-    # --------------------------------------------------------------
-    # Normalize whitespace
-    # --------------------------------------------------------------
-    text = re.sub(r"\s+", " ", text).strip()
 
-    return text
+# Below this many narratives a process pool loses to the in-process path:
+# worker start-up and pickling every narrative both ways cost more than
+# the cleaning saved (scripts/benchmark_cleaning.py --calibrate)
+MIN_PARALLEL_ROWS = 200_000
+
 
+def _clean_partition(texts: List[Any]) -> List[str]:
+    return [clean_narrative_text(t) for t in texts]
 
 
-def apply_text_cleaning(df: pd.DataFrame) -> pd.DataFrame:
+def clean_narratives(
+    texts: Sequence[Any],
+    n_jobs: int = 1,
+    partition_size: int = 20_000,
+    min_parallel_rows: int = MIN_PARALLEL_ROWS,
+) -> List[str]:
+    """
+    Clean many narratives, optionally fanning partitions out across a
+    process pool. Output is identical to mapping clean_narrative_text.
+
+    Args:
+        texts: Narratives (non-strings clean to "")
+        n_jobs: Worker processes; -1 uses every core, 1 runs in-process
+        partition_size: Narratives per task sent to a worker
+        min_parallel_rows: Smaller inputs are cleaned in-process whatever
+            n_jobs is
+    """
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+
+    if (n_jobs <= 1 or len(texts) <= partition_size
+            or len(texts) < min_parallel_rows):
+        return _clean_partition(texts)
+
+    partitions = [
+        list(texts[i:i + partition_size])
+        for i in range(0, len(texts), partition_size)
+    ]
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        cleaned: List[str] = []
+        for part in executor.map(_clean_partition, partitions):
+            cleaned.extend(part)
+
+    return cleaned
+
+
+def apply_text_cleaning(df: pd.DataFrame, n_jobs: int = 1) -> pd.DataFrame:
     """
     Apply narrative cleaning and add a clean_narrative column.
+
+    Args:
+        df: Frame with a consumer_complaint_narrative column
+        n_jobs: Worker processes for cleaning (-1 = all cores)
     """
     try:
-        df = df.copy()
-
         if "consumer_complaint_narrative" not in df.columns:
             raise ValueError(
                 "Required column 'consumer_complaint_narrative' not found"
             )
 
-        df["clean_narrative"] = df[
-            "consumer_complaint_narrative"
-        ].apply(clean_narrative_text)
-
-        return df
+        narratives = df["consumer_complaint_narrative"]
+        cleaned = pd.Series(
+            clean_narratives(narratives.tolist(), n_jobs=n_jobs),
+            index=narratives.index,
+            # Keep Arrow-backed strings when the input uses them
+            dtype=(
+                narratives.dtype
+                if isinstance(narratives.dtype, pd.StringDtype) else None
+            ),
+        )
+
+        return df.assign(clean_narrative=cleaned)
 
     except Exception as e:
         raise RuntimeError(f"Text cleaning failed: {e}") from e
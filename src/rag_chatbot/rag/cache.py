@@ -0,0 +1,375 @@
+"""
+Response and retrieval caches.
+
+ResponseCache is an exact-match cache of generated answers, keyed on
+everything that determines them:
+
+    normalized query, metadata filters, retrieved chunks (content hashes),
+    prompt template hash, LLM config, vector store snapshot version
+
+so a repeated request skips generation, and a refreshed index or an
+edited prompt template never serves a stale answer.
+
+Two tiers:
+
+- an in-memory LRU per process;
+- an optional SQLite file shared by every process on the host (pre-fork
+  workers, the UI and the API), in WAL mode so readers never block.
+
+Entries carry their generation (snapshot version + prompt hash). When the
+pipeline first sees a new generation, the cache drops the entries of the
+other generations from both tiers. The generation is part of the key, so
+pruning only reclaims space: a worker still serving the previous snapshot
+during a rollout recomputes instead of reading a wrong entry.
+
+RetrievalCache keeps the top-k rows per quantized query embedding, k and
+filters, so a repeated lookup skips the FAISS search and the metadata
+gather; it is emptied whenever the retriever swaps snapshots.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from rag_chatbot.rag.singleflight import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# LLM settings that change speed, not output; ignored in the key so that
+# workers with different thread budgets share entries
+_RUNTIME_KEYS = frozenset({"threads", "batch_size", "stream", "callbacks"})
+
+
+# ------------------------------------------------------------------
+# Key parts
+# ------------------------------------------------------------------
+
+def _digest(obj: Any) -> str:
+    data = json.dumps(obj, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def prompt_hash(prompt: Any) -> str:
+    """Hash of the prompt template (LangChain PromptTemplate or any object)."""
+    return _digest(getattr(prompt, "template", None) or repr(prompt))[:16]
+
+
+def llm_config(llm: Any) -> Dict[str, Any]:
+    """
+    Output-relevant configuration of an LLM: LangChain's identifying
+    params when available (model, model_type, config), else its
+    attributes, without the _RUNTIME_KEYS.
+    """
+    params = getattr(llm, "_identifying_params", None)
+    if not isinstance(params, dict):
+        params = {k: v for k, v in vars(llm).items() if not k.startswith("_")}
+
+    def _clean(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: _clean(v) for k, v in value.items()
+                    if k not in _RUNTIME_KEYS}
+        return value
+
+    return {"type": type(llm).__name__, **_clean(params)}
+
+
+def chunk_ids(chunks: List[Dict]) -> List[str]:
+    """Content hash of every retrieved chunk, in rank order."""
+    return [
+        hashlib.sha1(str(c.get("document", "")).encode("utf-8")).hexdigest()
+        for c in chunks
+    ]
+
+
+def response_key(
+    query: str,
+    filters: Optional[Dict],
+    chunks: List[str],
+    prompt: str,
+    llm: Dict[str, Any],
+    version: Optional[str],
+) -> str:
+    """Cache key of one generated answer (see the module docstring)."""
+    from rag_chatbot.rag.retriever import filters_key
+
+    return _digest([
+        normalize_query(query), filters_key(filters), chunks, prompt, llm, version,
+    ])
+
+
+# ------------------------------------------------------------------
+# Response cache
+# ------------------------------------------------------------------
+
+class ResponseCache:
+    """
+    In-memory LRU with an optional SQLite tier.
+
+        cache = ResponseCache(max_entries=1024, path="data/interim/responses.sqlite")
+        cache.set_generation(f"{version}:{prompt_hash(prompt)}")
+        answer = cache.get(key)
+        if answer is None:
+            cache.put(key, answer := generate())
+
+    Args:
+        max_entries: Entries kept in memory (least recently used evicted)
+        path: SQLite file shared across processes (None: memory only)
+        ttl_s: Drop entries older than this (None: keep until evicted)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        path: Optional[Path] = None,
+        ttl_s: Optional[float] = None,
+    ):
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self.ttl_s = ttl_s
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generation: Optional[str] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._hits = {"memory": 0, "disk": 0}
+        self._misses = 0
+
+    # --------------------------------------------------------------
+    # SQLite tier
+    # --------------------------------------------------------------
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """This process's connection (connections must not cross a fork)."""
+        if self.path is None:
+            return None
+        if self._conn is None or self._conn_pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=5.0, check_same_thread=False,
+                isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, generation TEXT, answer TEXT,"
+                " created_at REAL)")
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_s is not None and time.time() - created_at > self.ttl_s
+
+    # --------------------------------------------------------------
+    # API
+    # --------------------------------------------------------------
+
+    def set_generation(self, generation: str) -> None:
+        """
+        Declare the current snapshot version + prompt hash; entries of any
+        other generation are dropped the first time it changes.
+        """
+        if generation == self._generation:
+            return
+
+        with self._lock:
+            if generation == self._generation:
+                return
+            previous, self._generation = self._generation, generation
+            self._memory.clear()
+            db = self._db()
+            if db is not None:
+                try:
+                    db.execute(
+                        "DELETE FROM responses WHERE generation != ?",
+                        (generation,))
+                except sqlite3.Error as exc:
+                    logger.warning("Response cache prune failed: %s", exc)
+
+        logger.info("Response cache generation %s -> %s", previous, generation)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1]):
+                self._memory.move_to_end(key)
+                self._hits["memory"] += 1
+                return entry[0]
+
+            db = self._db()
+            row = None
+            if db is not None:
+                try:
+                    row = db.execute(
+                        "SELECT answer, created_at FROM responses"
+                        " WHERE key = ? AND generation = ?",
+                        (key, self._generation)).fetchone()
+                except sqlite3.Error as exc:
+                    logger.warning("Response cache read failed: %s", exc)
+
+            if row is not None and not self._expired(row[1]):
+                self._remember(key, row[0], row[1])
+                self._hits["disk"] += 1
+                return row[0]
+
+            self._misses += 1
+            return None
+
+    def put(self, key: str, answer: str) -> None:
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, answer, created_at)
+            db = self._db()
+            if db is not None:
+                try:
+                    db.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                        (key, self._generation, answer, created_at))
+                except sqlite3.Error as exc:
+                    logger.warning("Response cache write failed: %s", exc)
+
+    def _remember(self, key: str, answer: str, created_at: float) -> None:
+        self._memory[key] = (answer, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            db = self._db()
+            if db is not None:
+                db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(self._hits.values())
+            total = hits + self._misses
+            return {
+                "hits": hits,
+                "memory_hits": self._hits["memory"],
+                "disk_hits": self._hits["disk"],
+                "misses": self._misses,
+                "hit_ratio": round(hits / total, 4) if total else 0.0,
+                "entries": len(self._memory),
+                "generation": self._generation,
+            }
+
+
+def response_cache_from_config(
+    cfg: Optional[Dict[str, Any]], root: Optional[Path] = None
+) -> Optional[ResponseCache]:
+    """
+    ResponseCache for a `response_cache` config section, or None if it is
+    disabled. A relative `path` is resolved against `root`.
+    """
+    cfg = cfg or {}
+    if not cfg.get("enabled", False):
+        return None
+
+    path = cfg.get("path")
+    if path and root is not None and not Path(path).is_absolute():
+        path = Path(root) / path
+    return ResponseCache(
+        max_entries=cfg.get("max_entries", 1024),
+        path=path,
+        ttl_s=cfg.get("ttl_s"),
+    )
+
+
+# ------------------------------------------------------------------
+# Retrieval cache
+# ------------------------------------------------------------------
+
+class RetrievalCache:
+    """
+    LRU of retrieval results (metadata rows) keyed on the quantized query
+    embedding, k and filters, for the Retriever.
+
+    Embeddings are rounded to multiples of `step` before hashing, so the
+    same query embedded twice (or a near-identical vector) hits even if
+    the floats differ in the last bits.
+
+    Entries belong to one index snapshot. The retriever binds the cache
+    to the snapshot it serves; a swap clears it, and lookups by requests
+    still finishing on the previous snapshot bypass it.
+
+    Args:
+        max_entries: Results kept (least recently used evicted)
+        step: Quantization step of the embedding components
+    """
+
+    def __init__(self, max_entries: int = 4096, step: float = 1e-3):
+        self.max_entries = max_entries
+        self.step = step
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, List[Dict]]" = OrderedDict()
+        self._snapshot: Any = None
+        self._hits = 0
+        self._misses = 0
+
+    def bind(self, snapshot: Any) -> None:
+        """Serve entries for `snapshot` only; drops everything cached so far."""
+        with self._lock:
+            self._snapshot = snapshot
+            self._entries.clear()
+
+    def key(self, embedding, k: int, filters: Optional[Dict] = None) -> tuple:
+        import numpy as np
+
+        from rag_chatbot.rag.retriever import filters_key
+
+        quantized = np.rint(np.asarray(embedding, dtype="float32").ravel()
+                            / self.step).astype("int32")
+        return quantized.tobytes(), k, filters_key(filters)
+
+    def get(self, snapshot: Any, key: tuple) -> Optional[List[Dict]]:
+        with self._lock:
+            rows = (self._entries.get(key)
+                    if snapshot is self._snapshot else None)
+            if rows is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        # Callers own their rows
+        return [dict(row) for row in rows]
+
+    def put(self, snapshot: Any, key: tuple, rows: List[Dict]) -> None:
+        with self._lock:
+            if snapshot is not self._snapshot:
+                return
+            self._entries[key] = [dict(row) for row in rows]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+def retrieval_cache_from_config(
+    cfg: Optional[Dict[str, Any]],
+) -> Optional[RetrievalCache]:
+    """RetrievalCache for a `retrieval_cache` config section, or None."""
+    cfg = cfg or {}
+    if not cfg.get("enabled", False):
+        return None
+    return RetrievalCache(
+        max_entries=cfg.get("max_entries", 4096),
+        step=cfg.get("step", 1e-3),
+    )
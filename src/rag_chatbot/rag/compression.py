@@ -0,0 +1,134 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Sentence boundaries in cleaned narratives: terminal punctuation followed
+# by whitespace, or explicit line breaks between chunks.
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_sentences(text: str, min_chars: int = 20) -> List[str]:
+    """
+    Split a chunk into sentences, dropping fragments that are too short
+    to carry any information on their own.
+    """
+    if not text:
+        return []
+
+    sentences = (s.strip() for s in _SENTENCE_BOUNDARY.split(text))
+    return [s for s in sentences if len(s) >= min_chars]
+
+
+def approx_token_count(text: str) -> int:
+    """
+    Cheap token estimate for llama-style tokenizers (~4 chars per token).
+    """
+    return max(1, (len(text) + 3) // 4)
+
+
+class ContextCompressor:
+    """
+    Query-aware extractive compression of retrieved chunks.
+
+    Retrieved chunks are split into sentences, all sentences are scored
+    against the query embedding in a single batched encode, and the best
+    sentences are kept until the token budget is exhausted. Kept sentences
+    are emitted in their original order so the context still reads
+    naturally.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        token_budget: int = 256,
+        min_sentence_chars: int = 20,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        self.embedder = embedder
+        self.token_budget = token_budget
+        self.min_sentence_chars = min_sentence_chars
+        self.count_tokens = count_tokens or approx_token_count
+
+    def rank_sentences(
+        self,
+        query_embedding: np.ndarray,
+        chunks: List[Dict],
+    ) -> List[Tuple[float, int, int, str]]:
+        """
+        Score every sentence of the retrieved chunks against the query.
+
+        Returns:
+            (score, chunk_index, sentence_index, sentence) tuples sorted by
+            descending score.
+        """
+        positions: List[Tuple[int, int]] = []
+        sentences: List[str] = []
+
+        for ci, chunk in enumerate(chunks):
+            parts = split_sentences(
+                chunk.get("document", "") or "", self.min_sentence_chars
+            )
+            for si, sentence in enumerate(parts):
+                positions.append((ci, si))
+                sentences.append(sentence)
+
+        if not sentences:
+            return []
+
+        sentence_embs = self.embedder.embed_batch(sentences)
+        query = np.asarray(query_embedding, dtype="float32").reshape(-1)
+        scores = sentence_embs @ query
+
+        order = np.argsort(-scores, kind="stable")
+        return [
+            (float(scores[i]), positions[i][0], positions[i][1], sentences[i])
+            for i in order
+        ]
+
+    def select(
+        self,
+        query_embedding: np.ndarray,
+        chunks: List[Dict],
+    ) -> List[Tuple[float, int, int, str]]:
+        """
+        Pick the highest scoring sentences that fit in the token budget,
+        returned in document order.
+        """
+        selected = []
+        used = 0
+
+        for ranked in self.rank_sentences(query_embedding, chunks):
+            cost = self.count_tokens(ranked[3])
+            if used + cost > self.token_budget:
+                continue
+            selected.append(ranked)
+            used += cost
+
+        return sorted(selected, key=lambda r: (r[1], r[2]))
+
+    def compress(self, query_embedding: np.ndarray, chunks: List[Dict]) -> str:
+        """
+        Build a compressed context string from the retrieved chunks.
+        """
+        selected = self.select(query_embedding, chunks)
+
+        paragraphs: Dict[int, List[str]] = {}
+        for _, ci, _, sentence in selected:
+            paragraphs.setdefault(ci, []).append(sentence)
+
+        return "\n\n".join(" ".join(s) for s in paragraphs.values())
+
+
+def compressor_from_config(
+    embedder, cfg: Optional[Dict[str, Any]]
+) -> Optional[ContextCompressor]:
+    """ContextCompressor for a `compression` config section, or None."""
+    cfg = cfg or {}
+    if not cfg.get("enabled", False):
+        return None
+    return ContextCompressor(
+        embedder,
+        token_budget=cfg.get("token_budget", 256),
+        min_sentence_chars=cfg.get("min_sentence_chars", 20),
+    )
@@ -1,17 +1,38 @@
+import os
 import re
-import pandas as pd
-import numpy as np
-import nltk
-from typing import List, Dict
-from nltk.corpus import stopwords
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, List, Dict, FrozenSet, Tuple
 
-# Ensure stopwords are available
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+if TYPE_CHECKING:
+    import pandas as pd
 
-SET_STOPWORDS = set(stopwords.words('english'))
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1)
+def get_stopwords() -> FrozenSet[str]:
+    """
+    English stopwords, loaded (and downloaded if missing) on first use
+    rather than at import time.
+    """
+    import nltk
+    from nltk.corpus import stopwords
+
+    # Ensure stopwords are available
+    try:
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        nltk.download('stopwords')
+
+    return frozenset(stopwords.words('english'))
+
+
+@lru_cache(maxsize=200_000)
+def _token_set(text: str, stop_words: FrozenSet[str]) -> FrozenSet[str]:
+    # Cached: the same chunks come back for many queries
+    tokens = _TOKEN_RE.findall(text.lower())
+    return frozenset(
+        t for t in tokens if t not in stop_words and not t.isdigit())
 
 
 def get_clean_tokens(text: str) -> set:
@@ -19,8 +40,11 @@ def get_clean_tokens(text: str) -> set:
     if not text:
         return set()
     # Tokenize words and remove non-alphanumeric characters
-    tokens = re.findall(r"\w+", text.lower())
-    return {t for t in tokens if t not in SET_STOPWORDS and not t.isdigit()}
+    return set(_token_set(text, get_stopwords()))
+
+
+def _overlap(tokens: FrozenSet[str], reference: FrozenSet[str]) -> float:
+    return round(len(tokens & reference) / len(tokens), 3)
 
 
 def precision_at_k_semantic(
@@ -55,8 +79,7 @@ def faithfulness_score(answer: str, context: str) -> float:
     if not answer_tokens:
         return 0.0
 
-    overlap = answer_tokens & context_tokens
-    return round(len(overlap) / len(answer_tokens), 3)
+    return _overlap(answer_tokens, context_tokens)
 
 
 def answer_relevancy_score(answer: str, query: str) -> float:
@@ -67,27 +90,32 @@ def answer_relevancy_score(answer: str, query: str) -> float:
     if not query_tokens:
         return 1.0
 
-    overlap = answer_tokens & query_tokens
-    return round(len(overlap) / len(query_tokens), 3)
+    return _overlap(query_tokens, answer_tokens)
 
 
-def build_evaluation_table(
-    results: List[Dict],
-    similarity_threshold: float = 0.7,
-    is_distance: bool = False
-) -> pd.DataFrame:
-    """Builds a comprehensive evaluation dataframe."""
+def _evaluation_rows(
+    args: Tuple[List[Dict], float, bool, FrozenSet[str]]
+) -> List[Dict[str, Any]]:
+    results, similarity_threshold, is_distance, stop_words = args
     rows = []
 
     for r in results:
         sources = r.get("sources", [])
-        context = "\n".join(c.get("document", "") for c in sources)
+
+        # Token sets are computed once per text (answer, query, chunk);
+        # the context's set is the union of its chunks' sets
+        answer_tokens = _token_set(r["answer"] or "", stop_words)
+        query_tokens = _token_set(r["query"] or "", stop_words)
+        context_tokens = frozenset().union(*(
+            _token_set(c.get("document", "") or "", stop_words)
+            for c in sources
+        ))
 
         # Calculate scores
         prec = precision_at_k_semantic(
             sources, threshold=similarity_threshold, is_distance=is_distance)
-        faith = faithfulness_score(r["answer"], context)
-        relevancy = answer_relevancy_score(r["answer"], r["query"])
+        faith = _overlap(answer_tokens, context_tokens) if answer_tokens else 0.0
+        relevancy = _overlap(query_tokens, answer_tokens) if query_tokens else 1.0
 
         # Determine Max Similarity (handle Distance vs Similarity)
         scores = [c.get("score", 0.0) for c in sources]
@@ -103,4 +131,41 @@ def build_evaluation_table(
             "num_chunks": len(sources),
         })
 
-    return pd.DataFrame(rows)
+    return rows
+
+
+def build_evaluation_table(
+    results: List[Dict],
+    similarity_threshold: float = 0.7,
+    is_distance: bool = False,
+    n_jobs: int = 1,
+    partition_size: int = 2000,
+) -> "pd.DataFrame":
+    """
+    Builds a comprehensive evaluation dataframe.
+
+    Tokenization is cached per text, so chunks shared by many results are
+    tokenized once. With n_jobs > 1 (-1: every core) the results are scored
+    in partitions of `partition_size` across worker processes.
+    """
+    import pandas as pd
+
+    stop_words = get_stopwords()
+    tasks = [
+        (results[i:i + partition_size], similarity_threshold, is_distance,
+         stop_words)
+        for i in range(0, len(results), partition_size)
+    ]
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+
+    if n_jobs <= 1 or len(tasks) <= 1:
+        parts = [_evaluation_rows(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            parts = list(executor.map(_evaluation_rows, tasks))
+
+    return pd.DataFrame([row for part in parts for row in part])
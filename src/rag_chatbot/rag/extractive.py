@@ -0,0 +1,50 @@
+from typing import Dict, List
+
+import numpy as np
+
+from rag_chatbot.rag.compression import ContextCompressor
+
+NO_ANSWER = "I could not find relevant information in the retrieved complaints."
+
+# Length of the first-chunk excerpt used when no sentence qualifies
+FALLBACK_CHARS = 300
+
+
+def build_extractive_answer(
+    compressor: ContextCompressor,
+    query_embedding: np.ndarray,
+    chunks: List[Dict],
+    max_sentences: int = 3,
+) -> str:
+    """
+    Answer from the most query-similar sentences of the retrieved chunks,
+    without calling the LLM.
+
+    Each sentence is followed by a citation [n] pointing at the n-th entry
+    of the returned sources (1-based, same numbering as the UI). When no
+    sentence is long enough to rank, the answer is an excerpt of the first
+    non-empty chunk, or NO_ANSWER if every chunk is empty.
+    """
+    ranked = compressor.rank_sentences(query_embedding, chunks)
+
+    seen = set()
+    lines = []
+    for _, ci, _, sentence in ranked:
+        if sentence in seen:
+            continue
+        seen.add(sentence)
+        lines.append(f"- {sentence} [{ci + 1}]")
+        if len(lines) == max_sentences:
+            break
+
+    if lines:
+        return "\n".join(lines)
+
+    for ci, chunk in enumerate(chunks):
+        text = " ".join((chunk.get("document") or "").split())
+        if text:
+            if len(text) > FALLBACK_CHARS:
+                text = text[:FALLBACK_CHARS].rsplit(" ", 1)[0] + "..."
+            return f"- {text} [{ci + 1}]"
+
+    return NO_ANSWER
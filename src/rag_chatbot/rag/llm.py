@@ -1,13 +1,10 @@
 import os
-from huggingface_hub import hf_hub_download
-from langchain_community.llms import CTransformers
+import time
 from rag_chatbot.core.settings import settings
 
 REPO_ID = "TheBloke/TinyLlama-1.1B-Chat-v1.0-GGUF"
 FILENAME = "tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf"
 
-MODEL_DIR = settings.paths.MODEL["model_dir"]
-
 _LLM = None
 
 
@@ -17,12 +14,19 @@ def get_llm():
     if _LLM is not None:
         return _LLM
 
-    os.makedirs(MODEL_DIR, exist_ok=True)
+    # Heavy imports are deferred until a model is actually requested
+    from huggingface_hub import hf_hub_download
+    from langchain_community.llms import CTransformers
+
+    from rag_chatbot.core.resources import get_resource_plan
+
+    model_dir = settings.paths.MODEL["model_dir"]
+    os.makedirs(model_dir, exist_ok=True)
 
     model_path = hf_hub_download(
         repo_id=REPO_ID,
         filename=FILENAME,
-        local_dir=MODEL_DIR,
+        local_dir=model_dir,
         local_dir_use_symlinks=False,
     )
 
@@ -35,7 +39,8 @@ def get_llm():
         'temperature': 0.0,       # Deterministic for RAG
         'repetition_penalty': 1.1,
         'context_length': 1024,   # TinyLlama handles 2048, but 1024 is faster
-        'threads': 4,             # Ensure this matches your physical cores
+        # Generation's share of the cores (config/rag.yaml, resources)
+        'threads': get_resource_plan().threads["generation"],
         'batch_size': 128,        # Increased from 32 to process prompt faster
         'stream': True            # Essential for perception of speed
     }
@@ -47,3 +52,41 @@ def get_llm():
     )
 
     return _LLM
+
+
+class StubLLM:
+    """
+    Deterministic stand-in for the LLM: answers with the first `max_words`
+    words of the prompt's context, optionally after `latency_s` seconds.
+
+    Used to compute retrieval metrics (and drive the pipeline under load)
+    without generation cost. Implements the parts of the LangChain LLM
+    interface the pipeline and loader use: invoke, ainvoke, stream, batch.
+    """
+
+    def __init__(self, max_words: int = 40, latency_s: float = 0.0):
+        self.max_words = max_words
+        self.latency_s = latency_s
+
+    def _answer(self, prompt: str) -> str:
+        # Text between "Context:" and "Question:" (whole prompt otherwise)
+        context = prompt.split("Context:", 1)[-1].split("Question:", 1)[0]
+        return " ".join(context.split()[:self.max_words])
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return self._answer(prompt)
+
+    async def ainvoke(self, prompt: str, **kwargs) -> str:
+        if self.latency_s:
+            import asyncio
+            await asyncio.sleep(self.latency_s)
+        return self._answer(prompt)
+
+    def stream(self, prompt: str, **kwargs):
+        for i, word in enumerate(self.invoke(prompt).split()):
+            yield word if i == 0 else " " + word
+
+    def batch(self, prompts, **kwargs):
+        return [self.invoke(p) for p in prompts]
@@ -0,0 +1,303 @@
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from rag_chatbot.core.resources import (
+    StageExecutors,
+    apply_thread_limits,
+    get_resource_plan,
+)
+
+logger = logging.getLogger(__name__)
+
+WARMUP_QUERY = "What are common credit card complaints?"
+
+
+class PipelineLoader:
+    """
+    Loads the query embedder, retriever (index + metadata) and LLM
+    concurrently in background threads, runs one warmup inference on each,
+    and assembles the RAGPipeline once everything is ready.
+
+    Heavy imports happen inside the loader threads so that the caller
+    (the UI/API process) can bind its port immediately.
+
+    Usage:
+        loader = PipelineLoader(index_path, metadata_path).start()
+        loader = PipelineLoader(store_root=root, reload_interval_s=30).start()
+        rag = loader.wait(timeout=5)   # None while still warming up
+    """
+
+    COMPONENTS = ("embedder", "retriever", "llm")
+
+    def __init__(
+        self,
+        index_path: Optional[Path] = None,
+        metadata_path: Optional[Path] = None,
+        prompt=None,
+        k: int = 5,
+        report_path: Optional[Path] = None,
+        store_root: Optional[Path] = None,
+        reload_interval_s: Optional[float] = None,
+        mmap_index: bool = False,
+        warmup: bool = True,
+        coalesce: bool = False,
+        response_cache=None,
+        retrieval_cache=None,
+        compression: Optional[Dict[str, Any]] = None,
+    ):
+        self.index_path = Path(index_path) if index_path else None
+        self.metadata_path = Path(metadata_path) if metadata_path else None
+        self.prompt = prompt
+        self.k = k
+        # Versioned vector store: serve its CURRENT snapshot instead of
+        # the paths above and poll for new ones every reload_interval_s
+        # seconds, if set
+        self.store_root = Path(store_root) if store_root else None
+        self.reload_interval_s = reload_interval_s
+        # Memory-map the FAISS index (shared across processes)
+        self.mmap_index = mmap_index
+        # False: load only. A pre-fork master skips warmup so that no
+        # OpenMP/torch thread pool exists when it forks; workers warm up.
+        self.warmup = warmup
+        # Share one computation between concurrent identical queries
+        self.coalesce = coalesce
+        # Optional rag.cache.ResponseCache handed to the pipeline
+        self.response_cache = response_cache
+        # Optional rag.cache.RetrievalCache handed to the retriever
+        self.retrieval_cache = retrieval_cache
+        # `compression` config section: query-aware context compression
+        # with the loaded embedder (disabled when None)
+        self.compression = compression
+        # Where to write the startup-time breakdown once ready (optional)
+        self.report_path = report_path
+
+        self._objects: Dict[str, Any] = {}
+        self._status: Dict[str, Dict[str, Any]] = {
+            name: {"state": "pending"} for name in self.COMPONENTS
+        }
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._done = threading.Event()
+        self._pipeline = None
+        self._started_at: Optional[float] = None
+        self._ready_at: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Component loaders (load, warmup)
+    # ------------------------------------------------------------------
+
+    def _load_embedder(self):
+        from rag_chatbot.rag.query_embedder import QueryEmbedder
+        embedder = QueryEmbedder()
+        # torch is imported now: size its pool to the embedding budget
+        apply_thread_limits(get_resource_plan())
+        return embedder
+
+    def _warmup_embedder(self, embedder) -> None:
+        embedder.embed(WARMUP_QUERY)
+
+    def _load_retriever(self):
+        from rag_chatbot.rag.retriever import Retriever
+
+        if self.store_root is None:
+            retriever = Retriever(self.index_path, self.metadata_path,
+                                  k=self.k, mmap=self.mmap_index,
+                                  cache=self.retrieval_cache)
+        else:
+            retriever = Retriever.from_store(
+                self.store_root, k=self.k, mmap=self.mmap_index,
+                cache=self.retrieval_cache)
+
+        apply_thread_limits(get_resource_plan())
+        if self.reload_interval_s:
+            retriever.start_watching(self.reload_interval_s)
+        return retriever
+
+    def _warmup_retriever(self, retriever) -> None:
+        # Touch the index pages with a dummy search
+        retriever.retrieve(np.zeros(retriever.index.d, dtype="float32"))
+
+    def _load_llm(self):
+        from rag_chatbot.rag.llm import get_llm
+        return get_llm()
+
+    def _warmup_llm(self, llm) -> None:
+        # Evaluate a tiny prompt and stop after the first token
+        for _ in llm.stream("Hello"):
+            break
+
+    # ------------------------------------------------------------------
+    # Orchestration
+    # ------------------------------------------------------------------
+
+    def _run_component(
+        self,
+        name: str,
+        load: Callable[[], Any],
+        warmup: Callable[[Any], None],
+    ) -> None:
+        status = self._status[name]
+        try:
+            status["state"] = "loading"
+            t0 = time.perf_counter()
+            obj = load()
+            t1 = time.perf_counter()
+
+            status["state"] = "warming_up"
+            if self.warmup:
+                warmup(obj)
+            t2 = time.perf_counter()
+
+            status.update(
+                state="ready",
+                load_s=round(t1 - t0, 3),
+                warmup_s=round(t2 - t1, 3),
+            )
+            self._objects[name] = obj
+            logger.info("%s ready (load %.2fs, warmup %.2fs)",
+                        name, t1 - t0, t2 - t1)
+
+        except Exception as exc:
+            status.update(state="failed", error=str(exc))
+            logger.error("Failed to load %s: %s", name, exc)
+
+        finally:
+            self._on_component_done()
+
+    def _on_component_done(self) -> None:
+        with self._lock:
+            states = [s["state"] for s in self._status.values()]
+            if any(s in ("pending", "loading", "warming_up") for s in states):
+                return
+
+            if all(s == "ready" for s in states):
+                from rag_chatbot.rag.compression import compressor_from_config
+                from rag_chatbot.rag.pipeline import RAGPipeline
+                from rag_chatbot.rag.singleflight import SingleFlight
+
+                if self.prompt is None:
+                    from rag_chatbot.prompt.prompts import get_prompt
+                    self.prompt = get_prompt()
+
+                self._pipeline = RAGPipeline(
+                    embedder=self._objects["embedder"],
+                    retriever=self._objects["retriever"],
+                    llm=self._objects["llm"],
+                    prompt=self.prompt,
+                    compressor=compressor_from_config(
+                        self._objects["embedder"], self.compression),
+                    executors=StageExecutors(get_resource_plan()),
+                    singleflight=SingleFlight() if self.coalesce else None,
+                    response_cache=self.response_cache,
+                )
+                self._ready_at = time.perf_counter()
+                self._ready.set()
+                logger.info("Pipeline ready: %s", self.startup_report())
+                if self.report_path is not None:
+                    self.write_report(self.report_path)
+
+            self._done.set()
+
+    def start(self) -> "PipelineLoader":
+        """Start loading all components in background threads."""
+        if self._started_at is not None:
+            return self
+
+        self._started_at = time.perf_counter()
+        for name in self.COMPONENTS:
+            thread = threading.Thread(
+                target=self._run_component,
+                args=(
+                    name,
+                    getattr(self, f"_load_{name}"),
+                    getattr(self, f"_warmup_{name}"),
+                ),
+                name=f"loader-{name}",
+                daemon=True,
+            )
+            thread.start()
+
+        return self
+
+    def warm_up(self) -> None:
+        """Run every component's warmup (after loading with warmup=False)."""
+        for name in self.COMPONENTS:
+            getattr(self, f"_warmup_{name}")(self._objects[name])
+
+    # ------------------------------------------------------------------
+    # Readiness
+    # ------------------------------------------------------------------
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def failed(self) -> bool:
+        return any(s["state"] == "failed" for s in self._status.values())
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness state of the loader and each component."""
+        if self.ready:
+            state = "ready"
+        elif self.failed:
+            state = "failed"
+        elif self._started_at is None:
+            state = "not_started"
+        else:
+            state = "warming_up"
+
+        return {
+            "state": state,
+            "components": {k: dict(v) for k, v in self._status.items()},
+        }
+
+    def wait(self, timeout: Optional[float] = None):
+        """
+        Block until the pipeline is ready or `timeout` elapses.
+
+        Returns:
+            The RAGPipeline, or None if it is still warming up.
+
+        Raises:
+            RuntimeError: If a component failed to load.
+        """
+        self._done.wait(timeout)
+
+        if self.failed:
+            errors = {
+                k: v.get("error") for k, v in self._status.items()
+                if v["state"] == "failed"
+            }
+            raise RuntimeError(f"Pipeline failed to load: {errors}")
+
+        return self._pipeline
+
+    # ------------------------------------------------------------------
+    # Startup report
+    # ------------------------------------------------------------------
+
+    def startup_report(self) -> Dict[str, Any]:
+        """Per-component load/warmup times and wall time to readiness."""
+        report: Dict[str, Any] = {
+            name: {
+                k: v for k, v in status.items() if k in ("load_s", "warmup_s")
+            }
+            for name, status in self._status.items()
+        }
+        if self._started_at is not None and self._ready_at is not None:
+            report["time_to_ready_s"] = round(
+                self._ready_at - self._started_at, 3)
+        return report
+
+    def write_report(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.startup_report(), f, indent=2)
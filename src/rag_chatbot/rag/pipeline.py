@@ -1,15 +1,71 @@
 import asyncio
-from typing import Dict, Any, List
+import functools
+import threading
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional
+from rag_chatbot.rag.cache import chunk_ids, llm_config, prompt_hash, response_key
 from rag_chatbot.rag.hallucination_guard import should_answer
 from rag_chatbot.rag.confidence import compute_confidence
+from rag_chatbot.rag.compression import ContextCompressor
+from rag_chatbot.rag.extractive import build_extractive_answer
+from rag_chatbot.rag.singleflight import flight_key
+from rag_chatbot.utils import timing
+from rag_chatbot.utils.timing import collect_timings, span
+
+# "generate" runs the LLM; "extractive" answers from the best retrieved
+# sentences only and skips generation entirely (low-latency tier).
+ANSWER_MODES = ("generate", "extractive")
+
+
+@lru_cache(maxsize=1)
+def _first_token_handler_cls():
+    """
+    LangChain callback marking the arrival of the first generated token,
+    which splits generation time into prompt eval and decoding.
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class FirstTokenTimer(BaseCallbackHandler):
+        run_inline = True
+
+        def __init__(self):
+            self.first_token_at = None
+
+        def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+
+    return FirstTokenTimer
 
 
 class RAGPipeline:
-    def __init__(self, embedder, retriever, llm, prompt):
+    def __init__(self, embedder, retriever, llm, prompt, compressor=None,
+                 executors=None, singleflight=None, response_cache=None):
         self.embedder = embedder
         self.retriever = retriever
         self.llm = llm
         self.prompt = prompt
+        # Optional ContextCompressor; when set, the prompt only receives the
+        # query-relevant sentences of the retrieved chunks.
+        self.compressor = compressor
+        # Optional core.resources.StageExecutors; when set, embedding,
+        # search and generation run on their own budgeted thread pools
+        # instead of the caller's thread.
+        self.executors = executors
+        # Optional rag.singleflight.SingleFlight; when set, concurrent
+        # arun() calls with the same normalized query, mode and filters
+        # share one computation.
+        self.singleflight = singleflight
+        # Optional rag.cache.ResponseCache; when set, generated answers are
+        # reused for the same query, filters, chunks, prompt and LLM.
+        self.response_cache = response_cache
+
+    @staticmethod
+    def _check_mode(mode: str) -> None:
+        if mode not in ANSWER_MODES:
+            raise ValueError(
+                f"Unknown answer mode '{mode}'. Expected one of {ANSWER_MODES}")
 
     def _format_context(self, chunks: List[Dict]) -> str:
         """Cleans and formats retrieved chunks into a single string."""
@@ -17,44 +73,256 @@ class RAGPipeline:
         docs = [c["document"].strip() for c in chunks]
         return "\n\n---\n\n".join(docs)
 
-    async def arun(self, query: str) -> Dict[str, Any]:
-        """Asynchronous execution for better performance in web/app environments."""
+    def _build_context(self, query_emb, chunks: List[Dict]) -> str:
+        """Compress retrieved chunks when a compressor is configured."""
+        if self.compressor is not None:
+            context = self.compressor.compress(query_emb, chunks)
+            if context:
+                return context
 
-        # 1. Retrieval
+        context = "\n\n".join(c["document"] for c in chunks[:2])
+        return context[:2000]
+
+    @staticmethod
+    def _search_args(query_emb, filters: Optional[Dict]) -> tuple:
+        # Retrievers without filter support keep working unfiltered
+        return (query_emb,) if not filters else (query_emb, filters)
+
+    def _retrieve(self, query: str, filters: Optional[Dict] = None):
+        """Shared retrieval path for every answer mode."""
         query_emb = self.embedder.embed(query)
-        retrieved_chunks = self.retriever.retrieve(query_emb)
+        return query_emb, self.retriever.retrieve(
+            *self._search_args(query_emb, filters))
 
-        # 2. Guardrails (Hard Block)
-        if not should_answer(retrieved_chunks):
-            return {
-                "query": query,
-                "answer": "I'm sorry, I don't have enough information in my database to answer that accurately.",
-                "confidence": 0.0,
-                "sources": [],
-            }
+    async def _stage(self, stage: str, fn, *args):
+        """fn(*args) on the stage's executor, or inline without executors."""
+        if self.executors is None:
+            return fn(*args)
+        return await self.executors.run(stage, fn, *args)
+
+    async def _offload(self, stage: str, fn, *args):
+        """fn(*args) off the event loop: the stage's executor, else a thread."""
+        if self.executors is None:
+            return await asyncio.to_thread(fn, *args)
+        return await self.executors.run(stage, fn, *args)
+
+    async def _aretrieve(self, query: str, filters: Optional[Dict] = None):
+        query_emb = await self._stage("embedding", self.embedder.embed, query)
+        return query_emb, await self._stage(
+            "search", self.retriever.retrieve,
+            *self._search_args(query_emb, filters))
+
+    async def _ainvoke(self, formatted_prompt: str, **kwargs):
+        if self.executors is None:
+            return await self.llm.ainvoke(formatted_prompt, **kwargs)
+        return await self.executors.run(
+            "generation", functools.partial(self.llm.invoke, **kwargs),
+            formatted_prompt)
+
+    def _extractive_answer(self, query_emb, chunks: List[Dict]) -> str:
+        compressor = self.compressor or ContextCompressor(self.embedder)
+        return build_extractive_answer(compressor, query_emb, chunks)
+
+    async def _generate(self, formatted_prompt: str):
+        """Run the LLM, timing prompt eval and decoding when possible."""
+        if not timing.is_enabled() or not hasattr(self.llm, "with_config"):
+            with span("generation"):
+                return await self._ainvoke(formatted_prompt)
+
+        # LangChain LLM: a token callback marks the end of prompt eval
+        timer = _first_token_handler_cls()()
+        start = time.perf_counter()
+        try:
+            return await self._ainvoke(
+                formatted_prompt, config={"callbacks": [timer]})
+        finally:
+            end = time.perf_counter()
+            if timer.first_token_at is not None:
+                timing.record("prompt_eval", timer.first_token_at - start)
+                timing.record("generation", end - timer.first_token_at)
+            else:
+                timing.record("generation", end - start)
+
+    async def arun(
+        self,
+        query: str,
+        mode: str = "generate",
+        filters: Optional[Dict] = None,
+        coalesce: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Asynchronous execution for better performance in web/app environments.
+
+        `filters` restricts retrieval to chunks whose metadata matches
+        (column -> value or list of values). coalesce=False bypasses the
+        single-flight table (for callers that coalesce themselves).
+        """
+        self._check_mode(mode)
+
+        if self.singleflight is None or not coalesce:
+            return await self._timed_answer(query, mode, filters)
+
+        key = flight_key(query, mode, filters)
+        result = await self.singleflight.do(
+            key, lambda: self._timed_answer(query, mode, filters))
+        # Every caller gets its own copy, under its own query text
+        return {**result, "query": query}
+
+    async def _timed_answer(
+        self, query: str, mode: str, filters: Optional[Dict]
+    ) -> Dict[str, Any]:
+        with collect_timings() as timings:
+            with span("total"):
+                result = await self._answer(query, mode, filters)
+
+        # Per-stage latency breakdown (ms) for this request
+        if timings is not None:
+            result["timings"] = {k: round(v, 3) for k, v in timings.items()}
+
+        return result
+
+    async def _answer(
+        self, query: str, mode: str, filters: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        # 1. Retrieval
+        query_emb, retrieved_chunks = await self._aretrieve(query, filters)
+
+        return await self.respond(
+            query, query_emb, retrieved_chunks, mode, filters)
+
+    async def _cache_call(self, fn, *args):
+        """
+        A ResponseCache call; off the event loop when the SQLite tier is
+        on, since a locked database blocks for up to its busy timeout.
+        """
+        if self.response_cache.path is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def _acached_answer(
+        self, query: str, filters: Optional[Dict], retrieved_chunks: List[Dict]
+    ):
+        """(cache key, cached answer or None); (None, None) without a cache."""
+        if self.response_cache is None:
+            return None, None
+        return await self._cache_call(
+            self._cached_answer, query, filters, retrieved_chunks)
 
-        # 3. Context Preparation
-        context = "\n\n".join(c["document"] for c in retrieved_chunks[:2])
-        context = context[:2000]
+    def _cached_answer(
+        self, query: str, filters: Optional[Dict], retrieved_chunks: List[Dict]
+    ):
+        with span("cache"):
+            template = prompt_hash(self.prompt)
+            version = getattr(self.retriever, "version", None)
+            # A new snapshot or template drops the entries of the old one
+            self.response_cache.set_generation(f"{version}:{template}")
+            key = response_key(
+                query, filters, chunk_ids(retrieved_chunks), template,
+                llm_config(self.llm), version)
+            return key, self.response_cache.get(key)
 
-        # 4. Prompt Construction
-        # Using LCEL style formatting
-        formatted_prompt = self.prompt.format(
-            context=context,
-            question=query
-        )
+    async def respond(
+        self,
+        query: str,
+        query_emb,
+        retrieved_chunks: List[Dict],
+        mode: str = "generate",
+        filters: Optional[Dict] = None,
+    ) -> Dict[str, Any]:
+        """
+        Answer from already retrieved chunks (guard, context, generation).
+        Lets batch callers embed and retrieve many queries at once.
+        """
+        early = await self._aearly_answer(
+            query, query_emb, retrieved_chunks, mode)
+        if early is not None:
+            return early
+
+        key, cached = await self._acached_answer(
+            query, filters, retrieved_chunks)
+        if cached is not None:
+            return self._result(query, cached, retrieved_chunks)
+
+        formatted_prompt = await self._aformat_prompt(
+            query, query_emb, retrieved_chunks)
 
         # 5. Generation (Async)
         # We use ainvoke to allow other tasks to run while the CPU "thinks"
         try:
-            answer = await self.llm.ainvoke(formatted_prompt)
+            answer = await self._generate(formatted_prompt)
             # Handle if answer is a BaseMessage (LangChain standard)
             if hasattr(answer, "content"):
                 answer = answer.content
         except Exception as e:
             answer = f"Error during generation: {str(e)}"
+            key = None  # failures are not cached
+
+        if key is not None:
+            await self._cache_call(self.response_cache.put, key, answer)
 
         # 6. Post-processing
+        return self._result(query, answer, retrieved_chunks)
+
+    async def _aearly_answer(
+        self, query: str, query_emb, retrieved_chunks: List[Dict], mode: str
+    ) -> Optional[Dict[str, Any]]:
+        # The guard alone is cheap; extractive answers embed every sentence
+        if mode != "extractive":
+            return self._early_answer(query, query_emb, retrieved_chunks, mode)
+        return await self._offload(
+            "embedding", self._early_answer,
+            query, query_emb, retrieved_chunks, mode)
+
+    def _early_answer(
+        self, query: str, query_emb, retrieved_chunks: List[Dict], mode: str
+    ) -> Optional[Dict[str, Any]]:
+        """Answers that need no LLM: guard refusals and extractive mode."""
+        # 2. Guardrails (Hard Block)
+        with span("guard"):
+            allowed = should_answer(retrieved_chunks)
+
+        if not allowed:
+            return {
+                "query": query,
+                "answer": "I'm sorry, I don't have enough information in my database to answer that accurately.",
+                "confidence": 0.0,
+                "sources": [],
+            }
+
+        # Low-latency tier: no prompt, no LLM
+        if mode == "extractive":
+            with span("extract"):
+                answer = self._extractive_answer(query_emb, retrieved_chunks)
+            return self._result(query, answer, retrieved_chunks)
+
+        return None
+
+    async def _aformat_prompt(
+        self, query: str, query_emb, retrieved_chunks: List[Dict]
+    ) -> str:
+        # Compression embeds every retrieved sentence: keep it off the loop
+        if self.compressor is None:
+            return self._format_prompt(query, query_emb, retrieved_chunks)
+        return await self._offload(
+            "embedding", self._format_prompt, query, query_emb, retrieved_chunks)
+
+    def _format_prompt(
+        self, query: str, query_emb, retrieved_chunks: List[Dict]
+    ) -> str:
+        with span("prompt_build"):
+            # 3. Context Preparation
+            context = self._build_context(query_emb, retrieved_chunks)
+
+            # 4. Prompt Construction
+            # Using LCEL style formatting
+            return self.prompt.format(
+                context=context,
+                question=query
+            )
+
+    def _result(
+        self, query: str, answer: str, retrieved_chunks: List[Dict]
+    ) -> Dict[str, Any]:
         confidence = compute_confidence(retrieved_chunks)
 
         return {
@@ -64,6 +332,149 @@ class RAGPipeline:
             "sources": retrieved_chunks,
         }
 
-    def run(self, query: str) -> Dict[str, Any]:
+    async def arun_batch(
+        self,
+        queries: List[str],
+        mode: str = "generate",
+        filters: Optional[Dict] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer several queries with one embed_batch call and one index
+        search; answers are then generated one query at a time.
+        """
+        self._check_mode(mode)
+        if not queries:
+            return []
+
+        with span("embed_batch_total"):
+            embeddings = await self._stage(
+                "embedding", self.embedder.embed_batch, queries)
+        with span("retrieve_batch"):
+            chunks = await self._stage(
+                "search", self.retriever.retrieve_batch,
+                *self._search_args(embeddings, filters))
+
+        return [
+            await self.respond(q, e, c, mode, filters)
+            for q, e, c in zip(queries, embeddings, chunks)
+        ]
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    async def _stream_generation(self, formatted_prompt: str) -> AsyncIterator[str]:
+        """
+        Yield generated pieces as they arrive. A synchronous LLM stream
+        runs in a worker thread (the event loop keeps serving) and stops
+        after the current token once the consumer goes away.
+        """
+        if not hasattr(self.llm, "stream"):
+            answer = await self._ainvoke(formatted_prompt)
+            yield getattr(answer, "content", answer)
+            return
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        end = object()
+
+        def _produce():
+            try:
+                for piece in self.llm.stream(formatted_prompt):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(
+                        queue.put_nowait, getattr(piece, "content", piece))
+            except Exception as exc:
+                loop.call_soon_threadsafe(queue.put_nowait, exc)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, end)
+
+        executor = self.executors.executor("generation") if self.executors else None
+        producer = loop.run_in_executor(executor, _produce)
+        try:
+            while (item := await queue.get()) is not end:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            await producer
+
+    async def astream(
+        self,
+        query: str,
+        mode: str = "generate",
+        filters: Optional[Dict] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an answer as events:
+
+        - {"event": "token", "data": str} per generated piece (the whole
+          answer at once for guard refusals and extractive mode)
+        - {"event": "error", "data": str} if generation fails
+        - {"event": "done", "data": result} with the same keys as run(),
+          where timings holds time to first token and total (ms)
+
+        Embedding, retrieval, extractive answers and context compression
+        run off the event loop (stage executors or worker threads), like
+        generation. Streams are not coalesced by the single-flight table.
+        """
+        self._check_mode(mode)
+        start = time.perf_counter()
+        first_token = None
+
+        if self.executors is None:
+            query_emb, retrieved_chunks = await asyncio.to_thread(
+                self._retrieve, query, filters)
+        else:
+            query_emb, retrieved_chunks = await self._aretrieve(query, filters)
+
+        result = await self._aearly_answer(
+            query, query_emb, retrieved_chunks, mode)
+        key, cached = None, None
+        if result is None:
+            key, cached = await self._acached_answer(
+                query, filters, retrieved_chunks)
+            if cached is not None:
+                result = self._result(query, cached, retrieved_chunks)
+
+        if result is not None:
+            first_token = time.perf_counter()
+            yield {"event": "token", "data": result["answer"]}
+        else:
+            formatted_prompt = await self._aformat_prompt(
+                query, query_emb, retrieved_chunks)
+            pieces: List[str] = []
+            try:
+                async for piece in self._stream_generation(formatted_prompt):
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                        timing.record("first_token", first_token - start)
+                    pieces.append(piece)
+                    yield {"event": "token", "data": piece}
+                answer = "".join(pieces)
+                if key is not None:
+                    await self._cache_call(self.response_cache.put, key, answer)
+            except Exception as e:
+                answer = f"Error during generation: {str(e)}"
+                yield {"event": "error", "data": answer}
+            result = self._result(query, answer, retrieved_chunks)
+
+        end = time.perf_counter()
+        timing.record("stream_total", end - start)
+        result["timings"] = {
+            "first_token": round(((first_token or end) - start) * 1000, 3),
+            "total": round((end - start) * 1000, 3),
+        }
+        yield {"event": "done", "data": result}
+
+    def run(
+        self,
+        query: str,
+        mode: str = "generate",
+        filters: Optional[Dict] = None,
+    ) -> Dict[str, Any]:
         """Synchronous wrapper for the async run."""
-        return asyncio.run(self.arun(query))
+        return asyncio.run(self.arun(query, mode=mode, filters=filters))
@@ -1,6 +1,9 @@
-from sentence_transformers import SentenceTransformer
+from typing import List
+
 import numpy as np
 
+from rag_chatbot.utils.timing import timed
+
 
 class QueryEmbedder:
     """
@@ -8,10 +11,26 @@ class QueryEmbedder:
     """
 
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        # Deferred: importing sentence_transformers pulls in torch
+        from sentence_transformers import SentenceTransformer
+
         self.model = SentenceTransformer(model_name)
 
+    @timed("embed")
     def embed(self, query: str) -> np.ndarray:
         return self.model.encode(
             query,
             normalize_embeddings=True
         ).astype("float32")
+
+    @timed("embed_batch")
+    def embed_batch(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Encode many texts in one call; returns an (n, dim) float32 matrix."""
+        return np.asarray(
+            self.model.encode(
+                texts,
+                batch_size=batch_size,
+                normalize_embeddings=True,
+            ),
+            dtype="float32",
+        )
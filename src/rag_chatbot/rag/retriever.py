@@ -1,37 +1,282 @@
-import faiss
-import pandas as pd
+import json
+import logging
+import threading
 import numpy as np
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Tuple, Union
 
+from rag_chatbot.utils.timing import span
+from rag_chatbot.vectorstore.faiss import (
+    INDEX_FILE,
+    MANIFEST_FILE,
+    METADATA_FILE,
+    VERSIONS_DIR,
+    current_snapshot,
+    current_version,
+)
+from rag_chatbot.vectorstore.narratives import OFFSET_COLUMNS, NarrativeStore
 
-class Retriever:
-    def __init__(self, index_path: Path, metadata_path: Path, k: int = 5):
-        self.index = faiss.read_index(str(index_path))
+logger = logging.getLogger(__name__)
+
+# Metadata filters: column -> value or list of accepted values
+Filters = Dict[str, Any]
+
+# Filter id sets cached per snapshot
+_FILTER_CACHE_SIZE = 256
+
+
+def filters_key(filters: Optional[Filters]) -> Optional[Tuple]:
+    """Hashable, order-independent form of `filters` (None if empty)."""
+    if not filters:
+        return None
+    return tuple(sorted(
+        (column, tuple(sorted(map(str, value)))
+         if isinstance(value, (list, tuple, set)) else str(value))
+        for column, value in filters.items()
+    ))
+
+
+def _mmap_flags() -> int:
+    """
+    faiss read flags that memory-map the index (read-only): flat codes
+    (IO_FLAG_MMAP_IFC, faiss >= 1.8) and IVF inverted lists (IO_FLAG_MMAP).
+    The pages live in the page cache, shared by every process mapping the
+    same file.
+    """
+    import faiss
+
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    return flags | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+
+
+class _Snapshot:
+    """Index, metadata and narrative store of one vector store version."""
+
+    def __init__(self, index_path: Path, metadata_path: Path, mmap: bool = False):
+        # faiss and pandas are only needed once an index is actually loaded
+        import faiss
+        import pandas as pd
+
+        self.index = faiss.read_index(str(index_path), _mmap_flags() if mmap else 0)
         self.metadata = pd.read_parquet(metadata_path)
-        self.k = k
+
+        # Offset-based metadata: chunk text is sliced lazily from the
+        # memory-mapped narrative store next to the metadata file
+        self.narratives = None
+        if "document" not in self.metadata.columns and set(
+            OFFSET_COLUMNS
+        ) <= set(self.metadata.columns):
+            store_dir = Path(metadata_path).parent
+            if not NarrativeStore.exists(store_dir):
+                raise FileNotFoundError(
+                    f"Metadata references a narrative store missing from {store_dir}")
+            self.narratives = NarrativeStore.open(store_dir)
 
         if self.index.ntotal != len(self.metadata):
             raise ValueError(
                 f"Mismatch: Index has {self.index.ntotal} vectors, Metadata has {len(self.metadata)} rows.")
 
-    def retrieve(self, query_embedding: np.ndarray) -> List[Dict]:
-        if query_embedding.ndim == 1:
-            query_embedding = query_embedding.reshape(1, -1).astype('float32')
+        self._filter_ids: Dict[Tuple, np.ndarray] = {}
 
-        # Only normalize if your index is IndexFlatIP (Inner Product)
-        # faiss.normalize_L2(query_embedding)
+        # Snapshots published by vectorstore.faiss carry their version
+        self.version = None
+        manifest = Path(index_path).parent / MANIFEST_FILE
+        if manifest.exists():
+            with open(manifest, encoding="utf-8") as f:
+                self.version = json.load(f).get("version")
+
+
+    def filter_ids(self, filters: Filters) -> np.ndarray:
+        """Ids (metadata rows) matching every filter, cached per filter set."""
+        key = filters_key(filters)
+        ids = self._filter_ids.get(key)
+        if ids is not None:
+            return ids
+
+        mask = np.ones(len(self.metadata), dtype=bool)
+        for column, value in filters.items():
+            if column not in self.metadata.columns:
+                raise ValueError(f"Unknown filter column '{column}'")
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            mask &= self.metadata[column].isin(values).to_numpy()
+
+        ids = np.flatnonzero(mask).astype("int64")
+        if len(self._filter_ids) >= _FILTER_CACHE_SIZE:
+            self._filter_ids.clear()
+        self._filter_ids[key] = ids
+        return ids
+
+    def search(self, queries: np.ndarray, k: int, filters: Optional[Filters] = None):
+        """index.search, restricted to the rows matching `filters`."""
+        if not filters:
+            return self.index.search(queries, k)
+
+        import faiss
+
+        ids = self.filter_ids(filters)
+        if len(ids) == 0:
+            n = len(queries)
+            return (np.full((n, k), -np.inf, dtype="float32"),
+                    np.full((n, k), -1, dtype="int64"))
+
+        selector = faiss.IDSelectorBatch(ids)
+        try:
+            ivf = faiss.extract_index_ivf(self.index)
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+        except RuntimeError:
+            params = faiss.SearchParameters(sel=selector)
+        return self.index.search(queries, k, params=params)
+
+
+class Retriever:
+    """
+    FAISS search over one vector store snapshot.
+
+    Built with from_store(), the retriever follows the store's CURRENT
+    pointer: reload_if_changed() (or the watcher thread started by
+    start_watching()) loads a newly published snapshot in the background
+    and swaps it in with a single reference assignment. Each retrieve()
+    call reads that reference once, so in-flight requests finish on the
+    snapshot they started with and nothing blocks during a reload.
+
+    With mmap=True the index is memory-mapped instead of read into the
+    heap, so processes serving the same snapshot share its pages.
+
+    With a cache (rag.cache.RetrievalCache), repeated lookups for the
+    same (quantized) query embedding, k and filters skip the search and
+    metadata gather; swapping snapshots empties it.
+    """
+
+    def __init__(
+        self,
+        index_path: Path,
+        metadata_path: Path,
+        k: int = 5,
+        store_root: Optional[Union[str, Path]] = None,
+        mmap: bool = False,
+        cache=None,
+    ):
+        self.k = k
+        # Vector store root watched for new snapshots (None: static)
+        self.store_root = Path(store_root) if store_root else None
+        self.mmap = mmap
+        self.cache = cache
 
-        scores, indices = self.index.search(query_embedding, self.k)
+        self._snapshot = _Snapshot(index_path, metadata_path, mmap=mmap)
+        if cache is not None:
+            cache.bind(self._snapshot)
+        self._reload_lock = threading.Lock()
+        self._failed_version: Optional[str] = None
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
 
+    @classmethod
+    def from_store(
+        cls, root: Union[str, Path], k: int = 5, mmap: bool = False, cache=None
+    ) -> "Retriever":
+        """Retriever over the CURRENT snapshot of the store at `root`."""
+        snapshot = current_snapshot(root)
+        return cls(snapshot / INDEX_FILE, snapshot / METADATA_FILE,
+                   k=k, store_root=root, mmap=mmap, cache=cache)
+
+    # The serving snapshot's components
+    @property
+    def index(self):
+        return self._snapshot.index
+
+    @property
+    def metadata(self):
+        return self._snapshot.metadata
+
+    @property
+    def narratives(self) -> Optional[NarrativeStore]:
+        return self._snapshot.narratives
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._snapshot.version
+
+    # ------------------------------------------------------------------
+    # Hot reload
+    # ------------------------------------------------------------------
+
+    def reload_if_changed(self) -> bool:
+        """
+        Load and swap in the CURRENT snapshot if it is newer than the one
+        being served. A snapshot that fails to load is logged and skipped;
+        the previous one keeps serving.
+
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        if self.store_root is None:
+            return False
+
+        with self._reload_lock:
+            version = current_version(self.store_root)
+            if version in (None, self.version, self._failed_version):
+                return False
+
+            path = self.store_root / VERSIONS_DIR / version
+            try:
+                snapshot = _Snapshot(
+                    path / INDEX_FILE, path / METADATA_FILE, mmap=self.mmap)
+                # Touch the index pages before serving from it
+                snapshot.index.search(
+                    np.zeros((1, snapshot.index.d), dtype="float32"), 1)
+            except Exception as exc:
+                self._failed_version = version
+                logger.error("Failed to load snapshot %s: %s", version, exc)
+                return False
+
+            previous, self._snapshot = self.version, snapshot
+            if self.cache is not None:
+                self.cache.bind(snapshot)
+            logger.info("Swapped vector store snapshot %s -> %s",
+                        previous, version)
+            return True
+
+    def start_watching(self, interval_s: float = 30.0) -> "Retriever":
+        """Poll the store for new snapshots in a daemon thread."""
+        if self._watcher is not None or self.store_root is None:
+            return self
+
+        def _watch():
+            while not self._stop.wait(interval_s):
+                self.reload_if_changed()
+
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=_watch, name="retriever-reload", daemon=True)
+        self._watcher.start()
+        return self
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _rows(snapshot: _Snapshot, scores, indices) -> List[Dict]:
         results = []
-        for score, idx in zip(scores[0], indices[0]):
+        for score, idx in zip(scores, indices):
             # BUG FIX: FAISS returns -1 if it can't find enough neighbors
             if idx < 0:
                 continue
 
             try:
-                row = self.metadata.iloc[int(idx)].to_dict()
+                row = snapshot.metadata.iloc[int(idx)].to_dict()
+                if snapshot.narratives is not None:
+                    row["document"] = snapshot.narratives.slice(
+                        int(row["narrative_row"]),
+                        int(row["start"]),
+                        int(row["end"]),
+                    )
                 row["score"] = float(score)
                 results.append(row)
             except IndexError:
@@ -39,3 +284,67 @@ class Retriever:
                 continue
 
         return results
+
+    def retrieve(
+        self, query_embedding: np.ndarray, filters: Optional[Filters] = None
+    ) -> List[Dict]:
+        """
+        Top-k chunks for one query embedding; `filters` restricts the
+        search to chunks whose metadata matches, e.g.
+        {"product_category": ["Credit card", "Savings account"]}.
+        """
+        # One snapshot for the whole request, even if a reload swaps it
+        snapshot = self._snapshot
+
+        if self.cache is not None:
+            key = self.cache.key(query_embedding, self.k, filters)
+            rows = self.cache.get(snapshot, key)
+            if rows is not None:
+                return rows
+
+        if query_embedding.ndim == 1:
+            query_embedding = query_embedding.reshape(1, -1).astype('float32')
+
+        # Only normalize if your index is IndexFlatIP (Inner Product)
+        # faiss.normalize_L2(query_embedding)
+
+        with span("search"):
+            scores, indices = snapshot.search(query_embedding, self.k, filters)
+
+        with span("metadata"):
+            rows = self._rows(snapshot, scores[0], indices[0])
+
+        if self.cache is not None:
+            self.cache.put(snapshot, key, rows)
+        return rows
+
+    def retrieve_batch(
+        self, query_embeddings: np.ndarray, filters: Optional[Filters] = None
+    ) -> List[List[Dict]]:
+        """
+        retrieve() for an (n, d) matrix of queries with a single index
+        search; returns one result list per query. With a cache, only the
+        queries it misses are searched.
+        """
+        snapshot = self._snapshot
+        query_embeddings = np.ascontiguousarray(
+            np.atleast_2d(query_embeddings), dtype="float32")
+
+        results: List[Optional[List[Dict]]] = [None] * len(query_embeddings)
+        if self.cache is not None:
+            keys = [self.cache.key(q, self.k, filters) for q in query_embeddings]
+            results = [self.cache.get(snapshot, key) for key in keys]
+        misses = [i for i, rows in enumerate(results) if rows is None]
+        if not misses:
+            return results
+
+        with span("search_batch"):
+            scores, indices = snapshot.search(
+                query_embeddings[misses], self.k, filters)
+
+        with span("metadata_batch"):
+            for i, s, idx in zip(misses, scores, indices):
+                results[i] = self._rows(snapshot, s, idx)
+                if self.cache is not None:
+                    self.cache.put(snapshot, keys[i], results[i])
+        return results
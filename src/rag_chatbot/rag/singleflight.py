@@ -0,0 +1,98 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+The first request for a key (the leader) runs the computation; requests
+for the same key arriving before it finishes (followers) await the
+leader's result instead of running their own. Nothing is cached: once
+the leader finishes, the next request for the key runs again.
+
+The in-flight table is shared across threads and event loops (the UI and
+the API run each request on its own loop in a worker thread), so
+followers wait on a concurrent.futures.Future.
+"""
+import asyncio
+import threading
+import unicodedata
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def normalize_query(query: str) -> str:
+    """Unicode-normalized, case-folded, whitespace-collapsed query."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key.
+
+        flight = SingleFlight()
+        result = await flight.do(key, lambda: compute())
+
+    Followers receive the leader's result (or exception). A follower that
+    is cancelled stops waiting without affecting the leader; if the
+    leader is cancelled, its followers retry as new callers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            try:
+                # shield: a cancelled follower must not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                return await self.do(key, fn)
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Executed and coalesced call counts; saved = coalesced share."""
+        with self._lock:
+            executed, coalesced = self._executed, self._coalesced
+            in_flight = len(self._calls)
+
+        total = executed + coalesced
+        return {
+            "executed": executed,
+            "coalesced": coalesced,
+            "in_flight": in_flight,
+            "saved_ratio": round(coalesced / total, 4) if total else 0.0,
+        }
+
+
+def flight_key(query: str, mode: str, filters: Optional[Any] = None) -> Hashable:
+    from rag_chatbot.rag.retriever import filters_key
+
+    return normalize_query(query), mode, filters_key(filters)
@@ -1,7 +1,13 @@
 import gradio as gr
-from typing import List, Dict
+from typing import List, Dict, Union
+from rag_chatbot.rag.loader import PipelineLoader
 from rag_chatbot.rag.pipeline import RAGPipeline
 
+WARMING_UP_MESSAGE = (
+    "The assistant is still warming up (loading models and index). "
+    "Please try again in a few seconds."
+)
+
 
 def format_sources(sources: List[Dict]) -> str:
     """Format retrieved documents for display."""
@@ -22,17 +28,33 @@ def format_sources(sources: List[Dict]) -> str:
     return "\n".join(lines)
 
 
-def launch_ui(rag: RAGPipeline):
+def build_ui(
+    rag: Union[RAGPipeline, PipelineLoader],
+    warmup_wait_s: float = 10.0,
+) -> gr.Blocks:
     """
-    Launch a modern Gradio UI compatible with version 6.0+.
+    Build the Gradio Blocks UI (compatible with version 6.0+).
+
+    `rag` may be a ready RAGPipeline or a started PipelineLoader; with a
+    loader the UI binds immediately and requests arriving before readiness
+    wait up to `warmup_wait_s` before getting a "warming up" reply.
+
+    The Blocks can be launched on their own (launch_ui) or mounted on the
+    HTTP API (api.server --ui) as a client of the same pipeline.
     """
 
-    def rag_chat(query: str):
+    def rag_chat(query: str, mode: str = "generate"):
         if not query.strip():
             return "Enter a question.", 0.0, ""
 
         try:
-            result = rag.run(query)
+            pipeline = rag
+            if isinstance(rag, PipelineLoader):
+                pipeline = rag.wait(timeout=warmup_wait_s)
+                if pipeline is None:
+                    return WARMING_UP_MESSAGE, 0.0, ""
+
+            result = pipeline.run(query, mode=mode)
             return (
                 result.get("answer", "No answer generated."),
                 result.get("confidence", 0.0),
@@ -59,6 +81,15 @@ def launch_ui(rag: RAGPipeline):
                     lines=3,
                 )
 
+                mode_input = gr.Radio(
+                    label="Answer mode",
+                    choices=[
+                        ("Generated (LLM)", "generate"),
+                        ("Fast extractive", "extractive"),
+                    ],
+                    value="generate",
+                )
+
                 submit_btn = gr.Button("Run Analysis", variant="primary")
                 clear_btn = gr.Button("Clear")
 
@@ -85,7 +116,7 @@ def launch_ui(rag: RAGPipeline):
 
         submit_btn.click(
             fn=rag_chat,
-            inputs=query_input,
+            inputs=[query_input, mode_input],
             outputs=[answer_output, confidence_output, sources_output],
         )
 
@@ -97,6 +128,16 @@ def launch_ui(rag: RAGPipeline):
                      sources_output, answer_output],
         )
 
+    return demo
+
+
+def launch_ui(
+    rag: Union[RAGPipeline, PipelineLoader],
+    warmup_wait_s: float = 10.0,
+):
+    """Launch the UI of build_ui() as a standalone Gradio server."""
+    demo = build_ui(rag, warmup_wait_s)
+
     # FIXED: theme is now passed here in Gradio 6.0
     demo.launch(theme=gr.themes.Soft(), share=False)
 
@@ -0,0 +1,76 @@
+import logging
+from typing import Dict, Optional, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    """Deep memory footprint of a DataFrame in MB (strings included)."""
+    return round(df.memory_usage(deep=True).sum() / 1024 ** 2, 3)
+
+
+def record_frame_memory(
+    report: Optional[Dict[str, float]],
+    stage: str,
+    df: pd.DataFrame,
+) -> None:
+    """
+    Add the footprint of `df` after `stage` to `report` (MB, summed across
+    calls so streamed batches aggregate). No-op when report is None.
+    """
+    if report is None:
+        return
+    report[stage] = round(report.get(stage, 0.0) + frame_memory_mb(df), 3)
+
+
+def log_memory_report(report: Dict[str, float]) -> None:
+    """Log the per-stage footprint and the change versus the previous stage."""
+    previous = None
+    for stage, mb in report.items():
+        delta = "" if previous is None else f" ({mb - previous:+.1f} MB)"
+        logger.info("memory after %-16s %10.1f MB%s", stage, mb, delta)
+        previous = mb
+
+
+# smaps_rollup fields (kB) -> report keys
+_SMAPS_FIELDS = {
+    "Rss": "rss_mb",
+    "Pss": "pss_mb",
+    "Shared_Clean": "shared_clean_mb",
+    "Shared_Dirty": "shared_dirty_mb",
+    "Private_Clean": "private_clean_mb",
+    "Private_Dirty": "private_dirty_mb",
+    "Swap": "swap_mb",
+}
+
+
+def process_memory_mb(pid: Union[int, str] = "self") -> Optional[Dict[str, float]]:
+    """
+    Memory of a process from /proc/<pid>/smaps_rollup (Linux >= 4.14), MB:
+    RSS, PSS (shared pages split between their users), USS (pages only
+    this process maps: private clean + private dirty) and the shared parts.
+
+    Summing USS over forked workers shows what each one costs on top of
+    the pages they share; summing PSS gives the real total.
+
+    Returns:
+        None if the process is gone or smaps_rollup is unavailable
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    report = {}
+    for line in lines:
+        name, _, rest = line.partition(":")
+        if name in _SMAPS_FIELDS:
+            report[_SMAPS_FIELDS[name]] = round(int(rest.split()[0]) / 1024, 3)
+
+    report["uss_mb"] = round(
+        report.get("private_clean_mb", 0.0)
+        + report.get("private_dirty_mb", 0.0), 3)
+    return report
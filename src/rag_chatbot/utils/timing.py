@@ -0,0 +1,255 @@
+"""
+Low-overhead latency instrumentation.
+
+- `span(stage)`: context manager timing a block with a monotonic clock.
+- `timed(stage)`: decorator for sync and async functions.
+- `collect_timings()`: collects the stages of one request into a dict
+  (stage -> ms), propagated through asyncio tasks via contextvars.
+- `registry`: process-wide per-stage histograms with p50/p95/p99 export.
+
+When disabled (`set_enabled(False)` or RAG_TIMING=0) spans cost one global
+lookup and nothing is recorded.
+"""
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_enabled = os.environ.get("RAG_TIMING", "1") != "0"
+
+# Per-request stage timings (ms); None outside collect_timings()
+_current_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = (
+    contextvars.ContextVar("rag_timings", default=None)
+)
+
+
+def set_enabled(enabled: bool) -> None:
+    """Globally enable or disable timing collection."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+# ------------------------------------------------------------------
+# Histograms
+# ------------------------------------------------------------------
+
+# Log-spaced bucket upper bounds from 10 us to ~5 min (~7% resolution)
+_BUCKET_RATIO = 1.15
+_BUCKET_BOUNDS: List[float] = [
+    1e-5 * _BUCKET_RATIO ** i
+    for i in range(int(math.log(300 / 1e-5, _BUCKET_RATIO)) + 2)
+]
+
+
+class StageHistogram:
+    """
+    Fixed-size latency histogram. Memory is constant regardless of the
+    number of observations; percentiles are accurate to one bucket.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        i = bisect.bisect_left(_BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-th percentile (0-100) in seconds."""
+        if not self.count:
+            return 0.0
+
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                upper = _BUCKET_BOUNDS[i] if i < len(_BUCKET_BOUNDS) else self.max
+                return min(max(upper, self.min), self.max)
+
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "min_ms": round(self.min * 1000, 3),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class LatencyRegistry:
+    """Per-stage histograms shared by the whole process."""
+
+    def __init__(self):
+        self._stages: Dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        hist = self._stages.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self._stages.setdefault(stage, StageHistogram())
+        hist.observe(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Aggregated count/mean/p50/p95/p99 per stage."""
+        return {stage: h.summary() for stage, h in sorted(self._stages.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages = {}
+
+    def export(self, path: Path) -> None:
+        """Write the current summary to a JSON file (atomically)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"generated_at": time.time(), "stages": self.summary()},
+                f,
+                indent=2,
+            )
+        os.replace(tmp, path)
+
+
+registry = LatencyRegistry()
+
+
+def start_periodic_export(
+    path: Path,
+    interval_s: float = 60.0,
+    latency_registry: Optional[LatencyRegistry] = None,
+) -> threading.Event:
+    """
+    Export the registry summary to `path` every `interval_s` seconds in a
+    daemon thread. Set the returned event to stop exporting.
+    """
+    reg = latency_registry or registry
+    stop = threading.Event()
+
+    def _loop():
+        while not stop.wait(interval_s):
+            try:
+                reg.export(path)
+            except OSError as exc:
+                logger.warning("Failed to export latency metrics: %s", exc)
+
+    threading.Thread(target=_loop, name="latency-export", daemon=True).start()
+    return stop
+
+
+# ------------------------------------------------------------------
+# Spans
+# ------------------------------------------------------------------
+
+def record(stage: str, seconds: float) -> None:
+    """Record a duration measured by the caller."""
+    if not _enabled:
+        return
+
+    registry.observe(stage, seconds)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds * 1000
+
+
+class span:
+    """
+    Time a block and record it under `stage`.
+
+        with span("search"):
+            index.search(...)
+    """
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._start = None
+
+    def __enter__(self) -> "span":
+        if _enabled:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._start is not None:
+            record(self.stage, time.perf_counter() - self._start)
+            self._start = None
+
+
+def timed(stage: str) -> Callable:
+    """Decorator form of span(), for sync and async functions."""
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def collect_timings() -> Iterator[Optional[Dict[str, float]]]:
+    """
+    Collect the stage timings (ms) recorded inside the block.
+
+    Yields None when timing is disabled.
+    """
+    if not _enabled:
+        yield None
+        return
+
+    timings: Dict[str, Any] = {}
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
@@ -0,0 +1,295 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from rag_chatbot.chunking.columnar import ChunkMode, chunk_table
+from rag_chatbot.chunking.text_splitter import CHUNK_OVERLAP, CHUNK_SIZE
+from rag_chatbot.chunking.tokens import DEFAULT_TOKEN_OVERLAP
+from rag_chatbot.vectorstore.faiss import (
+    INDEX_FILE,
+    METADATA_FILE,
+    VERSIONS_DIR,
+    new_version,
+    publish_current,
+    publish_snapshot,
+    write_manifest,
+)
+from rag_chatbot.vectorstore.narratives import NarrativeStore, write_chunk_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# In-progress build under the store root (same filesystem, so publishing
+# is a rename of its snapshot/ directory):
+#   .build/checkpoint.json, .build/embeddings/batch-*.npy, .build/snapshot/
+BUILD_DIR = ".build"
+CHECKPOINT_FILE = "checkpoint.json"
+EMBEDDINGS_DIR = "embeddings"
+SNAPSHOT_DIR = "snapshot"
+
+TEXT_COLUMN = "consumer_complaint_narrative"
+
+Encoder = Callable[[List[str]], np.ndarray]
+
+
+# ------------------------------------------------------------------
+# Checkpoint
+# ------------------------------------------------------------------
+
+class BuildCheckpoint:
+    """
+    Progress of one vector store build, persisted as checkpoint.json in the
+    build directory after every completed step:
+
+    - stage "chunked": chunk store (metadata + narratives) written
+    - next_offset: chunks [0, next_offset) embedded, one .npy per batch
+    - stage "indexed": faiss.index and manifest written, ready to publish
+
+    A checkpoint only resumes a build with the same fingerprint (input
+    content hash + model + chunker parameters); anything else starts over.
+    """
+
+    def __init__(self, directory: Path, fingerprint: str):
+        self.directory = Path(directory)
+        self.path = self.directory / CHECKPOINT_FILE
+        self.state: Dict[str, Any] = {
+            "fingerprint": fingerprint,
+            "stage": "started",
+            "chunks": None,
+            "next_offset": 0,
+            "batches": [],
+        }
+
+    @classmethod
+    def open(cls, directory: Path, fingerprint: str) -> "BuildCheckpoint":
+        """Resume the build in `directory`, or reset it to a fresh build."""
+        checkpoint = cls(directory, fingerprint)
+        try:
+            with open(checkpoint.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            state = None
+
+        if state and state.get("fingerprint") == fingerprint:
+            checkpoint.state = state
+            logger.info(
+                "Resuming build at stage '%s' (%d/%s chunks embedded)",
+                state["stage"], state["next_offset"], state["chunks"])
+            return checkpoint
+
+        if directory.exists():
+            logger.info("Discarding stale build in %s", directory)
+            shutil.rmtree(directory)
+        (directory / SNAPSHOT_DIR).mkdir(parents=True)
+        (directory / EMBEDDINGS_DIR).mkdir()
+        checkpoint.save()
+        return checkpoint
+
+    def __getitem__(self, key: str) -> Any:
+        return self.state[key]
+
+    def update(self, **fields: Any) -> None:
+        self.state.update(fields)
+        self.save()
+
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+
+def content_hash(df: pd.DataFrame, columns: Sequence[str]) -> str:
+    """sha256 over the row hashes of `columns` (order-sensitive)."""
+    hashes = pd.util.hash_pandas_object(df[list(columns)], index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def sentence_transformer_encoder(
+    model_name: str = DEFAULT_MODEL,
+    batch_size: int = 64,
+) -> Encoder:
+    """Normalized float32 embeddings from a SentenceTransformer model."""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name)
+
+    def encode(texts: List[str]) -> np.ndarray:
+        return np.asarray(
+            model.encode(texts, batch_size=batch_size, normalize_embeddings=True),
+            dtype="float32",
+        )
+
+    return encode
+
+
+def _batch_path(directory: Path, offset: int) -> Path:
+    return directory / EMBEDDINGS_DIR / f"batch-{offset:012d}.npy"
+
+
+def _chunk_texts(
+    store: NarrativeStore,
+    offsets: np.ndarray,
+    start: int,
+    stop: int,
+) -> List[str]:
+    return [store.slice(int(row), int(lo), int(hi))
+            for row, lo, hi in offsets[start:stop]]
+
+
+# ------------------------------------------------------------------
+# Build
+# ------------------------------------------------------------------
+
+def build_vector_store(
+    df: pd.DataFrame,
+    root: Union[str, Path],
+    model_name: str = DEFAULT_MODEL,
+    encoder: Optional[Encoder] = None,
+    chunk_mode: ChunkMode = "compat",
+    batch_size: int = 4096,
+    n_jobs: int = 1,
+    max_tokens: Optional[int] = None,
+    token_overlap: int = DEFAULT_TOKEN_OVERLAP,
+    source: Optional[str] = None,
+) -> Path:
+    """
+    Chunk, embed and index `df`, then publish it as a new snapshot of the
+    vector store at `root` (see vectorstore.faiss).
+
+    Every step is checkpointed in root/.build: the chunk store once, then
+    each embedded batch of `batch_size` chunks as its own .npy file. Running
+    the build again with the same input and parameters after a crash resumes
+    from the last completed batch instead of starting over.
+
+    Args:
+        df: Frame with complaint_id, product_category and narratives
+        root: Vector store root (e.g. settings.paths.VECTOR_STORE["fiass_dir"])
+        model_name: Embedding model recorded in the manifest (and loaded
+            unless `encoder` is given)
+        encoder: Callable mapping a list of texts to normalized embeddings
+        chunk_mode: chunk_table mode
+        batch_size: Chunks embedded (and checkpointed) per batch
+        n_jobs: Chunking worker processes
+        max_tokens: Token budget per chunk in "tokens" mode
+        token_overlap: Token overlap in "tokens" mode
+        source: Description of the input recorded in the manifest
+
+    Returns:
+        Path of the published snapshot
+
+    Raises:
+        ValueError: If there is nothing to index
+    """
+    import faiss
+
+    root = Path(root)
+    build_dir = root / BUILD_DIR
+    snapshot = build_dir / SNAPSHOT_DIR
+
+    chunker: Dict[str, Any] = {"mode": chunk_mode}
+    if chunk_mode == "tokens":
+        chunker.update(max_tokens=max_tokens, token_overlap=token_overlap)
+    else:
+        chunker.update(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+    input_hash = content_hash(df, ["complaint_id", TEXT_COLUMN])
+    fingerprint = hashlib.sha256(json.dumps(
+        [input_hash, model_name, chunker, batch_size], sort_keys=True
+    ).encode()).hexdigest()
+
+    checkpoint = BuildCheckpoint.open(build_dir, fingerprint)
+
+    # 1. Chunk store (metadata offsets + deduplicated narratives)
+    if checkpoint["stage"] == "started":
+        chunks = chunk_table(df, mode=chunk_mode, n_jobs=n_jobs,
+                             max_tokens=max_tokens, token_overlap=token_overlap)
+        if not chunks.num_rows:
+            raise ValueError("No chunks to index: every narrative is empty")
+
+        write_chunk_store(df[TEXT_COLUMN], chunks, snapshot, METADATA_FILE)
+        checkpoint.update(stage="chunked", chunks=chunks.num_rows)
+        logger.info("Chunked %d narratives into %d chunks",
+                    len(df), chunks.num_rows)
+
+    # 2. Embeddings, one checkpointed batch at a time
+    total = checkpoint["chunks"]
+    if checkpoint["stage"] == "chunked":
+        import pyarrow.parquet as pq
+
+        if checkpoint["next_offset"] < total and encoder is None:
+            encoder = sentence_transformer_encoder(model_name)
+
+        store = NarrativeStore.open(snapshot)
+        offsets = np.column_stack([
+            column.to_numpy() for column in pq.read_table(
+                snapshot / METADATA_FILE,
+                columns=["narrative_row", "start", "end"]).columns
+        ])
+
+        for start in range(checkpoint["next_offset"], total, batch_size):
+            stop = min(start + batch_size, total)
+            texts = _chunk_texts(store, offsets, start, stop)
+            embeddings = np.asarray(encoder(texts), dtype="float32")
+
+            path = _batch_path(build_dir, start)
+            tmp = path.with_name(path.name + ".tmp.npy")
+            np.save(tmp, embeddings)
+            os.replace(tmp, path)
+
+            checkpoint.update(
+                next_offset=stop, batches=checkpoint["batches"] + [path.name])
+            logger.info("Embedded %d/%d chunks", stop, total)
+
+        # 3. Index and manifest
+        embeddings = np.concatenate([
+            np.load(build_dir / EMBEDDINGS_DIR / name, mmap_mode="r")
+            for name in checkpoint["batches"]
+        ])
+        index = faiss.IndexFlatIP(embeddings.shape[1])
+        index.add(np.ascontiguousarray(embeddings))
+        faiss.write_index(index, str(snapshot / INDEX_FILE))
+
+        version = new_version(fingerprint)
+        write_manifest(
+            snapshot,
+            version=version,
+            model=model_name,
+            embedding_dim=int(embeddings.shape[1]),
+            chunker=chunker,
+            source=source,
+            input_sha256=input_hash,
+            counts={
+                "rows": len(df),
+                "narratives": len(NarrativeStore.open(snapshot)),
+                "chunks": total,
+                "vectors": int(index.ntotal),
+            },
+        )
+        checkpoint.update(stage="indexed", version=version)
+
+    # 4. Publish (rename + CURRENT), then drop the build state
+    version = checkpoint["version"]
+    published = root / VERSIONS_DIR / version
+    if snapshot.exists():
+        publish_snapshot(snapshot, root, version)
+    else:
+        # Crashed between the rename and the CURRENT update
+        publish_current(root, version)
+    shutil.rmtree(build_dir)
+
+    return published
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Files of one published FAISS vector store snapshot
+INDEX_FILE = "faiss.index"
+METADATA_FILE = "metadata.parquet"
+MANIFEST_FILE = "manifest.json"
+
+# Snapshot layout under the store root:
+#   versions/<version>/{faiss.index, metadata.parquet, narratives.*, manifest.json}
+#   CURRENT  -> name of the published version
+VERSIONS_DIR = "versions"
+CURRENT_FILE = "CURRENT"
+
+
+# ------------------------------------------------------------------
+# Hashing
+# ------------------------------------------------------------------
+
+def file_sha256(path: Union[str, Path], block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# ------------------------------------------------------------------
+# Manifest
+# ------------------------------------------------------------------
+
+def write_manifest(directory: Union[str, Path], **fields: Any) -> Dict[str, Any]:
+    """
+    Write manifest.json for the snapshot in `directory`.
+
+    `fields` (model, chunker parameters, counts, ...) are stored as given;
+    size and sha256 of every file in the directory are added under "files".
+
+    Returns:
+        The manifest
+    """
+    directory = Path(directory)
+    files = {
+        p.name: {"bytes": p.stat().st_size, "sha256": file_sha256(p)}
+        for p in sorted(directory.iterdir())
+        if p.is_file() and p.name != MANIFEST_FILE
+    }
+    manifest = {
+        **fields,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "files": files,
+    }
+    _write_atomic(directory / MANIFEST_FILE, json.dumps(manifest, indent=2))
+    return manifest
+
+
+def read_manifest(directory: Union[str, Path]) -> Dict[str, Any]:
+    with open(Path(directory) / MANIFEST_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_snapshot(directory: Union[str, Path]) -> List[str]:
+    """
+    Check the files of a snapshot against its manifest.
+
+    Returns:
+        Names of missing or modified files (empty if the snapshot is intact)
+    """
+    directory = Path(directory)
+    bad = []
+    for name, info in read_manifest(directory)["files"].items():
+        path = directory / name
+        if not path.is_file() or file_sha256(path) != info["sha256"]:
+            bad.append(name)
+    return bad
+
+
+# ------------------------------------------------------------------
+# Versions
+# ------------------------------------------------------------------
+
+def new_version(content_hash: str) -> str:
+    """Sortable version name: UTC timestamp plus a short content hash."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return f"{stamp}-{content_hash[:8]}"
+
+
+def publish_snapshot(
+    staging_dir: Union[str, Path],
+    root: Union[str, Path],
+    version: str,
+) -> Path:
+    """
+    Atomically publish a fully written snapshot.
+
+    `staging_dir` is renamed to versions/<version> (it must be on the same
+    filesystem as `root`) and the CURRENT pointer is then replaced, so
+    readers see either the previous snapshot or the complete new one.
+
+    Returns:
+        Path of the published snapshot
+    """
+    root = Path(root)
+    target = root / VERSIONS_DIR / version
+    if target.exists():
+        raise FileExistsError(f"Snapshot version already exists: {target}")
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.rename(staging_dir, target)
+    publish_current(root, version)
+    return target
+
+
+def publish_current(root: Union[str, Path], version: str) -> None:
+    """Point CURRENT at an existing version."""
+    root = Path(root)
+    if not (root / VERSIONS_DIR / version).is_dir():
+        raise FileNotFoundError(f"No snapshot version '{version}' in {root}")
+
+    _write_atomic(root / CURRENT_FILE, version + "\n")
+    logger.info("Published vector store snapshot %s", version)
+
+
+def current_version(root: Union[str, Path]) -> Optional[str]:
+    """Name of the published snapshot, or None if nothing was published."""
+    try:
+        version = (Path(root) / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def current_snapshot(root: Union[str, Path]) -> Path:
+    """
+    Directory of the published snapshot; `root` itself for stores written
+    before versioning (faiss.index directly under the root).
+    """
+    root = Path(root)
+    version = current_version(root)
+    return root / VERSIONS_DIR / version if version else root
+
+
+def list_versions(root: Union[str, Path]) -> List[str]:
+    versions = Path(root) / VERSIONS_DIR
+    if not versions.is_dir():
+        return []
+    return sorted(p.name for p in versions.iterdir() if p.is_dir())
+
+
+def prune_snapshots(root: Union[str, Path], keep: int = 3) -> List[str]:
+    """
+    Delete all but the `keep` newest versions; the current one is always
+    kept.
+
+    Returns:
+        Removed version names
+    """
+    current = current_version(root)
+    old = [v for v in list_versions(root)[:-keep or None] if v != current]
+    for version in old:
+        shutil.rmtree(Path(root) / VERSIONS_DIR / version)
+    if old:
+        logger.info("Pruned %d old vector store snapshots", len(old))
+    return old
@@ -0,0 +1,240 @@
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+import numpy as np
+
+# Imported by the retriever: keep pandas/pyarrow out of module import
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+TEXT_FILE = "narratives.bin"
+OFFSETS_FILE = "narratives.offsets.npy"
+BLOCKS_FILE = "narratives.blocks.npy"
+
+# Narratives are compressed together in blocks of about this many UTF-8
+# bytes: large enough for zstd to exploit the boilerplate shared across
+# complaints, small enough that reading one chunk inflates little else
+BLOCK_BYTES = 64 * 1024
+COMPRESSION_LEVEL = 9
+
+# Decompressed blocks kept per store (consecutive chunks share blocks)
+BLOCK_CACHE = 64
+
+# Chunk metadata columns locating a chunk inside the narrative store
+OFFSET_COLUMNS = ("narrative_row", "start", "end")
+
+
+class NarrativeStore:
+    """
+    Every narrative stored once, as zstd-compressed blocks of concatenated
+    UTF-8 text plus two small arrays:
+
+    - offsets: (n + 1) int64 byte offsets of the narratives in the
+      decompressed text;
+    - blocks: (n_blocks + 1, 2) int64 rows of (byte offset of the block in
+      the compressed file, first narrative of the block).
+
+    All three files are memory-mapped, so opening the store is O(1); a
+    read inflates only the block holding the narrative, and recently used
+    blocks are cached. Stores written before compression (no blocks file)
+    are read as plain UTF-8.
+
+    Chunks reference narratives by (narrative_row, start, end), with start
+    and end as character offsets into the decoded narrative.
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        offsets: np.ndarray,
+        blocks: Optional[np.ndarray] = None,
+    ):
+        self._data = data
+        self._offsets = offsets
+        self._blocks = blocks
+        self._block = lru_cache(maxsize=BLOCK_CACHE)(self._inflate)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes stored (compressed text, offsets and block index)."""
+        blocks = 0 if self._blocks is None else self._blocks.nbytes
+        return int(self._data.nbytes + self._offsets.nbytes + blocks)
+
+    @property
+    def text_nbytes(self) -> int:
+        """Size of the narratives as plain UTF-8."""
+        return int(self._offsets[-1])
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def open(cls, directory: Union[str, Path], mmap: bool = True) -> "NarrativeStore":
+        """Open the store in `directory` (memory-mapped by default)."""
+        directory = Path(directory)
+        offsets = np.load(directory / OFFSETS_FILE, mmap_mode="r" if mmap else None)
+
+        blocks = None
+        if (directory / BLOCKS_FILE).exists():
+            blocks = np.load(directory / BLOCKS_FILE,
+                             mmap_mode="r" if mmap else None)
+
+        text_path = directory / TEXT_FILE
+        if text_path.stat().st_size == 0:
+            data = np.zeros(0, dtype=np.uint8)
+        elif mmap:
+            data = np.memmap(text_path, dtype=np.uint8, mode="r")
+        else:
+            data = np.fromfile(text_path, dtype=np.uint8)
+
+        return cls(data, offsets, blocks)
+
+    @staticmethod
+    def exists(directory: Union[str, Path]) -> bool:
+        directory = Path(directory)
+        return (directory / TEXT_FILE).exists() and (directory / OFFSETS_FILE).exists()
+
+    def _inflate(self, block: int) -> bytes:
+        """Decompressed text of one block."""
+        import pyarrow as pa
+
+        lo, hi = int(self._blocks[block, 0]), int(self._blocks[block + 1, 0])
+        size = int(self._offsets[self._blocks[block + 1, 1]]
+                   - self._offsets[self._blocks[block, 1]])
+        if not size:
+            return b""
+        return pa.Codec("zstd").decompress(
+            self._data[lo:hi], decompressed_size=size, asbytes=True)
+
+    def get(self, row: int) -> str:
+        """Full narrative at `row`."""
+        lo, hi = int(self._offsets[row]), int(self._offsets[row + 1])
+        if self._blocks is None:
+            return self._data[lo:hi].tobytes().decode("utf-8")
+
+        block = int(np.searchsorted(self._blocks[:, 1], row, side="right")) - 1
+        base = int(self._offsets[self._blocks[block, 1]])
+        return self._block(block)[lo - base:hi - base].decode("utf-8")
+
+    def slice(self, row: int, start: int, end: int) -> str:
+        """Chunk text: characters [start, end) of the narrative at `row`."""
+        return self.get(row)[start:end]
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def write(
+        cls,
+        texts: Iterable[Optional[str]],
+        directory: Union[str, Path],
+    ) -> int:
+        """
+        Write narratives (missing values become "") to `directory`,
+        compressed in blocks of about BLOCK_BYTES.
+
+        All files are written to temporaries and renamed into place.
+
+        Returns:
+            Number of narratives written
+        """
+        import pyarrow as pa
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        codec = pa.Codec("zstd", compression_level=COMPRESSION_LEVEL)
+
+        text_tmp = directory / (TEXT_FILE + ".tmp")
+        offsets = [0]
+        blocks = [(0, 0)]
+        pending = []
+
+        def flush(f) -> None:
+            frame = codec.compress(b"".join(pending), asbytes=True)
+            f.write(frame)
+            blocks.append((blocks[-1][0] + len(frame), len(offsets) - 1))
+            pending.clear()
+
+        with open(text_tmp, "wb") as f:
+            for text in texts:
+                encoded = text.encode("utf-8") if isinstance(text, str) else b""
+                pending.append(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+                if offsets[-1] - offsets[blocks[-1][1]] >= BLOCK_BYTES:
+                    flush(f)
+            if pending:
+                flush(f)
+
+        # np.save appends .npy to names without it
+        offsets_tmp = directory / (OFFSETS_FILE + ".tmp.npy")
+        np.save(offsets_tmp, np.asarray(offsets, dtype=np.int64))
+        blocks_tmp = directory / (BLOCKS_FILE + ".tmp.npy")
+        np.save(blocks_tmp, np.asarray(blocks, dtype=np.int64).reshape(-1, 2))
+
+        os.replace(text_tmp, directory / TEXT_FILE)
+        os.replace(offsets_tmp, directory / OFFSETS_FILE)
+        os.replace(blocks_tmp, directory / BLOCKS_FILE)
+        return len(offsets) - 1
+
+
+def write_chunk_store(
+    narratives: "pd.Series",
+    chunks: "pa.Table",
+    directory: Union[str, Path],
+    metadata_file: str = "metadata.parquet",
+) -> "pa.Table":
+    """
+    Persist chunks as offsets into a deduplicated narrative store.
+
+    Only narratives referenced by at least one chunk are stored, each once;
+    the chunk table is written without its text column.
+
+    Args:
+        narratives: Narrative texts, positionally aligned with the frame the
+            chunks were built from (chunks.narrative_row indexes into it)
+        chunks: Table from chunking.columnar.chunk_table
+        directory: Output directory (e.g. the vector store)
+        metadata_file: Name of the chunk metadata parquet file
+
+    Returns:
+        The chunk metadata table as written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    directory = Path(directory)
+
+    rows = chunks.column("narrative_row").to_numpy()
+    used, compact = np.unique(rows, return_inverse=True)
+
+    n = NarrativeStore.write(narratives.iloc[used].tolist(), directory)
+
+    metadata = chunks.drop_columns(
+        [c for c in OFFSET_COLUMNS + ("text",) if c in chunks.column_names]
+    )
+    # Offsets into a single narrative always fit in 32 bits
+    for name, values in (
+        ("narrative_row", compact),
+        ("start", chunks.column("start").to_numpy()),
+        ("end", chunks.column("end").to_numpy()),
+    ):
+        metadata = metadata.append_column(name, pa.array(values.astype(np.int32)))
+
+    tmp = directory / (metadata_file + ".tmp")
+    pq.write_table(metadata, tmp)
+    os.replace(tmp, directory / metadata_file)
+
+    logger.info("Chunk store: %d chunks over %d narratives in %s",
+                metadata.num_rows, n, directory)
+    return metadata
@@ -0,0 +1,108 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient  # noqa: E402
+
+from rag_chatbot.api.server import create_app  # noqa: E402
+from rag_chatbot.rag.llm import StubLLM  # noqa: E402
+from rag_chatbot.rag.pipeline import RAGPipeline  # noqa: E402
+
+CHUNKS = [
+    {
+        "complaint_id": np.int64(1),
+        "document": "the bank charged a late fee on my card " * 6,
+        "score": np.float32(0.8),
+        "issue": float("nan"),
+    },
+]
+
+
+class Embedder:
+    def embed(self, query):
+        return np.ones(4, dtype="float32")
+
+    def embed_batch(self, texts):
+        return np.ones((len(texts), 4), dtype="float32")
+
+
+class Retriever:
+    def retrieve(self, query_embedding):
+        return CHUNKS
+
+    def retrieve_batch(self, query_embeddings):
+        return [CHUNKS for _ in query_embeddings]
+
+
+class Prompt:
+    def format(self, context, question):
+        return f"Context:\n{context}\n\nQuestion: {question}"
+
+
+@pytest.fixture
+def client():
+    pipeline = RAGPipeline(Embedder(), Retriever(), StubLLM(max_words=4), Prompt())
+    with TestClient(create_app(pipeline, max_batch=2)) as client:
+        yield client
+
+
+def test_query_returns_json_safe_result(client):
+    response = client.post("/query", json={"query": "late fee"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["answer"] == "the bank charged a"
+    assert body["sources"][0]["complaint_id"] == 1
+    assert body["sources"][0]["issue"] is None
+
+
+def test_batch_query_and_limits(client):
+    response = client.post("/query/batch", json={"queries": ["a", "b"]})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 2
+
+    assert client.post("/query/batch", json={"queries": ["a"] * 3}).status_code == 422
+    assert client.post("/query", json={"query": ""}).status_code == 422
+    assert client.post("/query", json={"query": "a", "mode": "poetry"}).status_code == 422
+
+
+def test_stream_emits_tokens_then_done(client):
+    with client.stream("POST", "/query/stream", json={"query": "late fee"}) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        lines = [line for line in response.iter_lines() if line]
+
+    events = [line.split(": ", 1)[1] for line in lines if line.startswith("event")]
+    assert events[-1] == "done" and set(events[:-1]) == {"token"}
+    done = json.loads(lines[-1].split(": ", 1)[1])
+    assert done["answer"] == "the bank charged a"
+
+
+def test_health_ready_metrics(client):
+    assert client.get("/health").json() == {"status": "ok"}
+    assert client.get("/ready").status_code == 200
+    assert "stages" in client.get("/metrics").json()
+
+
+def test_query_coalescing_reported_in_metrics():
+    from rag_chatbot.rag.singleflight import SingleFlight
+
+    pipeline = RAGPipeline(Embedder(), Retriever(), StubLLM(max_words=4), Prompt(),
+                           singleflight=SingleFlight())
+    with TestClient(create_app(pipeline)) as client:
+        assert client.post("/query", json={"query": "late fee"}).status_code == 200
+        stats = client.get("/metrics").json()["singleflight"]
+
+    assert stats["executed"] == 1 and stats["in_flight"] == 0
+
+
+def test_pipeline_stages_run_on_executors_for_app_lifetime():
+    pipeline = RAGPipeline(Embedder(), Retriever(), StubLLM(max_words=4), Prompt())
+
+    with TestClient(create_app(pipeline)) as client:
+        assert pipeline.executors is not None
+        assert client.post("/query", json={"query": "late fee"}).status_code == 200
+        assert client.post("/query/batch", json={"queries": ["a"]}).status_code == 200
+
+    assert pipeline.executors is None
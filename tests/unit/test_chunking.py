@@ -4,6 +4,7 @@ from typing import List, Dict, Any
 
 from rag_chatbot.chunking.text_splitter import chunk_documents  
 from rag_chatbot.chunking.text_splitter import text_splitter
+from rag_chatbot.chunking.columnar import CHUNK_COLUMNS, chunk_table, fast_split
 
 def test_chunk_documents_basic():
     df = pd.DataFrame({
@@ -126,3 +127,72 @@ def test_chunk_documents_runtime_error(monkeypatch):
         chunk_documents(df)
 
     assert "Failed during document chunking" in str(exc.value)
+
+
+# ------------------------------------------------------------------
+# Columnar chunking
+# ------------------------------------------------------------------
+
+
+def _narratives_frame():
+    texts = [
+        "This is a sentence. " * 60,
+        "",
+        None,
+        "Line one\nLine two\n\nNew paragraph with words " * 25,
+        "short",
+        "x" * 1200,
+    ]
+    return pd.DataFrame({
+        "complaint_id": range(1, len(texts) + 1),
+        "product_category": pd.Categorical(
+            ["Credit card", "Mortgage"] * (len(texts) // 2)),
+        "consumer_complaint_narrative": texts,
+    })
+
+
+def _legacy_chunks(df):
+    out = []
+    for _, row in df.iterrows():
+        narrative = row["consumer_complaint_narrative"]
+        if not isinstance(narrative, str) or not narrative.strip():
+            continue
+        for i, chunk in enumerate(text_splitter.split_text(narrative)):
+            out.append((chunk, row["complaint_id"], row["product_category"], i))
+    return out
+
+
+@pytest.mark.parametrize("n_jobs,partition_size", [(1, 10_000), (2, 2)])
+def test_chunk_table_compat_matches_splitter(n_jobs, partition_size):
+    df = _narratives_frame()
+
+    table = chunk_table(df, n_jobs=n_jobs, partition_size=partition_size)
+    cols = table.to_pydict()
+
+    assert tuple(table.column_names) == CHUNK_COLUMNS
+    assert list(zip(cols["text"], cols["complaint_id"],
+                    cols["product_category"], cols["chunk_id"])) == (
+        _legacy_chunks(df))
+
+    narratives = dict(zip(df["complaint_id"], df["consumer_complaint_narrative"]))
+    for text, cid, start, end in zip(cols["text"], cols["complaint_id"],
+                                     cols["start"], cols["end"]):
+        assert narratives[cid][start:end] == text
+
+
+def test_fast_split_spans_are_bounded_slices():
+    text = "Some words here. " * 100 + "tail"
+
+    spans = fast_split(text, chunk_size=120, chunk_overlap=30)
+
+    assert spans[-1][0].endswith("tail")
+    for chunk, start, end in spans:
+        assert text[start:end] == chunk
+        assert 0 < len(chunk) <= 120
+    # consecutive chunks overlap
+    assert all(b[1] < a[2] for a, b in zip(spans, spans[1:]))
+
+
+def test_chunk_table_rejects_unknown_mode():
+    with pytest.raises(ValueError, match="Unknown chunking mode"):
+        chunk_table(_narratives_frame(), mode="semantic")
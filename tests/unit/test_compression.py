@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from rag_chatbot.rag.compression import (
+    ContextCompressor,
+    approx_token_count,
+    split_sentences,
+)
+from rag_chatbot.rag.pipeline import RAGPipeline
+
+VOCAB = ["fee", "card", "transfer", "late", "refund", "bank"]
+
+
+class KeywordEmbedder:
+    """Deterministic bag-of-keywords embedder for tests."""
+
+    def __init__(self):
+        self.batch_calls = 0
+
+    def _vector(self, text):
+        words = text.lower().split()
+        vec = np.array([words.count(w) for w in VOCAB], dtype="float32") + 1e-3
+        return vec / np.linalg.norm(vec)
+
+    def embed(self, query):
+        return self._vector(query)
+
+    def embed_batch(self, texts):
+        self.batch_calls += 1
+        return np.vstack([self._vector(t) for t in texts])
+
+
+@pytest.fixture
+def chunks():
+    return [
+        {
+            "document": (
+                "the bank charged a late fee on my card. "
+                "i called customer service many times without any answer. "
+                "the weather was nice that day when i went outside."
+            ),
+            "score": 0.8,
+        },
+        {
+            "document": (
+                "my transfer was delayed for two weeks by the bank. "
+                "they eventually issued a refund of the late fee."
+            ),
+            "score": 0.6,
+        },
+    ]
+
+
+def test_split_sentences_drops_short_fragments():
+    text = "ok. this sentence is long enough to keep. no."
+    assert split_sentences(text) == ["this sentence is long enough to keep."]
+
+
+def test_compress_respects_budget_and_batches(chunks):
+    embedder = KeywordEmbedder()
+    compressor = ContextCompressor(embedder, token_budget=25)
+
+    context = compressor.compress(embedder.embed("late fee"), chunks)
+
+    assert embedder.batch_calls == 1
+    assert approx_token_count(context) <= 25 + 2
+    assert "late fee" in context
+    assert "weather" not in context
+
+
+def test_compress_keeps_document_order(chunks):
+    embedder = KeywordEmbedder()
+    compressor = ContextCompressor(embedder, token_budget=1000)
+
+    context = compressor.compress(embedder.embed("fee"), chunks)
+
+    assert context.index("the bank charged") < context.index("my transfer")
+
+
+class EchoLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        return "answer"
+
+
+class StaticRetriever:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def retrieve(self, query_embedding):
+        return self.chunks
+
+
+class Prompt:
+    def format(self, context, question):
+        return f"{context}\n{question}"
+
+
+def test_pipeline_uses_compressor(chunks):
+    embedder = KeywordEmbedder()
+    llm = EchoLLM()
+    pipeline = RAGPipeline(
+        embedder=embedder,
+        retriever=StaticRetriever(chunks),
+        llm=llm,
+        prompt=Prompt(),
+        compressor=ContextCompressor(embedder, token_budget=25),
+    )
+
+    result = pipeline.run("late fee")
+
+    assert result["answer"] == "answer"
+    assert "weather" not in llm.prompts[0]
@@ -0,0 +1,182 @@
+import re
+
+import pandas as pd
+import pytest
+
+from rag_chatbot.data.filter import (
+    filter_non_empty_narratives,
+    normalize_and_filter_products,
+)
+from rag_chatbot.preprocessing.cleaning import (
+    BOILERPLATE_PATTERNS,
+    SYSTEM_MARKERS,
+    apply_schema_dtypes,
+    apply_text_cleaning,
+    clean_and_select_columns,
+    clean_narrative_text,
+    clean_narratives,
+)
+
+
+def reference_clean(text):
+    """The original per-pattern implementation, kept as an oracle."""
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    text = re.sub(r"\b[xX]{2,}([/\-\s][xX]{2,})*\b", "<masked>", text)
+    for pattern in BOILERPLATE_PATTERNS:
+        text = re.sub(pattern, "", text, count=1)
+    for marker in SYSTEM_MARKERS:
+        text = re.sub(marker, "", text)
+    text = re.sub(r"[^a-z0-9\s\.\,\-<>]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+NARRATIVES = [
+    "I am filing a complaint because XXXX charged me on XX/XX/XXXX!!",
+    "I am filing this complaint is regarding a fee. This complaint is "
+    "regarding a second fee. I am filing a complaint again.",
+    "[[submitted [[company public response]]via]] money was lost",
+    "Tabs\tand\nnewlines\r\n  and   spaces; émojis 😀 and ÜMLAUTS",
+    "  --- <b>bold</b>, 1,000.00 dollars ...  ",
+    "I would like to report that I WOULD LIKE TO REPORT fraud xx-xx xx",
+    "",
+    None,
+    float("nan"),
+    12345,
+]
+
+
+@pytest.mark.parametrize("text", NARRATIVES)
+def test_clean_narrative_text_matches_reference(text):
+    assert clean_narrative_text(text) == reference_clean(text)
+
+
+def test_clean_narratives_parallel_matches_serial():
+    texts = NARRATIVES * 30
+
+    serial = clean_narratives(texts)
+    parallel = clean_narratives(
+        texts, n_jobs=2, partition_size=50, min_parallel_rows=0)
+
+    assert parallel == serial == [reference_clean(t) for t in texts]
+
+
+def test_clean_narratives_small_input_skips_pool(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool must not start")
+
+    monkeypatch.setattr(
+        "rag_chatbot.preprocessing.cleaning.ProcessPoolExecutor", no_pool)
+    texts = NARRATIVES * 30
+
+    assert clean_narratives(texts, n_jobs=4, partition_size=50) == [
+        reference_clean(t) for t in texts]
+
+
+def test_apply_text_cleaning_preserves_index():
+    df = pd.DataFrame(
+        {"consumer_complaint_narrative": ["XXXX fee", None]},
+        index=[10, 20],
+    )
+
+    out = apply_text_cleaning(df)
+
+    assert out.loc[10, "clean_narrative"] == "<masked> fee"
+    assert out.loc[20, "clean_narrative"] == ""
+
+
+def test_apply_text_cleaning_missing_column():
+    with pytest.raises(RuntimeError, match="Text cleaning failed"):
+        apply_text_cleaning(pd.DataFrame({"other": ["x"]}))
+
+
+# ------------------------------------------------------------------
+# Schema dtypes
+# ------------------------------------------------------------------
+
+TYPES = {
+    "complaint_id": "int",
+    "product_category": "category",
+    "consumer_complaint_narrative": "string",
+    "date_received": "datetime",
+}
+
+
+def _raw_frame():
+    return pd.DataFrame({
+        "Complaint ID": ["1", "2", None, "4"],
+        "Product": ["Credit card", '"Mortgage"', "Credit card", "Credit card"],
+        "Consumer complaint narrative": ["XXXX fee", "  ", None, "late fee"],
+        "Date received": ["2023-01-02", "not a date", "2023-02-03", None],
+    })
+
+
+def test_apply_schema_dtypes_compact_types():
+    df = clean_and_select_columns(
+        _raw_frame(),
+        column_mapping={
+            "Complaint ID": "complaint_id",
+            "Product": "product_category",
+            "Consumer complaint narrative": "consumer_complaint_narrative",
+            "Date received": "date_received",
+        },
+        required_columns=set(TYPES),
+        column_types=TYPES,
+    )
+
+    assert str(df["complaint_id"].dtype) == "Int64"
+    assert df["complaint_id"].isna().tolist() == [False, False, True, False]
+    assert isinstance(df["product_category"].dtype, pd.CategoricalDtype)
+    assert df["consumer_complaint_narrative"].dtype == "string[pyarrow]"
+    assert pd.api.types.is_datetime64_any_dtype(df["date_received"])
+    assert df["date_received"].isna().sum() == 2
+
+
+def test_apply_schema_dtypes_unknown_type():
+    with pytest.raises(ValueError, match="Unknown schema type"):
+        apply_schema_dtypes(pd.DataFrame({"a": [1]}), {"a": "decimal"})
+
+
+def test_apply_schema_dtypes_does_not_mutate_input():
+    df = pd.DataFrame({"state": ["CA", "NY"]})
+    original = df["state"].dtype
+
+    out = apply_schema_dtypes(df, {"state": "category", "missing": "int"})
+
+    assert df["state"].dtype == original
+    assert isinstance(out["state"].dtype, pd.CategoricalDtype)
+
+
+def test_compact_pipeline_matches_object_pipeline():
+    mapping = {"Credit card": "Credit Card", "Mortgage": "Mortgage"}
+    raw = pd.DataFrame({
+        "product_category": ["Credit card", '"Mortgage"', "Loan", "Credit card"],
+        "consumer_complaint_narrative": ["XXXX fee", "bad", "other", "  "],
+    })
+    compact = apply_schema_dtypes(raw, {
+        "product_category": "category",
+        "consumer_complaint_narrative": "string",
+    })
+
+    outputs = []
+    for df in (raw, compact):
+        df = normalize_and_filter_products(
+            df,
+            product_column="product_category",
+            category_mapping=mapping,
+            allowed_products=["Credit Card", "Mortgage"],
+        )
+        df = filter_non_empty_narratives(
+            df, narrative_column="consumer_complaint_narrative")
+        outputs.append(apply_text_cleaning(df))
+
+    plain, typed = outputs
+    assert isinstance(typed["product_category"].dtype, pd.CategoricalDtype)
+    assert list(typed["product_category"].cat.categories) == [
+        "Credit Card", "Mortgage"]
+    assert typed.index.tolist() == plain.index.tolist() == [0, 1]
+    assert typed["product_category"].astype(str).tolist() == (
+        plain["product_category"].tolist())
+    assert typed["clean_narrative"].tolist() == plain["clean_narrative"].tolist()
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from rag_chatbot.data.handler import DataHandler
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    df = pd.DataFrame({
+        "Complaint ID": range(1, 11),
+        "Product": ["Credit card"] * 10,
+        "Sub-issue": [None] * 5 + ["Late fee"] * 5,
+        "Unused": ["x"] * 10,
+    })
+    path = tmp_path / "complaints.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_iter_batches_prunes_columns_and_bounds_batch_size(raw_csv):
+    handler = DataHandler(raw_csv)
+
+    batches = list(
+        handler.iter_batches(
+            columns=["Complaint ID", "Sub-issue"],
+            batch_size=4,
+            column_types={"Complaint ID": "int64"},
+        )
+    )
+
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert list(batches[0].columns) == ["Complaint ID", "Sub-issue"]
+    assert batches[0]["Sub-issue"].isna().all()
+    assert pd.concat(batches)["Complaint ID"].tolist() == list(range(1, 11))
+
+
+def _clean_frame():
+    return pd.DataFrame({
+        "complaint_id": pd.array([1, 2, 3, 4], dtype="Int64"),
+        "product_category": pd.Categorical(
+            ["Credit card", "Mortgage", "Credit card", "Mortgage"]),
+        "year": pd.array([2022, 2023, 2023, None], dtype="Int64"),
+        "text": ["a", "b", "c", "d"],
+    })
+
+
+def test_save_dataset_writes_hive_partitions(tmp_path):
+    out = DataHandler(tmp_path / "clean.parquet")
+
+    rows = out.save_dataset(
+        [_clean_frame().iloc[:2], _clean_frame().iloc[:0],
+         _clean_frame().iloc[2:]],
+        partition_cols=["product_category", "year"],
+    )
+
+    dirs = {p.parent.relative_to(out.filepath).as_posix()
+            for p in out.filepath.rglob("*.parquet")}
+    assert rows == 4
+    assert "product_category=Credit%20card/year=2023" in dirs
+    assert "product_category=Mortgage/year=__HIVE_DEFAULT_PARTITION__" in dirs
+
+
+def test_load_dataset_pushes_down_columns_and_filters(tmp_path):
+    out = DataHandler(tmp_path / "clean.parquet")
+    out.save_dataset(_clean_frame(), partition_cols=["product_category", "year"])
+
+    df = out.load_dataset(
+        columns=["complaint_id", "product_category"],
+        filters=[("product_category", "=", "Credit card"), ("year", ">=", 2023)],
+    )
+
+    assert list(df.columns) == ["complaint_id", "product_category"]
+    assert df["complaint_id"].tolist() == [3]
+    assert isinstance(df["product_category"].dtype, pd.CategoricalDtype)
+    assert len(out.load_dataset()) == 4
+
+
+def test_load_dataset_single_file(tmp_path):
+    path = tmp_path / "clean.parquet"
+    _clean_frame().to_parquet(path)
+
+    df = DataHandler(path).load_dataset(
+        columns=["text"], filters=[("complaint_id", "in", [2, 4])])
+
+    assert df["text"].tolist() == ["b", "d"]
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from rag_chatbot.embeddings.embedder import build_faiss_index, save_vector_store
+from rag_chatbot.evaluation.harness import EvaluationHarness
+from rag_chatbot.rag import evaluation
+from rag_chatbot.rag.evaluation import build_evaluation_table
+from rag_chatbot.rag.llm import StubLLM
+from rag_chatbot.rag.pipeline import RAGPipeline
+from rag_chatbot.rag.retriever import Retriever
+
+VOCAB = ["fee", "card", "transfer", "late", "refund", "bank"]
+
+DOCUMENTS = [
+    "the bank charged a late fee on my card and never explained the "
+    "statement, the charge appeared twice and support kept me on hold",
+    "my transfer was delayed for two weeks by the bank before they "
+    "eventually issued a refund of the late fee they had charged me",
+    "a refund for the card purchase never arrived although the merchant "
+    "confirmed it, the bank says the dispute is still under review",
+    "the wire transfer to my landlord bounced and the bank charged a fee "
+    "for the returned transfer without telling me why it failed",
+]
+
+QUESTIONS = [
+    "late fee on my card",
+    "transfer delayed refund",
+    "card refund never arrived",
+    "transfer fee bank",
+    "why was there a late fee",
+]
+
+
+class KeywordEmbedder:
+    def _vector(self, text):
+        words = text.lower().replace(",", " ").split()
+        vec = np.array([words.count(w) for w in VOCAB], dtype="float32") + 1e-3
+        return vec / np.linalg.norm(vec)
+
+    def embed(self, query):
+        return self._vector(query)
+
+    def embed_batch(self, texts):
+        return np.vstack([self._vector(t) for t in texts])
+
+
+class Prompt:
+    def format(self, context, question):
+        return f"Context:\n{context}\n\nQuestion: {question}"
+
+
+@pytest.fixture(autouse=True)
+def offline_stopwords(monkeypatch):
+    # The NLTK corpus may not be downloadable in CI
+    monkeypatch.setattr(
+        evaluation, "get_stopwords", lambda: frozenset({"the", "a", "my"}))
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    embedder = KeywordEmbedder()
+    docs = [{"text": t, "metadata": {"complaint_id": i}}
+            for i, t in enumerate(DOCUMENTS)]
+    save_vector_store(
+        build_faiss_index(embedder.embed_batch(DOCUMENTS)), docs, path=tmp_path)
+
+    return RAGPipeline(
+        embedder=embedder,
+        retriever=Retriever.from_store(tmp_path, k=3),
+        llm=StubLLM(max_words=12),
+        prompt=Prompt(),
+    )
+
+
+def test_retrieve_batch_matches_retrieve(pipeline):
+    embeddings = pipeline.embedder.embed_batch(QUESTIONS)
+
+    batched = pipeline.retriever.retrieve_batch(embeddings)
+
+    assert batched == [pipeline.retriever.retrieve(e) for e in embeddings]
+
+
+def test_stub_llm_answers_from_context():
+    llm = StubLLM(max_words=3)
+    prompt = "System.\nContext:\nthe bank charged a fee\n\nQuestion: why?"
+
+    assert llm.invoke(prompt) == "the bank charged"
+    assert "".join(llm.stream(prompt)) == "the bank charged"
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 100])
+def test_harness_matches_serial_pipeline(pipeline, batch_size):
+    serial = build_evaluation_table([pipeline.run(q) for q in QUESTIONS])
+
+    harness = EvaluationHarness(
+        pipeline, batch_size=batch_size, generation_concurrency=4)
+    table = harness.evaluate(QUESTIONS)
+
+    assert list(table.columns) == list(serial.columns)
+    assert table.equals(serial)
+    assert (table["faithfulness"] > 0).any()
+    assert {"embed", "retrieve", "respond", "metrics"} <= set(harness.timings)
+
+
+def test_parallel_metrics_match_serial(pipeline):
+    results = EvaluationHarness(pipeline).run(QUESTIONS * 4)
+
+    serial = build_evaluation_table(results)
+    parallel = build_evaluation_table(results, n_jobs=2, partition_size=3)
+
+    assert parallel.equals(serial)
+    assert len(parallel) == len(QUESTIONS) * 4
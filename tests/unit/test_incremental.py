@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from rag_chatbot.data.handler import DataHandler
+from rag_chatbot.data.incremental import (
+    Watermark,
+    next_run_index,
+    part_template,
+    read_latest,
+    row_hashes,
+)
+
+
+def _raw(ids, narratives, dates=None):
+    return pd.DataFrame({
+        "Complaint ID": ids,
+        "Consumer complaint narrative": narratives,
+        "Date received": dates or ["2023-01-01"] * len(ids),
+    })
+
+
+def test_delta_mask_detects_new_and_changed_rows():
+    first = _raw([1, 2, 3], ["a", "b", "c"])
+    watermark = Watermark()
+    assert watermark.delta_mask(first["Complaint ID"], row_hashes(first)).all()
+    watermark.update(first["Complaint ID"], row_hashes(first),
+                     first["Date received"])
+
+    second = _raw([1, 2, 3, 4], ["a", "B", "c", "d"],
+                  ["2023-01-01"] * 3 + ["2023-02-01"])
+    mask = watermark.delta_mask(second["Complaint ID"], row_hashes(second))
+
+    assert mask.tolist() == [False, True, False, True]
+
+
+def test_watermark_roundtrip(tmp_path):
+    df = _raw([5, 7], ["x", "y"], ["2023-03-01", "bad date"])
+    watermark = Watermark()
+    watermark.update(df["Complaint ID"], row_hashes(df), df["Date received"])
+    watermark.update([7], np.array([42], dtype=np.uint64))
+
+    path = tmp_path / "state.parquet"
+    watermark.save(path)
+    loaded = Watermark.load(path)
+
+    assert len(loaded) == 2
+    assert loaded.max_date_received == pd.Timestamp("2023-03-01")
+    assert loaded.delta_mask([5, 7], np.array(
+        [row_hashes(df)[0], 42], dtype=np.uint64)).tolist() == [False, False]
+
+
+def test_load_missing_watermark_is_empty(tmp_path):
+    watermark = Watermark.load(tmp_path / "missing.parquet")
+
+    assert len(watermark) == 0
+    assert watermark.max_date_received is None
+
+
+def test_runs_append_and_read_latest(tmp_path):
+    dataset = DataHandler(tmp_path / "clean.parquet")
+
+    for texts in (["a", "b"], ["B", "c"]):
+        run = next_run_index(dataset.filepath)
+        dataset.save_dataset(
+            pd.DataFrame({
+                "complaint_id": [1, 2] if run == 0 else [2, 3],
+                # complaint 2 moves to another partition in the second run
+                "product_category": ["Card", "Card"] if run == 0 else ["Loan"] * 2,
+                "text": texts,
+            }),
+            partition_cols=["product_category"],
+            basename_template=part_template(run),
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    latest = read_latest(dataset.filepath)
+    loan_texts = read_latest(dataset.filepath, columns=["text"],
+                             filters=[("product_category", "=", "Loan")])
+    card = read_latest(dataset.filepath,
+                       filters=[("product_category", "=", "Card")])
+
+    assert next_run_index(dataset.filepath) == 2
+    latest = latest.sort_values("complaint_id")
+    assert latest["text"].tolist() == ["a", "B", "c"]
+    assert latest["product_category"].astype(str).tolist() == [
+        "Card", "Loan", "Loan"]
+    assert sorted(loan_texts["text"]) == ["B", "c"]
+    assert list(loan_texts.columns) == ["text"]
+    # the stale Card version of complaint 2 is superseded by run 1
+    assert card["complaint_id"].tolist() == [1]
+
+
+def test_read_latest_on_full_run_dataset(tmp_path):
+    dataset = DataHandler(tmp_path / "clean.parquet")
+    dataset.save_dataset(
+        pd.DataFrame({"complaint_id": [1, 2], "product_category": ["Card", "Loan"]}),
+        partition_cols=["product_category"],
+    )
+
+    assert next_run_index(dataset.filepath) == 1
+    assert sorted(read_latest(dataset.filepath)["complaint_id"]) == [1, 2]
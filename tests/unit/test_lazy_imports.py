@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+PROBE = (
+    "import {module}; import json, sys; "
+    "from rag_chatbot.core import settings as s; "
+    "print(json.dumps({{"
+    "'loaded': [m for m in {heavy!r} if m in sys.modules], "
+    "'settings_built': s._SETTINGS is not None}}))"
+)
+
+
+@pytest.mark.parametrize(
+    "module, heavy",
+    [
+        ("rag_chatbot.rag.evaluation", ["nltk", "pandas"]),
+        ("rag_chatbot.rag.retriever", ["faiss", "pandas"]),
+        ("rag_chatbot.rag.query_embedder", ["sentence_transformers", "torch"]),
+        ("rag_chatbot.rag.llm", ["huggingface_hub", "langchain_community"]),
+        ("rag_chatbot.embeddings.embedder", ["faiss", "torch"]),
+        ("rag_chatbot.data.handler", ["matplotlib", "joblib"]),
+    ],
+)
+def test_import_defers_heavy_dependencies(module, heavy):
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=heavy)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    assert result["loaded"] == []
+    assert result["settings_built"] is False
+
+
+def test_lazy_settings_resolves_on_access():
+    from rag_chatbot.core.settings import get_settings, settings
+
+    assert settings.paths is get_settings().paths
+    assert isinstance(settings.get("columns"), dict)
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from rag_chatbot.evaluation.load import (
+    run_closed_loop,
+    run_open_loop,
+    saturation_curve,
+    summarize,
+)
+
+QUERIES = ["late fee", "card refund", "transfer delayed"]
+
+
+def sleeping_target(seconds):
+    def _call(query):
+        time.sleep(seconds)
+        return {"query": query}
+    return _call
+
+
+def test_summarize_splits_queue_and_service_time():
+    records = [
+        {"arrival": 0.0, "start": 0.0, "end": 0.1, "error": None},
+        {"arrival": 0.0, "start": 0.1, "end": 0.2, "error": None},
+        {"arrival": 0.1, "start": 0.2, "end": 0.3, "error": "TimeoutError: x"},
+    ]
+
+    summary = summarize(records)
+
+    assert summary["requests"] == 3 and summary["errors"] == 1
+    assert summary["error_rate"] == pytest.approx(1 / 3, abs=1e-4)
+    assert summary["queue"]["mean_ms"] == pytest.approx(50.0)
+    assert summary["service"]["mean_ms"] == pytest.approx(100.0)
+    assert summary["sample_errors"] == ["TimeoutError: x"]
+
+
+def test_open_loop_queues_when_workers_are_busy():
+    # ~40 rps offered to one worker serving ~100 rps: little queueing;
+    # the same rate against a 50 ms target (20 rps) must queue
+    fast = run_open_loop(sleeping_target(0.01), QUERIES, 40, 0.5, workers=1)
+    slow = run_open_loop(sleeping_target(0.05), QUERIES, 40, 0.5, workers=1)
+
+    assert fast["requests"] == slow["requests"] > 0
+    assert slow["queue"]["p99_ms"] > fast["queue"]["p99_ms"]
+    assert slow["latency"]["p50_ms"] >= slow["service"]["p50_ms"]
+
+
+def test_closed_loop_counts_errors():
+    def flaky(query):
+        if query == "card refund":
+            raise RuntimeError("boom")
+        return {}
+
+    summary = run_closed_loop(flaky, QUERIES, users=2, duration_s=0.1)
+
+    assert summary["requests"] > 0 and summary["errors"] > 0
+    assert summary["sample_errors"] == ["RuntimeError: boom"]
+
+
+def test_saturation_curve_reports_capacity():
+    curve = saturation_curve(
+        sleeping_target(0.02), QUERIES, steps=[5, 200],
+        model="open", duration_s=0.4, workers=1,
+    )
+
+    low, high = curve["steps"]
+    assert not low["saturated"] and high["saturated"]
+    assert curve["capacity"] == 5
+
+    with pytest.raises(ValueError, match="Unknown load model"):
+        saturation_curve(sleeping_target(0), QUERIES, [1], model="poisson")
+
+
+def test_empty_step_counts_as_saturated():
+    assert summarize([])["throughput_rps"] == 0.0
+
+    curve = saturation_curve(sleeping_target(0), ["a"], steps=[0.05], duration_s=0.5)
+
+    step, = curve["steps"]
+    assert step["requests"] == 0 and step["saturated"]
+    assert curve["capacity"] is None
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from rag_chatbot.rag.loader import PipelineLoader
+from rag_chatbot.rag.pipeline import RAGPipeline
+
+
+class FakeLoader(PipelineLoader):
+    """PipelineLoader with instant fake components."""
+
+    fail_llm = False
+
+    def _load_embedder(self):
+        time.sleep(0.05)
+        return "embedder"
+
+    def _warmup_embedder(self, embedder):
+        pass
+
+    def _load_retriever(self):
+        return "retriever"
+
+    def _warmup_retriever(self, retriever):
+        pass
+
+    def _load_llm(self):
+        if self.fail_llm:
+            raise OSError("model download failed")
+        return "llm"
+
+    def _warmup_llm(self, llm):
+        pass
+
+
+def test_loader_becomes_ready(tmp_path):
+    report_path = tmp_path / "startup.json"
+    loader = FakeLoader(
+        "faiss.index", "metadata.parquet", prompt="prompt",
+        report_path=report_path,
+    )
+    assert loader.status()["state"] == "not_started"
+
+    rag = loader.start().wait(timeout=5)
+
+    assert isinstance(rag, RAGPipeline)
+    assert loader.ready
+    assert loader.status()["state"] == "ready"
+
+    report = loader.startup_report()
+    assert set(report) == {"embedder", "retriever", "llm", "time_to_ready_s"}
+    assert report["embedder"]["load_s"] >= 0.05
+    assert report_path.exists()
+
+
+def test_loader_reports_failure():
+    loader = FakeLoader("faiss.index", "metadata.parquet", prompt="prompt")
+    loader.fail_llm = True
+
+    with pytest.raises(RuntimeError, match="model download failed"):
+        loader.start().wait(timeout=5)
+
+    assert loader.status()["components"]["llm"]["state"] == "failed"
+
+
+def test_loader_builds_compressor_from_config():
+    loader = FakeLoader(
+        "faiss.index", "metadata.parquet", prompt="prompt",
+        compression={"enabled": True, "token_budget": 64, "min_sentence_chars": 10},
+    )
+    rag = loader.start().wait(timeout=5)
+
+    assert rag.compressor.embedder == "embedder"
+    assert rag.compressor.token_budget == 64
+    assert rag.compressor.min_sentence_chars == 10
+
+    disabled = FakeLoader("faiss.index", "metadata.parquet", prompt="prompt")
+    assert disabled.start().wait(timeout=5).compressor is None
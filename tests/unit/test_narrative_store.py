@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rag_chatbot.chunking.columnar import chunk_table
+from rag_chatbot.rag.retriever import Retriever
+from rag_chatbot.vectorstore.narratives import NarrativeStore, write_chunk_store
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "complaint_id": [10, 11, 12, 13],
+        "product_category": ["Credit card", "Mortgage", "Mortgage", "Credit card"],
+        "consumer_complaint_narrative": [
+            "The bank charged a fee. " * 40,
+            None,
+            "Überweisung failed – café card déclinée. " * 30,
+            "Short complaint about a late payment fee.",
+        ],
+    })
+
+
+def test_store_roundtrip_unicode(tmp_path):
+    texts = ["plain", None, "naïve café ✓", ""]
+
+    assert NarrativeStore.write(texts, tmp_path) == 4
+
+    for mmap in (True, False):
+        store = NarrativeStore.open(tmp_path, mmap=mmap)
+        assert len(store) == 4
+        assert [store.get(i) for i in range(4)] == ["plain", "", "naïve café ✓", ""]
+        assert store.slice(2, 6, 10) == "café"
+
+
+def test_store_compresses_in_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr("rag_chatbot.vectorstore.narratives.BLOCK_BYTES", 256)
+    texts = [f"complaint {i}: the bank charged a fee. " * (i % 7) for i in range(200)]
+
+    NarrativeStore.write(texts, tmp_path)
+    store = NarrativeStore.open(tmp_path)
+
+    assert len(np.load(tmp_path / "narratives.blocks.npy")) > 10
+    assert [store.get(i) for i in reversed(range(200))] == texts[::-1]
+    assert store.text_nbytes == sum(len(t.encode()) for t in texts)
+    assert (tmp_path / "narratives.bin").stat().st_size < store.text_nbytes / 3
+
+
+def test_store_reads_uncompressed_layout(tmp_path):
+    texts = ["plain", "", "naïve café ✓"]
+    data = [t.encode() for t in texts]
+    (tmp_path / "narratives.bin").write_bytes(b"".join(data))
+    np.save(tmp_path / "narratives.offsets.npy",
+            np.cumsum([0] + [len(d) for d in data]).astype(np.int64))
+
+    store = NarrativeStore.open(tmp_path)
+
+    assert [store.get(i) for i in range(3)] == texts
+    assert store.slice(2, 6, 10) == "café"
+
+
+def test_write_chunk_store_dedupes_and_slices(frame, tmp_path):
+    chunks = chunk_table(frame)
+
+    metadata = write_chunk_store(
+        frame["consumer_complaint_narrative"], chunks, tmp_path)
+    store = NarrativeStore.open(tmp_path)
+
+    # only narratives with chunks, each stored once
+    assert len(store) == 3
+    assert "text" not in metadata.column_names
+    assert metadata.num_rows == chunks.num_rows
+
+    meta = metadata.to_pydict()
+    sliced = [
+        store.slice(r, s, e)
+        for r, s, e in zip(meta["narrative_row"], meta["start"], meta["end"])
+    ]
+    assert sliced == chunks.column("text").to_pylist()
+
+    text_bytes = sum(len(t.encode()) for t in chunks.column("text").to_pylist())
+    assert store.nbytes < text_bytes
+
+
+def test_retriever_slices_chunk_text_lazily(frame, tmp_path):
+    faiss = pytest.importorskip("faiss")
+
+    chunks = chunk_table(frame)
+    write_chunk_store(frame["consumer_complaint_narrative"], chunks, tmp_path)
+
+    vectors = np.eye(chunks.num_rows, 8, dtype="float32")
+    index = faiss.IndexFlatIP(8)
+    index.add(vectors)
+    faiss.write_index(index, str(tmp_path / "faiss.index"))
+
+    retriever = Retriever(tmp_path / "faiss.index",
+                          tmp_path / "metadata.parquet", k=1)
+    (hit,) = retriever.retrieve(vectors[2])
+
+    assert hit["document"] == chunks.column("text")[2].as_py()
+    assert hit["complaint_id"] == chunks.column("complaint_id")[2].as_py()
+
+
+def test_retriever_requires_store_for_offset_metadata(frame, tmp_path):
+    faiss = pytest.importorskip("faiss")
+
+    chunks = chunk_table(frame)
+    write_chunk_store(frame["consumer_complaint_narrative"], chunks, tmp_path)
+    (tmp_path / "narratives.bin").unlink()
+
+    index = faiss.IndexFlatIP(4)
+    index.add(np.zeros((chunks.num_rows, 4), dtype="float32"))
+    faiss.write_index(index, str(tmp_path / "faiss.index"))
+
+    with pytest.raises(FileNotFoundError, match="narrative store"):
+        Retriever(tmp_path / "faiss.index", tmp_path / "metadata.parquet")
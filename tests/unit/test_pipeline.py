@@ -0,0 +1,205 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from rag_chatbot.rag.pipeline import RAGPipeline
+
+VOCAB = ["fee", "card", "transfer", "late", "refund", "bank"]
+
+
+class KeywordEmbedder:
+    def _vector(self, text):
+        words = text.lower().split()
+        vec = np.array([words.count(w) for w in VOCAB], dtype="float32") + 1e-3
+        return vec / np.linalg.norm(vec)
+
+    def embed(self, query):
+        return self._vector(query)
+
+    def embed_batch(self, texts):
+        return np.vstack([self._vector(t) for t in texts])
+
+
+class StaticRetriever:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def retrieve(self, query_embedding):
+        return self.chunks
+
+
+class FailingLLM:
+    async def ainvoke(self, prompt):
+        raise AssertionError("LLM must not be called in extractive mode")
+
+
+class Prompt:
+    def format(self, context, question):
+        return f"{context}\n{question}"
+
+
+CHUNKS = [
+    {
+        "complaint_id": 1,
+        "document": (
+            "the bank charged a late fee on my card. "
+            "nobody at the call center was able to explain the statement "
+            "or why the charge appeared twice."
+        ),
+        "score": 0.8,
+    },
+    {
+        "complaint_id": 2,
+        "document": (
+            "my transfer was delayed for two weeks by the bank. "
+            "they eventually issued a refund of the late fee."
+        ),
+        "score": 0.6,
+    },
+]
+
+
+@pytest.fixture
+def pipeline():
+    return RAGPipeline(
+        embedder=KeywordEmbedder(),
+        retriever=StaticRetriever(CHUNKS),
+        llm=FailingLLM(),
+        prompt=Prompt(),
+    )
+
+
+def test_extractive_mode_skips_llm(pipeline):
+    result = pipeline.run("late fee refund", mode="extractive")
+
+    assert {"query", "answer", "confidence", "sources"} <= set(result)
+    assert result["sources"] == CHUNKS
+    assert result["confidence"] > 0
+    assert "refund of the late fee. [2]" in result["answer"]
+
+
+def test_extractive_answer_falls_back_when_no_sentence_qualifies():
+    from rag_chatbot.rag.compression import ContextCompressor
+    from rag_chatbot.rag.extractive import NO_ANSWER, build_extractive_answer
+
+    compressor = ContextCompressor(KeywordEmbedder())
+    query_emb = KeywordEmbedder().embed("late fee")
+    short = [{"document": ""}, {"document": "late fee.  charged"}]
+
+    assert build_extractive_answer(compressor, query_emb, short) == (
+        "- late fee. charged [2]")
+    assert build_extractive_answer(compressor, query_emb, [{"document": ""}]) == NO_ANSWER
+
+
+def test_unknown_mode_rejected(pipeline):
+    with pytest.raises(ValueError, match="Unknown answer mode"):
+        pipeline.run("late fee", mode="poetry")
+
+
+def test_extractive_result_has_stage_timings(pipeline):
+    result = pipeline.run("late fee refund", mode="extractive")
+
+    assert {"guard", "extract", "total"} <= set(result["timings"])
+
+
+class StreamingLLM:
+    def stream(self, prompt):
+        yield from ["the ", "late ", "fee"]
+
+
+class BatchRetriever(StaticRetriever):
+    def retrieve_batch(self, query_embeddings):
+        return [self.chunks for _ in query_embeddings]
+
+
+async def _collect(stream):
+    return [event async for event in stream]
+
+
+def test_astream_yields_tokens_then_result():
+    pipeline = RAGPipeline(
+        embedder=KeywordEmbedder(),
+        retriever=StaticRetriever(CHUNKS),
+        llm=StreamingLLM(),
+        prompt=Prompt(),
+    )
+
+    events = asyncio.run(_collect(pipeline.astream("late fee")))
+
+    assert [e["event"] for e in events] == ["token"] * 3 + ["done"]
+    done = events[-1]["data"]
+    assert done["answer"] == "the late fee"
+    assert done["sources"] == CHUNKS
+    assert done["timings"]["first_token"] <= done["timings"]["total"]
+
+
+def test_arun_batch_matches_run(pipeline):
+    pipeline.retriever = BatchRetriever(CHUNKS)
+    queries = ["late fee refund", "card transfer"]
+
+    results = asyncio.run(pipeline.arun_batch(queries, mode="extractive"))
+
+    for query, result in zip(queries, results):
+        expected = pipeline.run(query, mode="extractive")
+        expected.pop("timings", None)
+        assert result == expected
+
+
+def test_stage_executors_give_same_answer():
+    from rag_chatbot.core.resources import ResourcePlan, StageExecutors
+    from rag_chatbot.rag.llm import StubLLM
+
+    def build(executors=None):
+        return RAGPipeline(KeywordEmbedder(), StaticRetriever(CHUNKS),
+                           StubLLM(), Prompt(), executors=executors)
+
+    executors = StageExecutors(ResourcePlan.from_config({}, available=[0]))
+    try:
+        budgeted = build(executors).run("late fee refund")
+    finally:
+        executors.shutdown()
+    inline = build().run("late fee refund")
+
+    assert budgeted["answer"] == inline["answer"]
+    assert {"generation", "total"} <= set(budgeted["timings"])
+
+
+def test_singleflight_coalesces_identical_queries():
+    from rag_chatbot.rag.llm import StubLLM
+    from rag_chatbot.rag.singleflight import SingleFlight
+
+    flight = SingleFlight()
+    pipeline = RAGPipeline(KeywordEmbedder(), StaticRetriever(CHUNKS),
+                           StubLLM(latency_s=0.05), Prompt(), singleflight=flight)
+
+    async def main():
+        return await asyncio.gather(
+            pipeline.arun("late fee refund"),
+            pipeline.arun("Late  fee REFUND"),
+            pipeline.arun("late fee refund", mode="extractive"),
+        )
+
+    first, second, extractive = asyncio.run(main())
+
+    assert first["answer"] == second["answer"]
+    assert second["query"] == "Late  fee REFUND"
+    assert extractive["answer"] != first["answer"]
+    assert flight.stats()["executed"] == 2
+    assert flight.stats()["coalesced"] == 1
+
+
+def test_astream_extractive_answer_runs_off_the_loop(pipeline):
+    threads = []
+
+    class RecordingEmbedder(KeywordEmbedder):
+        def embed_batch(self, texts):
+            threads.append(threading.current_thread())
+            return super().embed_batch(texts)
+
+    pipeline.embedder = RecordingEmbedder()
+    events = asyncio.run(_collect(pipeline.astream("late fee", mode="extractive")))
+
+    assert events[-1]["event"] == "done" and events[-1]["data"]["answer"]
+    assert threads and threading.main_thread() not in threads
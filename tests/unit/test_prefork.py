@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+from rag_chatbot.api.prefork import plan_cpu_sets
+from rag_chatbot.utils.memory import process_memory_mb
+
+
+def test_plan_cpu_sets():
+    assert plan_cpu_sets(2, "none") == [None, None]
+    assert plan_cpu_sets(2, "spread", available=range(5)) == [[0, 1], [2, 3]]
+    assert plan_cpu_sets(3, "0-1;4,6") == [[0, 1], [4, 6], [0, 1]]
+
+    with pytest.raises(ValueError, match="Cannot spread"):
+        plan_cpu_sets(4, "spread", available=[0, 1])
+
+
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux smaps_rollup")
+def test_process_memory_reports_rss_pss_uss():
+    memory = process_memory_mb(os.getpid())
+
+    assert memory["rss_mb"] >= memory["pss_mb"] >= memory["uss_mb"] > 0
+    assert process_memory_mb(2 ** 22 + 1) is None
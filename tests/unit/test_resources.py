@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+from rag_chatbot.core.resources import ResourcePlan, StageExecutors
+from rag_chatbot.utils.timing import collect_timings, span
+
+
+def test_auto_plan_splits_cores():
+    plan = ResourcePlan.from_config({}, available=range(8))
+
+    assert plan.threads == {"embedding": 2, "search": 2, "generation": 4}
+    assert plan.cores == {"embedding": None, "search": None, "generation": None}
+
+    single = ResourcePlan.from_config({}, available=[0])
+    assert set(single.threads.values()) == {1}
+
+
+def test_plan_without_affinity_support(monkeypatch):
+    monkeypatch.delattr("os.sched_getaffinity", raising=False)
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+
+    plan = ResourcePlan.from_config({})
+
+    assert plan.threads == {"embedding": 1, "search": 1, "generation": 2}
+
+
+def test_pinned_plan_uses_disjoint_cores():
+    cfg = {
+        "pin": True,
+        "stages": {
+            "embedding": {"threads": 1},
+            "search": {"threads": 2, "concurrency": 3},
+            "generation": {"threads": 3},
+        },
+    }
+
+    plan = ResourcePlan.from_config(cfg, available=range(8))
+
+    assert plan.cores == {
+        "embedding": [0], "search": [1, 2], "generation": [3, 4, 5]}
+    assert plan.concurrency["search"] == 3
+
+    # Too few cores: shared instead of failing
+    shared = ResourcePlan.from_config(cfg, available=range(4))
+    assert set(shared.cores.values()) == {None}
+    assert shared.threads == plan.threads
+
+
+def test_stage_executors_keep_timings_context():
+    executors = StageExecutors(ResourcePlan.from_config({}, available=[0]))
+
+    def embed():
+        with span("embed"):
+            return threading.current_thread().name
+
+    async def run():
+        with collect_timings() as timings:
+            name = await executors.run("embedding", embed)
+        return name, timings
+
+    try:
+        name, timings = asyncio.run(run())
+    finally:
+        executors.shutdown()
+
+    assert name.startswith("rag-embedding")
+    assert "embed" in timings
@@ -0,0 +1,182 @@
+import asyncio
+
+import numpy as np
+
+from rag_chatbot.rag.cache import (
+    ResponseCache,
+    llm_config,
+    response_cache_from_config,
+    response_key,
+)
+from rag_chatbot.rag.llm import StubLLM
+from rag_chatbot.rag.pipeline import RAGPipeline
+
+CHUNKS = [{"complaint_id": 1, "document": "the bank charged a late fee " * 10,
+           "score": 0.8}]
+
+
+class Embedder:
+    def embed(self, query):
+        return np.ones(4, dtype="float32")
+
+
+class Retriever:
+    def __init__(self):
+        self.version = "v1"
+        self.chunks = CHUNKS
+
+    def retrieve(self, query_embedding):
+        return self.chunks
+
+
+class CountingLLM(StubLLM):
+    def __init__(self):
+        super().__init__(max_words=3)
+        self._calls = 0  # private: not part of the LLM config
+
+    @property
+    def calls(self):
+        return self._calls
+
+    async def ainvoke(self, prompt, **kwargs):
+        self._calls += 1
+        return await super().ainvoke(prompt)
+
+
+class Prompt:
+    def __init__(self, template="Context:\n{context}\n\nQuestion: {question}"):
+        self.template = template
+
+    def format(self, context, question):
+        return self.template.format(context=context, question=question)
+
+
+def _key(**overrides):
+    parts = dict(query="Late fee", filters=None, chunks=["a"], prompt="p",
+                 llm={"type": "X"}, version="v1")
+    parts.update(overrides)
+    return response_key(**parts)
+
+
+def test_key_covers_every_part():
+    assert _key() == _key(query="  late FEE ")
+    for change in ({"filters": {"product_category": "Credit card"}},
+                   {"chunks": ["b"]}, {"prompt": "q"},
+                   {"llm": {"type": "Y"}}, {"version": "v2"}):
+        assert _key(**change) != _key()
+
+
+def test_llm_config_ignores_runtime_settings():
+    class FakeLLM:
+        _identifying_params = {"model": "m", "config": {"temperature": 0.0, "threads": 4}}
+
+    assert llm_config(FakeLLM()) == {
+        "type": "FakeLLM", "model": "m", "config": {"temperature": 0.0}}
+
+
+def test_lru_evicts_least_recent():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_sqlite_tier_is_shared_and_pruned_on_new_generation(tmp_path):
+    path = tmp_path / "responses.sqlite"
+    first, second = ResponseCache(path=path), ResponseCache(path=path)
+    first.set_generation("v1:p")
+    second.set_generation("v1:p")
+
+    first.put("k", "answer")
+    assert second.get("k") == "answer"
+    assert second.stats()["disk_hits"] == 1
+
+    second.set_generation("v2:p")
+    assert second.get("k") is None
+    first.set_generation("v2:p")
+    assert first.get("k") is None
+
+
+def test_pipeline_reuses_answer_until_snapshot_or_prompt_changes():
+    llm, retriever, prompt = CountingLLM(), Retriever(), Prompt()
+    cache = ResponseCache()
+    pipeline = RAGPipeline(Embedder(), retriever, llm, prompt, response_cache=cache)
+
+    first = pipeline.run("late fee")
+    second = pipeline.run("Late  fee")
+    assert llm.calls == 1
+    assert second["answer"] == first["answer"]
+    assert second["query"] == "Late  fee"
+
+    retriever.version = "v2"
+    pipeline.run("late fee")
+    assert llm.calls == 2
+
+    prompt.template = "Context: {context}\nQuestion: {question}"
+    pipeline.run("late fee")
+    assert llm.calls == 3
+    assert cache.stats()["hits"] == 1
+
+
+def test_stream_served_from_cache():
+    llm = CountingLLM()
+    pipeline = RAGPipeline(Embedder(), Retriever(), llm, Prompt(),
+                           response_cache=ResponseCache())
+
+    async def collect():
+        return [e async for e in pipeline.astream("late fee")]
+
+    pipeline.run("late fee")
+    events = asyncio.run(collect())
+
+    assert llm.calls == 1
+    assert events[-1]["data"]["answer"] == "the bank charged"
+
+
+def test_disabled_in_config():
+    assert response_cache_from_config({"enabled": False}) is None
+    assert response_cache_from_config({"enabled": True}).path is None
+
+
+def test_retrieval_cache_ignores_stale_snapshot():
+    from rag_chatbot.rag.cache import RetrievalCache
+
+    cache = RetrievalCache()
+    old, new = object(), object()
+    cache.bind(new)
+    key = cache.key(np.ones(4), 5)
+
+    cache.put(old, key, [{"document": "stale"}])
+    assert cache.get(new, key) is None
+    cache.put(new, key, [{"document": "fresh"}])
+    assert cache.get(old, key) is None
+    assert cache.get(new, key) == [{"document": "fresh"}]
+    assert key != cache.key(np.ones(4), 5, {"product_category": "Credit card"})
+
+
+def test_sqlite_tier_is_used_off_the_event_loop(tmp_path):
+    import threading
+
+    class RecordingCache(ResponseCache):
+        threads = []
+
+        def get(self, key):
+            self.threads.append(threading.current_thread())
+            return super().get(key)
+
+        def put(self, key, answer):
+            self.threads.append(threading.current_thread())
+            super().put(key, answer)
+
+    cache = RecordingCache(path=tmp_path / "responses.sqlite")
+    pipeline = RAGPipeline(Embedder(), Retriever(), CountingLLM(), Prompt(),
+                           response_cache=cache)
+
+    pipeline.run("late fee")
+
+    assert len(cache.threads) == 2
+    assert threading.main_thread() not in cache.threads
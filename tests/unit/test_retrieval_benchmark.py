@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from rag_chatbot.evaluation.retrieval import (
+    holdout_split,
+    ndcg_at_k,
+    recall_at_k,
+    run_benchmark,
+    synthetic_vectors,
+)
+
+
+def test_recall_and_ndcg():
+    truth = np.array([[1, 2, 3], [4, 5, 6]])
+
+    assert recall_at_k(truth, truth, 3) == 1.0
+    assert ndcg_at_k(truth, truth, 3) == pytest.approx(1.0)
+
+    retrieved = np.array([[3, 2, 9], [9, 9, 9]])
+    assert recall_at_k(retrieved, truth, 3) == pytest.approx((2 / 3 + 0) / 2)
+    # Right documents in the wrong order lose nDCG, not recall
+    swapped = np.array([[3, 2, 1], [6, 5, 4]])
+    assert recall_at_k(swapped, truth, 3) == 1.0
+    assert ndcg_at_k(swapped, truth, 3) < 1.0
+
+
+def test_holdout_split_removes_queries_from_base():
+    vectors = synthetic_vectors(100, dim=8)
+
+    base, queries = holdout_split(vectors, 10)
+
+    assert len(base) == 90 and len(queries) == 10
+    assert not any((base == q).all(axis=1).any() for q in queries)
+    with pytest.raises(ValueError):
+        holdout_split(vectors, 100)
+
+
+def test_run_benchmark_reports_every_variant():
+    vectors = synthetic_vectors(2000, dim=16)
+    variants = [
+        {"name": "flat", "factory": "Flat"},
+        {"name": "ivf", "factory": "IVF{nlist},Flat", "params": {"nprobe": 1}},
+    ]
+
+    rows = run_benchmark(vectors, variants, n_queries=50, k=5)
+
+    assert [r["name"] for r in rows] == ["flat", "ivf"]
+    flat, ivf = rows
+    assert flat["recall@5"] == 1.0 and flat["ndcg@5"] == 1.0
+    assert ivf["recall@5"] <= 1.0
+    for row in rows:
+        assert row["qps"] > 0
+        assert row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"]
+        assert row["index_bytes"] > 0
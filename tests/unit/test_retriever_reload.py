@@ -0,0 +1,142 @@
+import time
+
+import numpy as np
+import pytest
+
+from rag_chatbot.embeddings.embedder import build_faiss_index, save_vector_store
+from rag_chatbot.rag.retriever import Retriever
+from rag_chatbot.vectorstore.faiss import current_version
+
+DIM = 4
+
+
+def _publish(root, texts):
+    embeddings = np.eye(len(texts), DIM, dtype="float32")
+    docs = [{"text": t, "metadata": {"complaint_id": i}}
+            for i, t in enumerate(texts)]
+    return save_vector_store(build_faiss_index(embeddings), docs, path=root)
+
+
+def _query():
+    return np.eye(1, DIM, dtype="float32")[0]
+
+
+def test_from_store_serves_current_snapshot(tmp_path):
+    _publish(tmp_path, ["old a", "old b"])
+
+    retriever = Retriever.from_store(tmp_path, k=1)
+
+    assert retriever.version == current_version(tmp_path)
+    assert retriever.retrieve(_query())[0]["document"] == "old a"
+    assert retriever.reload_if_changed() is False
+
+
+def test_reload_swaps_to_new_snapshot(tmp_path):
+    _publish(tmp_path, ["old a", "old b"])
+    retriever = Retriever.from_store(tmp_path, k=1)
+    old_version = retriever.version
+    in_flight = retriever._snapshot
+
+    _publish(tmp_path, ["new a", "new b", "new c"])
+
+    assert retriever.reload_if_changed() is True
+    assert retriever.version != old_version
+    assert retriever.index.ntotal == 3
+    assert retriever.retrieve(_query())[0]["document"] == "new a"
+    # A request holding the previous snapshot can still finish on it
+    assert in_flight.metadata["document"].tolist() == ["old a", "old b"]
+
+
+def test_broken_snapshot_keeps_serving_previous(tmp_path):
+    _publish(tmp_path, ["old a"])
+    retriever = Retriever.from_store(tmp_path, k=1)
+    version = retriever.version
+
+    broken = _publish(tmp_path, ["new a"])
+    (broken / "faiss.index").write_bytes(b"not an index")
+
+    assert retriever.reload_if_changed() is False
+    assert retriever.version == version
+    assert retriever.retrieve(_query())[0]["document"] == "old a"
+
+
+def test_watcher_picks_up_new_snapshot(tmp_path):
+    _publish(tmp_path, ["old a"])
+    retriever = Retriever.from_store(tmp_path, k=1).start_watching(0.01)
+
+    try:
+        new = _publish(tmp_path, ["new a"])
+        deadline = time.monotonic() + 5
+        while retriever.version != new.name and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        retriever.stop_watching()
+
+    assert retriever.version == new.name
+    assert retriever.retrieve(_query())[0]["document"] == "new a"
+
+
+def test_static_retriever_does_not_reload(tmp_path):
+    snapshot = _publish(tmp_path, ["old a"])
+    retriever = Retriever(snapshot / "faiss.index", snapshot / "metadata.parquet")
+
+    _publish(tmp_path, ["new a"])
+
+    assert retriever.reload_if_changed() is False
+    assert retriever.retrieve(_query())[0]["document"] == "old a"
+
+
+def test_mmap_index_matches_heap_index(tmp_path):
+    _publish(tmp_path, ["a", "b", "c"])
+
+    heap = Retriever.from_store(tmp_path, k=2)
+    mapped = Retriever.from_store(tmp_path, k=2, mmap=True)
+
+    assert mapped.retrieve(_query()) == heap.retrieve(_query())
+
+
+def test_metadata_filters_restrict_search(tmp_path):
+    embeddings = np.eye(3, DIM, dtype="float32")
+    docs = [
+        {"text": t, "metadata": {"complaint_id": i, "product_category": p}}
+        for i, (t, p) in enumerate(
+            [("a", "Credit card"), ("b", "Savings account"), ("c", "Credit card")])
+    ]
+    save_vector_store(build_faiss_index(embeddings), docs, path=tmp_path)
+    retriever = Retriever.from_store(tmp_path, k=3)
+
+    rows = retriever.retrieve(_query(), filters={"product_category": "Savings account"})
+    assert [r["document"] for r in rows] == ["b"]
+
+    batch = retriever.retrieve_batch(
+        np.vstack([_query(), _query()]),
+        filters={"product_category": ["Credit card"]})
+    assert [sorted(r["document"] for r in rows) for rows in batch] == [["a", "c"]] * 2
+
+    assert retriever.retrieve(_query(), filters={"product_category": "Mortgage"}) == []
+    with pytest.raises(ValueError):
+        retriever.retrieve(_query(), filters={"nope": 1})
+
+
+def test_retrieval_cache_skips_search_until_snapshot_swap(tmp_path):
+    from rag_chatbot.rag.cache import RetrievalCache
+
+    _publish(tmp_path, ["old a", "old b"])
+    cache = RetrievalCache(max_entries=8)
+    retriever = Retriever.from_store(tmp_path, k=1, cache=cache)
+
+    first = retriever.retrieve(_query())
+    # Near-identical vector: same quantized key
+    again = retriever.retrieve(_query() + 1e-5)
+    assert again == first and again is not first
+    assert cache.stats()["hits"] == 1
+
+    batch = retriever.retrieve_batch(np.vstack([_query(), np.eye(2, DIM)[1]]))
+    assert [rows[0]["document"] for rows in batch] == ["old a", "old b"]
+    assert cache.stats()["hits"] == 2
+
+    _publish(tmp_path, ["new a", "new b"])
+    retriever.reload_if_changed()
+
+    assert cache.stats()["entries"] == 0
+    assert retriever.retrieve(_query())[0]["document"] == "new a"
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rag_chatbot.chunking.sample import (
+    stratified_sample,
+    stratified_sample_stream,
+)
+from rag_chatbot.data.handler import DataHandler
+
+
+def _complaints(n_card=600, n_loan=300, n_other=100):
+    categories = (["Credit card"] * n_card + ["Personal loan"] * n_loan
+                  + ["Money transfer"] * n_other)
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "complaint_id": rng.permutation(len(categories)) + 1000,
+        "product_category": categories,
+    })
+
+
+def _batches(df, size):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+
+def test_stratified_sample_preserves_proportions():
+    sample = stratified_sample(_complaints(), "product_category", 100)
+
+    assert len(sample) == 100
+    assert sample["complaint_id"].is_unique
+    assert sample["product_category"].value_counts().to_dict() == {
+        "Credit card": 60, "Personal loan": 30, "Money transfer": 10}
+
+
+def test_stratified_sample_is_deterministic():
+    df = _complaints()
+
+    first = stratified_sample(df, "product_category", 50, random_state=7)
+    second = stratified_sample(df, "product_category", 50, random_state=7)
+    other = stratified_sample(df, "product_category", 50, random_state=8)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert set(first["complaint_id"]) != set(other["complaint_id"])
+
+
+def test_stratified_sample_keeps_small_strata_and_exact_size():
+    df = _complaints(n_card=995, n_loan=4, n_other=1)
+
+    sample = stratified_sample(df, "product_category", 10)
+
+    assert len(sample) == 10
+    assert set(sample["product_category"]) == {
+        "Credit card", "Personal loan", "Money transfer"}
+
+
+def test_stratified_sample_rejects_invalid_inputs():
+    with pytest.raises(ValueError):
+        stratified_sample(pd.DataFrame(), "product_category", 10)
+    with pytest.raises(ValueError):
+        stratified_sample(_complaints(), "missing", 10)
+    with pytest.raises(ValueError):
+        stratified_sample(_complaints(), "product_category", 0)
+
+
+def test_stream_sample_is_independent_of_batching():
+    df = _complaints()
+
+    small = stratified_sample_stream(
+        _batches(df, 37), "product_category", 100, id_col="complaint_id")
+    large = stratified_sample_stream(
+        _batches(df.iloc[::-1], 500), "product_category", 100,
+        id_col="complaint_id")
+
+    assert len(small) == 100
+    assert small["product_category"].value_counts().to_dict() == {
+        "Credit card": 60, "Personal loan": 30, "Money transfer": 10}
+    assert sorted(small["complaint_id"]) == sorted(large["complaint_id"])
+
+
+def test_stream_sample_without_ids_is_seeded():
+    df = _complaints()
+
+    first = stratified_sample_stream(_batches(df, 100), "product_category", 40)
+    second = stratified_sample_stream(_batches(df, 100), "product_category", 40)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert len(first) == 40
+
+
+def test_stream_sample_over_partitioned_dataset(tmp_path):
+    df = _complaints()
+    dataset = DataHandler(tmp_path / "clean.parquet")
+    dataset.save_dataset(df, partition_cols=["product_category"])
+
+    sample = stratified_sample_stream(
+        dataset.iter_batches(batch_size=64), "product_category", 20,
+        id_col="complaint_id")
+
+    assert len(sample) == 20
+    assert sample["product_category"].value_counts().to_dict() == {
+        "Credit card": 12, "Personal loan": 6, "Money transfer": 2}
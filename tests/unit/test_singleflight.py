@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+import pytest
+
+from rag_chatbot.rag.singleflight import SingleFlight, flight_key, normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  Late   FEE charges ") == "late fee charges"
+
+
+def test_flight_key_ignores_filter_order():
+    a = flight_key("Late fee", "generate", {"b": ["y", "x"], "a": 1})
+    b = flight_key("late  fee", "generate", {"a": "1", "b": ["x", "y"]})
+
+    assert a == b
+    assert a != flight_key("late fee", "extractive", {"a": 1, "b": ["x", "y"]})
+
+
+def test_concurrent_calls_execute_once():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"answer": "shared"}
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.do("k", compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(r == {"answer": "shared"} for r in results)
+    assert flight.stats() == {
+        "executed": 1, "coalesced": 4, "in_flight": 0, "saved_ratio": 0.8}
+
+
+def test_coalesces_across_event_loops():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    async def compute():
+        started.set()
+        await asyncio.to_thread(release.wait)
+        return 42
+
+    def worker():
+        results.append(asyncio.run(flight.do("k", compute)))
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=worker) for _ in range(3)]
+    for t in followers:
+        t.start()
+    while flight.stats()["coalesced"] < 3:
+        pass
+    release.set()
+    for t in [leader, *followers]:
+        t.join()
+
+    assert results == [42] * 4
+    assert flight.stats()["executed"] == 1
+
+
+def test_exception_reaches_followers_and_is_not_kept():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+
+    async def ok():
+        return "ok"
+
+    # Nothing is cached: the next call runs again
+    assert asyncio.run(flight.do("k", ok)) == "ok"
+    assert flight.stats()["executed"] == 2
+
+
+def test_cancelled_leader_lets_followers_retry():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == 2
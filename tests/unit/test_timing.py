@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from rag_chatbot.utils import timing
+from rag_chatbot.utils.timing import (
+    LatencyRegistry,
+    StageHistogram,
+    collect_timings,
+    span,
+    timed,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    timing.set_enabled(True)
+    timing.registry.reset()
+    yield
+    timing.set_enabled(True)
+    timing.registry.reset()
+
+
+def test_histogram_percentiles_within_bucket_resolution():
+    hist = StageHistogram()
+    for ms in range(1, 101):
+        hist.observe(ms / 1000)
+
+    summary = hist.summary()
+
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == pytest.approx(50, rel=0.16)
+    assert summary["p99_ms"] == pytest.approx(99, rel=0.16)
+    assert summary["max_ms"] == pytest.approx(100)
+
+
+def test_span_records_into_request_and_registry():
+    with collect_timings() as timings:
+        with span("search"):
+            pass
+        with span("search"):
+            pass
+
+    assert set(timings) == {"search"}
+    assert timing.registry.summary()["search"]["count"] == 2
+
+
+def test_timed_decorator_supports_coroutines():
+    @timed("generation")
+    async def generate():
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def main():
+        with collect_timings() as timings:
+            assert await generate() == "ok"
+        return timings
+
+    timings = asyncio.run(main())
+    assert timings["generation"] >= 10
+
+
+def test_disabled_timing_records_nothing():
+    timing.set_enabled(False)
+
+    with collect_timings() as timings:
+        with span("embed"):
+            pass
+
+    assert timings is None
+    assert timing.registry.summary() == {}
+
+
+def test_export_writes_percentiles(tmp_path):
+    reg = LatencyRegistry()
+    reg.observe("embed", 0.002)
+
+    out = tmp_path / "latency.json"
+    reg.export(out)
+
+    assert '"p95_ms"' in out.read_text()
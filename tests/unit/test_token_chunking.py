@@ -0,0 +1,108 @@
+import pandas as pd
+import pytest
+
+from rag_chatbot.chunking.columnar import chunk_table
+from rag_chatbot.chunking.tokens import (
+    count_tokens,
+    token_budget,
+    token_length_report,
+    token_split_batch,
+)
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    """Tiny offline WordPiece tokenizer with BERT-style special tokens."""
+    pytest.importorskip("transformers")
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import PreTrainedTokenizerFast
+
+    vocab = {"[PAD]": 0, "[UNK]": 1, "[CLS]": 2, "[SEP]": 3, ".": 4}
+    for word in ("the", "bank", "charged", "a", "fee", "i", "called", "twice",
+                 "over", "##dra", "##ft", "dispute", "##d"):
+        vocab[word] = len(vocab)
+
+    tok = Tokenizer(models.WordPiece(vocab, unk_token="[UNK]"))
+    tok.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    tok.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]",
+        special_tokens=[("[CLS]", 2), ("[SEP]", 3)],
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tok,
+        unk_token="[UNK]", cls_token="[CLS]", sep_token="[SEP]",
+        pad_token="[PAD]",
+    )
+
+
+TEXT = " ".join(["the bank charged a fee."] * 10 + ["i called twice"])
+
+
+def test_token_budget_excludes_special_tokens(tokenizer):
+    assert token_budget(tokenizer, max_seq_length=256) == 254
+
+
+def test_token_split_respects_budget_and_overlap(tokenizer):
+    (spans,) = token_split_batch([TEXT], tokenizer, max_tokens=16, overlap=4)
+
+    assert len(spans) > 1
+    for chunk, start, end, n_tokens in spans:
+        assert TEXT[start:end] == chunk
+        assert n_tokens <= 16
+        assert count_tokens([chunk], tokenizer)[0] == n_tokens
+    # consecutive chunks share text and the narrative is fully covered
+    assert all(b[1] < a[2] for a, b in zip(spans, spans[1:]))
+    assert spans[0][1] == 0 and spans[-1][2] == len(TEXT)
+    # windows end on sentences when one is available
+    assert all(chunk.endswith(".") for chunk, *_ in spans[:-1])
+
+
+@pytest.mark.parametrize("max_tokens", range(4, 14))
+def test_token_split_never_cuts_words(tokenizer, max_tokens):
+    # "overdraft" is three word-pieces and "disputed" two, no sentence ends
+    text = " ".join(["i disputed the overdraft fee twice"] * 6)
+
+    (spans,) = token_split_batch([text], tokenizer, max_tokens=max_tokens,
+                                 overlap=max_tokens // 3)
+
+    for chunk, start, end, n_tokens in spans:
+        content = tokenizer(chunk, add_special_tokens=False)["input_ids"]
+        assert len(content) == n_tokens <= max_tokens
+        assert len(tokenizer(chunk)["input_ids"]) <= (
+            max_tokens + tokenizer.num_special_tokens_to_add())
+        assert start == 0 or text[start - 1] == " "
+        assert end == len(text) or text[end] == " "
+    assert spans[0][1] == 0 and spans[-1][2] == len(text)
+
+
+def test_token_split_rejects_overlap_at_budget(tokenizer):
+    with pytest.raises(ValueError, match="overlap"):
+        token_split_batch([TEXT], tokenizer, max_tokens=8, overlap=8)
+
+
+def test_chunk_table_tokens_mode(tokenizer):
+    df = pd.DataFrame({
+        "complaint_id": [1, 2, 3],
+        "product_category": ["Credit card", "Mortgage", "Mortgage"],
+        "consumer_complaint_narrative": [TEXT, None, "i called twice"],
+    })
+
+    table = chunk_table(df, mode="tokens", tokenizer=tokenizer,
+                        max_tokens=20, token_overlap=5)
+    cols = table.to_pydict()
+
+    assert max(cols["n_tokens"]) <= 20
+    assert cols["complaint_id"][-1] == 3
+    assert cols["n_tokens"][-1] == 3
+    assert set(cols["complaint_id"]) == {1, 3}
+
+
+def test_token_length_report():
+    report = token_length_report([10, 100, 254, 300], max_tokens=254)
+
+    assert report["chunks"] == 4
+    assert report["truncated_share"] == 0.25
+    assert report["truncated_tokens"] == 46
+    assert report["histogram"]["=254"] == 1
+    assert report["histogram"][">254"] == 1
+    assert report["useful_token_ratio"] == round((10 + 100 + 254 + 254) / (4 * 254), 4)
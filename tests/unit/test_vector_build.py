@@ -0,0 +1,124 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rag_chatbot.rag.retriever import Retriever
+from rag_chatbot.vectorstore.build import BUILD_DIR, build_vector_store
+from rag_chatbot.vectorstore.faiss import (
+    current_snapshot,
+    current_version,
+    list_versions,
+    prune_snapshots,
+    read_manifest,
+    verify_snapshot,
+)
+
+DIM = 8
+
+
+def _complaints(n=30):
+    return pd.DataFrame({
+        "complaint_id": range(1, n + 1),
+        "product_category": ["Credit card", "Personal loan"] * (n // 2),
+        "consumer_complaint_narrative": [
+            f"Complaint {i}. The bank charged a fee twice. " * (1 + i % 25)
+            for i in range(n)
+        ],
+    })
+
+
+class FakeEncoder:
+    """Deterministic unit vectors; can fail on a given call."""
+
+    def __init__(self, fail_on_call=None):
+        self.calls = 0
+        self.texts = 0
+        self.fail_on_call = fail_on_call
+
+    def __call__(self, texts):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("simulated crash")
+        self.texts += len(texts)
+        vectors = np.stack([
+            np.random.default_rng(len(t)).random(DIM) for t in texts
+        ]).astype("float32")
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_build_publishes_versioned_snapshot(tmp_path):
+    snapshot = build_vector_store(
+        _complaints(), tmp_path, model_name="fake", encoder=FakeEncoder(),
+        batch_size=16)
+
+    manifest = read_manifest(snapshot)
+
+    assert current_snapshot(tmp_path) == snapshot
+    assert current_version(tmp_path) == manifest["version"] == snapshot.name
+    assert not (tmp_path / BUILD_DIR).exists()
+    assert manifest["model"] == "fake"
+    assert manifest["embedding_dim"] == DIM
+    assert manifest["chunker"]["mode"] == "compat"
+    assert manifest["counts"]["rows"] == 30
+    assert manifest["counts"]["vectors"] == manifest["counts"]["chunks"] > 30
+    assert {"faiss.index", "metadata.parquet", "narratives.bin"} <= set(
+        manifest["files"])
+    assert verify_snapshot(snapshot) == []
+
+    retriever = Retriever(snapshot / "faiss.index",
+                          snapshot / "metadata.parquet", k=3)
+    hits = retriever.retrieve(np.ones(DIM, dtype="float32"))
+    assert len(hits) == 3
+    assert all(hit["document"] for hit in hits)
+
+
+def test_build_resumes_from_last_checkpoint(tmp_path):
+    df = _complaints()
+
+    crashing = FakeEncoder(fail_on_call=3)
+    with pytest.raises(RuntimeError):
+        build_vector_store(df, tmp_path, encoder=crashing, batch_size=16)
+
+    state = json.loads((tmp_path / BUILD_DIR / "checkpoint.json").read_text())
+    assert state["next_offset"] == 32
+    assert current_version(tmp_path) is None
+
+    resumed = FakeEncoder()
+    snapshot = build_vector_store(df, tmp_path, encoder=resumed, batch_size=16)
+
+    total = read_manifest(snapshot)["counts"]["chunks"]
+    # Only the chunks after the checkpoint were embedded again
+    assert resumed.texts == total - 32
+
+    fresh = build_vector_store(
+        df, tmp_path / "fresh", encoder=FakeEncoder(), batch_size=16)
+    assert read_manifest(fresh)["files"]["faiss.index"] == read_manifest(
+        snapshot)["files"]["faiss.index"]
+
+
+def test_changed_input_discards_stale_checkpoint(tmp_path):
+    with pytest.raises(RuntimeError):
+        build_vector_store(_complaints(), tmp_path,
+                           encoder=FakeEncoder(fail_on_call=2), batch_size=16)
+
+    encoder = FakeEncoder()
+    snapshot = build_vector_store(_complaints(20), tmp_path, encoder=encoder,
+                                  batch_size=16)
+
+    assert encoder.texts == read_manifest(snapshot)["counts"]["chunks"]
+
+
+def test_verify_and_prune_snapshots(tmp_path):
+    first = build_vector_store(_complaints(10), tmp_path, encoder=FakeEncoder())
+    (first / "faiss.index").write_bytes(b"corrupt")
+    assert verify_snapshot(first) == ["faiss.index"]
+
+    for n in (12, 14):
+        build_vector_store(_complaints(n), tmp_path, encoder=FakeEncoder())
+    versions = list_versions(tmp_path)
+
+    assert len(versions) == 3
+    assert prune_snapshots(tmp_path, keep=1) == versions[:2]
+    assert list_versions(tmp_path) == [current_version(tmp_path)]
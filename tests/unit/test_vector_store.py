@@ -1,8 +1,5 @@
-import os
-import pickle
-from pathlib import Path
-
 import numpy as np
+import pandas as pd
 import pytest
 import faiss
 
@@ -11,6 +8,12 @@ from rag_chatbot.embeddings.embedder import (
     build_faiss_index,
     save_vector_store,
 )
+from rag_chatbot.rag.retriever import Retriever
+from rag_chatbot.vectorstore.faiss import (
+    current_snapshot,
+    read_manifest,
+    verify_snapshot,
+)
 
 
 @pytest.fixture
@@ -95,23 +98,45 @@ def test_save_vector_store_success(sample_docs, temp_vector_store):
     embeddings = build_embeddings(sample_docs)
     index = build_faiss_index(embeddings)
 
-    save_vector_store(index, sample_docs, path=temp_vector_store)
+    snapshot = save_vector_store(index, sample_docs, path=temp_vector_store)
 
-    index_path = temp_vector_store / "index.faiss"
-    metadata_path = temp_vector_store / "metadata.pkl"
+    index_path = snapshot / "faiss.index"
+    metadata_path = snapshot / "metadata.parquet"
 
+    assert snapshot == current_snapshot(temp_vector_store)
     assert index_path.exists()
     assert metadata_path.exists()
+    assert verify_snapshot(snapshot) == []
 
     # Verify FAISS index loads
     loaded_index = faiss.read_index(str(index_path))
     assert loaded_index.ntotal == len(sample_docs)
 
     # Verify metadata integrity
-    with open(metadata_path, "rb") as f:
-        metadata = pickle.load(f)
+    metadata = pd.read_parquet(metadata_path)
+
+    assert metadata["document"].tolist() == [d["text"] for d in sample_docs]
+    assert metadata["complaint_id"].tolist() == [1, 2]
 
-    assert metadata == sample_docs
+
+def test_saved_snapshot_loads_in_retriever(sample_docs, temp_vector_store):
+    rng = np.random.default_rng(0)
+    embeddings = rng.random((2, 8), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    index = build_faiss_index(embeddings)
+
+    first = save_vector_store(index, sample_docs, path=temp_vector_store)
+    second = save_vector_store(index, sample_docs[::-1], path=temp_vector_store)
+
+    assert first != second
+    assert current_snapshot(temp_vector_store) == second
+    assert read_manifest(second)["counts"] == {"chunks": 2, "vectors": 2}
+
+    retriever = Retriever(second / "faiss.index", second / "metadata.parquet",
+                          k=1)
+    hit = retriever.retrieve(embeddings[0])[0]
+    assert hit["document"] == sample_docs[1]["text"]
+    assert hit["product_category"] == "Money transfers"
 
 
 def test_save_vector_store_failure(monkeypatch, sample_docs, temp_vector_store):
@@ -125,3 +150,6 @@ def test_save_vector_store_failure(monkeypatch, sample_docs, temp_vector_store):
 
     with pytest.raises(RuntimeError, match="Failed to save vector store"):
         save_vector_store(index, sample_docs, path=temp_vector_store)
+
+    # Nothing half-written is published
+    assert list(temp_vector_store.iterdir()) == []